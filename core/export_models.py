@@ -10,6 +10,8 @@ Every option maps directly to an FFmpeg flag -- no leaky abstractions.
 
 from __future__ import annotations
 
+import bisect
+import math
 from enum import Enum
 from typing import Literal
 
@@ -523,6 +525,46 @@ class TrimSettings(BaseModel):
                 )
         return self
 
+    def resolve_frame_range(
+        self,
+        total_frames: int,
+        fps: float,
+        pts: list[float] | None = None,
+    ) -> tuple[int, int]:
+        """Convert the trim into a frame range the decoder can seek to.
+
+        Args:
+            total_frames: Number of frames in the source.
+            fps: Source frame rate (time mode without pts).
+            pts: Optional per-frame presentation times in seconds from the
+                first frame, for exact time-mode lookups on VFR sources.
+
+        Returns:
+            (start_frame, end_frame) with end exclusive, clamped to the
+            source and never empty.
+        """
+        total_frames = max(1, total_frames)
+
+        def frame_at(t: float) -> int:
+            # First frame presented at or after t
+            if pts:
+                return bisect.bisect_left(pts, t - 1e-6)
+            return math.ceil(t * fps - 1e-6)
+
+        start, end = 0, total_frames
+        if self.mode == TrimMode.FRAMES:
+            start = self.start_frame
+            if self.end_frame is not None:
+                end = self.end_frame + 1
+        elif self.mode == TrimMode.TIME:
+            start = frame_at(self.start_time)
+            if self.end_time is not None:
+                end = frame_at(self.end_time)
+
+        start = max(0, min(start, total_frames - 1))
+        end = max(start + 1, min(end, total_frames))
+        return start, end
+
 
 class AudioSettings(BaseModel):
     """Audio export configuration.
@@ -0,0 +1,214 @@
+"""
+Entropic — Frame Store
+Intermediate frames in one memory-mapped uint8 array file (N×H×W×3).
+
+Used wherever frames must be staged between passes (e.g. two-pass GIF
+export). Reading frame k is a zero-copy slice of the mapping, not an image
+decode. Stores prefer tmpfs (/dev/shm) when there is room, so short renders
+never touch disk.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+SHM_DIR = Path("/dev/shm")
+SHM_HEADROOM = 256 * 1024 * 1024  # Leave this much tmpfs free for everything else
+
+
+def default_store_dir(nbytes: int) -> Path:
+    """Directory for a new store: tmpfs if it can hold nbytes, else the temp dir."""
+    if SHM_DIR.is_dir() and os.access(SHM_DIR, os.W_OK):
+        try:
+            if shutil.disk_usage(SHM_DIR).free - nbytes > SHM_HEADROOM:
+                return SHM_DIR
+        except OSError:
+            pass
+    return Path(tempfile.gettempdir())
+
+
+class FrameStore:
+    """Fixed-shape frames in a single memory-mapped file plus a JSON index.
+
+    The data file is a raw (capacity, H, W, 3) uint8 array; <name>.json holds
+    the shape and the index mapping frame number -> slot. Appending past the
+    capacity grows the file in place.
+
+    Usage:
+        with FrameStore.create(100, 480, 640) as store:
+            for frame in frames:
+                store.append(frame)
+            first = store[0]          # zero-copy view
+            for frame in store:       # in index order
+                ...
+
+    Args:
+        path: Data file of an existing store (opened via its index file).
+        writable: Open for appending/overwriting instead of read-only.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        self.path = Path(path)
+        meta = json.loads(self._index_path(self.path).read_text())
+        self.height = int(meta["height"])
+        self.width = int(meta["width"])
+        self.capacity = int(meta["capacity"])
+        self.index = {int(k): int(v) for k, v in meta["index"].items()}
+        self._next = max(self.index) + 1 if self.index else 0
+        self.writable = writable
+        self.temporary = False
+        self._map = None
+        self._open()
+
+    @staticmethod
+    def _index_path(path: Path) -> Path:
+        return path.with_name(path.name + ".json")
+
+    @classmethod
+    def create(
+        cls,
+        capacity: int,
+        height: int,
+        width: int,
+        path: str | None = None,
+        temporary: bool = True,
+    ) -> "FrameStore":
+        """Create an empty store.
+
+        Args:
+            capacity: Initial number of frame slots (grows on demand).
+            height: Frame height in pixels.
+            width: Frame width in pixels.
+            path: Data file path. None = a new file in default_store_dir().
+            temporary: Delete the files when the store is closed.
+        """
+        capacity = max(1, int(capacity))
+        frame_bytes = height * width * 3
+        if path is None:
+            directory = default_store_dir(capacity * frame_bytes)
+            fd, path = tempfile.mkstemp(prefix="entropic_frames_", suffix=".u8", dir=directory)
+            os.close(fd)
+        path = Path(path)
+        with open(path, "wb") as f:
+            f.truncate(capacity * frame_bytes)
+        cls._index_path(path).write_text(json.dumps({
+            "height": height, "width": width, "capacity": capacity, "index": {},
+        }))
+        store = cls(path, writable=True)
+        store.temporary = temporary
+        return store
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _open(self):
+        self._map = np.memmap(
+            self.path,
+            dtype=np.uint8,
+            mode="r+" if self.writable else "r",
+            shape=(self.capacity, self.height, self.width, 3),
+        )
+
+    def _grow(self, capacity: int):
+        self._map.flush()
+        self._map = None
+        with open(self.path, "r+b") as f:
+            f.truncate(capacity * self.height * self.width * 3)
+        self.capacity = capacity
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, frame_number: int) -> bool:
+        return frame_number in self.index
+
+    def __getitem__(self, frame_number: int) -> np.ndarray:
+        """Zero-copy (H, W, 3) view of a stored frame."""
+        try:
+            return self._map[self.index[frame_number]]
+        except KeyError:
+            raise KeyError(f"Frame {frame_number} not in store") from None
+
+    def __iter__(self):
+        for frame_number in sorted(self.index):
+            yield self._map[self.index[frame_number]]
+
+    def put(self, frame_number: int, frame: np.ndarray):
+        """Store (or overwrite) frame `frame_number`."""
+        if not self.writable:
+            raise ValueError(f"Frame store {self.path} is read-only")
+        if frame.shape != (self.height, self.width, 3):
+            raise ValueError(
+                f"Frame shape {frame.shape} doesn't match store "
+                f"({self.height}, {self.width}, 3)"
+            )
+        slot = self.index.get(frame_number)
+        if slot is None:
+            slot = len(self.index)
+            if slot >= self.capacity:
+                self._grow(self.capacity * 2)
+            self.index[frame_number] = slot
+            self._next = max(self._next, frame_number + 1)
+        self._map[slot] = frame
+
+    def slot_view(self, slot: int) -> np.ndarray:
+        """Zero-copy (H, W, 3) view of physical slot `slot`, bypassing the index.
+
+        For callers that manage slots themselves (e.g. render workers mapping
+        the data file directly), so both sides address the same memory.
+        """
+        if not 0 <= slot < self.capacity:
+            raise IndexError(f"Slot {slot} out of range (capacity {self.capacity})")
+        return self._map[slot]
+
+    def write_slot(self, slot: int, frame: np.ndarray):
+        """Overwrite physical slot `slot`, bypassing the index (see slot_view)."""
+        if not self.writable:
+            raise ValueError(f"Frame store {self.path} is read-only")
+        if frame.shape != (self.height, self.width, 3):
+            raise ValueError(
+                f"Frame shape {frame.shape} doesn't match store "
+                f"({self.height}, {self.width}, 3)"
+            )
+        self.slot_view(slot)[:] = frame
+
+    def append(self, frame: np.ndarray) -> int:
+        """Store a frame after the highest frame number so far. Returns its number."""
+        frame_number = self._next
+        self.put(frame_number, frame)
+        return frame_number
+
+    def write(self, frame: np.ndarray):
+        """Same as append(); lets a store stand in for a FrameWriter."""
+        self.append(frame)
+
+    def flush(self):
+        """Write mapped data and the index to the backing files."""
+        if not self.writable:
+            return
+        self._map.flush()
+        self._index_path(self.path).write_text(json.dumps({
+            "height": self.height, "width": self.width, "capacity": self.capacity,
+            "index": {str(k): v for k, v in self.index.items()},
+        }))
+
+    def close(self):
+        """Flush and unmap; temporary stores delete their files."""
+        if self._map is None:
+            return
+        if self.temporary:
+            self._map = None
+            self.path.unlink(missing_ok=True)
+            self._index_path(self.path).unlink(missing_ok=True)
+            return
+        self.flush()
+        self._map = None
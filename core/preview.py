@@ -10,16 +10,19 @@ from pathlib import Path
 
 from core.video_io import (
     probe_video,
-    extract_frames,
-    load_frame,
+    iter_frames,
     save_frame,
-    reassemble_video,
+    FrameWriter,
     extract_single_frame,
+    extract_frame_batch,
+    sample_frame_numbers,
+    load_frame_index,
 )
 from core.project import get_project_dir, load_project
 from core.recipe import load_recipe
 from core.automation import AutomationSession
-from effects import apply_chain
+from core.render import render_chain
+from effects import apply_chain, RenderContext
 
 # Quality tier settings
 QUALITY_TIERS = {
@@ -66,8 +69,8 @@ def render_recipe(
         raise FileNotFoundError("No source video in project")
     source_video = source_files[0].resolve()
 
-    # Probe video
-    info = probe_video(str(source_video))
+    # Probe video (cached in the project dir across sessions)
+    info = probe_video(str(source_video), cache_dir=project_dir)
     scale = _scale_for_tier(quality, info["height"])
 
     # Output path
@@ -76,35 +79,34 @@ def render_recipe(
     output_ext = ".mov" if quality == "hi" else ".mp4"
     output_path = output_dir / f"{output_name}{output_ext}"
 
-    # Extract frames to temp dir
-    with tempfile.TemporaryDirectory() as tmp_extract, \
-         tempfile.TemporaryDirectory() as tmp_processed:
-
-        frames = extract_frames(str(source_video), tmp_extract, scale=scale)
-
-        # Apply effects to each frame
-        total = len(frames)
-        for i, frame_path in enumerate(frames):
-            frame = load_frame(str(frame_path))
-            # Apply automation overrides if present
-            frame_effects = automation.apply_to_chain(effects, i) if automation else effects
-            processed = apply_chain(frame, frame_effects, frame_index=i, total_frames=total)
-            out_frame = Path(tmp_processed) / frame_path.name
-            save_frame(processed, str(out_frame))
-
-            # Progress (every 10%)
-            if total > 10 and (i + 1) % (total // 10) == 0:
-                pct = (i + 1) / total * 100
-                print(f"  Rendering: {pct:.0f}% ({i + 1}/{total} frames)")
-
-        # Reassemble
-        output = reassemble_video(
-            tmp_processed,
-            str(output_path),
+    # Decode -> effects -> encode, streaming; encode into a temp file and
+    # move it into place so a failed render never leaves a truncated output
+    with tempfile.TemporaryDirectory() as tmp_render:
+        # Exact frame count from the packet index (probe only estimates it)
+        total = max(1, len(load_frame_index(str(source_video), cache_dir=project_dir)["pts"]))
+        writer = FrameWriter(
+            Path(tmp_render) / output_path.name,
             fps=info["fps"],
             audio_source=str(source_video) if info["has_audio"] else None,
             quality=quality,
         )
+        reported = [0]
+
+        def report(done):
+            # Progress (every 10%)
+            tenths = min(10, done * 10 // total)
+            if total > 10 and tenths > reported[0]:
+                reported[0] = tenths
+                print(f"  Rendering: {tenths * 10}% ({done}/{total} frames)")
+
+        # Streams in fixed-size windows (memory stays flat at any clip
+        # length); stateless chains render on every core
+        with writer:
+            frames = iter_frames(str(source_video), scale=scale)
+            render_chain(frames, effects, total, writer, automation=automation, progress=report)
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output = Path(shutil.move(str(writer.output_path), str(output_path)))
 
     return output
 
@@ -129,11 +131,11 @@ def preview_frame(
     source_files = list(source_dir.iterdir())
     source_video = source_files[0].resolve()
 
-    # Extract single frame
-    frame = extract_single_frame(str(source_video), frame_number)
+    # Extract single frame (probe + frame index cached in the project dir)
+    frame = extract_single_frame(str(source_video), frame_number, cache_dir=project_dir)
 
     # Apply effects
-    processed = apply_chain(frame, effects)
+    processed = apply_chain(frame, effects, context=RenderContext())
 
     # Save preview
     preview_path = project_dir / "renders" / "lo" / f"{recipe_id}-preview.png"
@@ -161,20 +163,15 @@ def render_sample_frames(
     source_files = list(source_dir.iterdir())
     source_video = source_files[0].resolve()
 
-    info = probe_video(str(source_video))
-    total_frames = info["total_frames"]
+    index = load_frame_index(str(source_video), cache_dir=project_dir)
+    frame_nums = sample_frame_numbers(len(index["pts"]), count)
 
-    # Pick evenly-spaced frame numbers
-    if total_frames <= count:
-        frame_nums = list(range(total_frames))
-    else:
-        frame_nums = [int(i * total_frames / (count - 1)) for i in range(count)]
-        frame_nums[-1] = min(frame_nums[-1], total_frames - 1)
+    # All samples come out of one decoder run
+    frames = extract_frame_batch(str(source_video), frame_nums, cache_dir=project_dir)
 
     paths = []
-    for fn in frame_nums:
-        frame = extract_single_frame(str(source_video), fn)
-        processed = apply_chain(frame, effects)
+    for fn, frame in zip(frame_nums, frames):
+        processed = apply_chain(frame, effects, context=RenderContext())
         out = project_dir / "renders" / "lo" / f"{recipe_id}-sample-{fn:06d}.png"
         save_frame(processed, str(out))
         paths.append(out)
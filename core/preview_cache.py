@@ -0,0 +1,164 @@
+"""
+Entropic — Preview Cache
+Intermediate preview frames in an in-memory LRU with a byte budget.
+
+Interactive previews re-run the same chain with only the tail changing (a
+slider drag on the last effect). PreviewCache keeps the frame after every
+effect, keyed by (source id, frame number, decode scale, chain prefix hash),
+so a preview restarts from the longest cached prefix and only recomputes the
+effects after it:
+
+    cache = PreviewCache()
+    frame = cache.render(video_path, 120, 0.5, effects, load_frame)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_BUDGET_MB = 256
+
+
+def default_budget_bytes() -> int:
+    """Cache budget in bytes (ENTROPIC_PREVIEW_CACHE_MB overrides)."""
+    try:
+        mb = max(0, int(os.environ.get("ENTROPIC_PREVIEW_CACHE_MB", "")))
+    except ValueError:
+        mb = DEFAULT_BUDGET_MB
+    return mb * 1024 * 1024
+
+
+def prefix_hashes(effects_list: list[dict]) -> list[str]:
+    """Hash of every chain prefix: hashes[k] covers effects_list[:k].
+
+    Returns:
+        len(effects_list) + 1 hex digests; hashes[0] is the empty chain.
+    """
+    h = hashlib.sha1()
+    hashes = [h.hexdigest()]
+    for effect in effects_list:
+        h.update(json.dumps(effect, sort_keys=True, default=str).encode())
+        hashes.append(h.hexdigest())
+    return hashes
+
+
+def source_id(video_path: str) -> tuple[str, int, int]:
+    """Identity of a source file: (realpath, size, mtime_ns)."""
+    from core.video_io import _probe_key
+    return _probe_key(video_path)
+
+
+class PreviewCache:
+    """LRU of frames keyed by (source, frame, scale, prefix hash).
+
+    Stored frames are read-only; render() hands effects a copy and returns
+    a writeable frame of its own.
+
+    Args:
+        budget_bytes: Evict least recently used frames beyond this size.
+            None = default_budget_bytes(); 0 disables caching.
+    """
+
+    def __init__(self, budget_bytes: int | None = None):
+        self.budget_bytes = default_budget_bytes() if budget_bytes is None else budget_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> np.ndarray | None:
+        """Cached frame for key (marks it most recently used), or None."""
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is not None:
+                self._entries.move_to_end(key)
+            return frame
+
+    def put(self, key: tuple, frame: np.ndarray):
+        """Store a copy of frame, evicting old entries to stay in budget."""
+        if frame.nbytes > self.budget_bytes:
+            return
+        frame = frame.copy()
+        frame.setflags(write=False)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._entries[key] = frame
+            self.nbytes += frame.nbytes
+            while self.nbytes > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def render(
+        self,
+        source: str,
+        frame_number: int,
+        scale: float,
+        effects_list: list[dict],
+        load_frame,
+    ) -> np.ndarray:
+        """Render a preview frame, reusing the longest cached chain prefix.
+
+        Args:
+            source: Video path (identified by path, size and mtime).
+            frame_number: Source frame number.
+            scale: Decode scale the frames were loaded at.
+            effects_list: Effect chain (same format as apply_chain).
+            load_frame: Callable () -> frame, used when nothing is cached.
+
+        Returns:
+            The processed frame (H, W, 3) uint8, writeable and not shared
+            with the cache.
+        """
+        from effects import compile_chain, get_caps
+
+        # Validates the chain and fails on unknown effects before any decode.
+        # Unfused, so plan steps line up with chain prefixes.
+        plan = compile_chain(effects_list, stacklevel=3, fuse=False)
+        base = (source_id(source), int(frame_number), round(float(scale), 6))
+        hashes = prefix_hashes(effects_list)
+
+        # Frames after a non-deterministic effect would freeze its randomness.
+        # Stateful effects see a fresh RenderContext on every call, so their
+        # output is repeatable, unless their state lives outside it (no state
+        # param, or an ADSR envelope tracking its trigger).
+        cacheable = len(effects_list)
+        for k, (effect, step) in enumerate(zip(effects_list, plan.steps)):
+            if (not get_caps(effect["name"])["deterministic"] or effect.get("envelope") is not None
+                    or (step.stateful and not step.wants_state)):
+                cacheable = k
+                break
+
+        start, frame = 0, None
+        for k in range(cacheable, -1, -1):
+            frame = self.get(base + (hashes[k],))
+            if frame is not None:
+                start = k
+                self.hits += 1
+                break
+        if frame is None:
+            self.misses += 1
+            frame = load_frame()
+            self.put(base + (hashes[0],), frame)
+        if start == len(effects_list):
+            return frame.copy()
+
+        for k, frame in enumerate(plan.stages(frame.copy(), start=start), start + 1):
+            if k <= cacheable:
+                self.put(base + (hashes[k],), frame)
+        # Pass-through effects return their (read-only) input as is
+        return frame.copy()
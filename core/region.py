@@ -196,26 +196,33 @@ def create_feather_mask(w: int, h: int, feather: int = 0) -> np.ndarray:
     return mask
 
 
-def apply_to_region(frame: np.ndarray, effect_fn, region_spec,
-                    feather: int = 0, **effect_params) -> np.ndarray:
-    """Apply an effect function only to a region of the frame.
+def region_geometry(region_spec, frame_height: int, frame_width: int,
+                    feather: int = 0):
+    """Resolve a region spec for one frame size, ready for composite_region.
 
-    Args:
-        frame: Input frame (H, W, 3) uint8.
-        effect_fn: Callable that takes (frame, **params) -> frame.
-        region_spec: Region specification (string, dict, tuple, or None).
-        feather: Feather radius for edge blending (0 = hard edge).
-        **effect_params: Parameters to pass to the effect function.
+    Region effects in a compiled chain resolve this once per frame size
+    instead of re-parsing the spec and rebuilding the mask every frame.
 
     Returns:
-        Frame with effect applied only in the specified region.
+        None for the full frame with a hard edge, else (x, y, w, h, mask)
+        where mask is an (h, w, 1) float32 feather mask or None.
     """
-    h, w = frame.shape[:2]
-    rx, ry, rw, rh = parse_region(region_spec, h, w)
+    rx, ry, rw, rh = parse_region(region_spec, frame_height, frame_width)
+    if rx == 0 and ry == 0 and rw == frame_width and rh == frame_height and feather == 0:
+        return None
+    mask = None
+    if feather > 0:
+        mask = create_feather_mask(rw, rh, feather)[:, :, np.newaxis]  # Broadcast to 3 channels
+    return rx, ry, rw, rh, mask
 
+
+def composite_region(frame: np.ndarray, effect_fn, geometry,
+                     **effect_params) -> np.ndarray:
+    """Apply an effect inside a region resolved by region_geometry()."""
     # Full frame — no masking needed
-    if rx == 0 and ry == 0 and rw == w and rh == h and feather == 0:
+    if geometry is None:
         return effect_fn(frame, **effect_params)
+    rx, ry, rw, rh, mask = geometry
 
     # Extract sub-region
     sub = frame[ry:ry + rh, rx:rx + rw].copy()
@@ -228,24 +235,41 @@ def apply_to_region(frame: np.ndarray, effect_fn, region_spec,
         # Effect changed dimensions — resize back
         import cv2
         processed_sub = cv2.resize(processed_sub, (rw, rh))
-    if processed_sub.dtype != np.uint8:
-        processed_sub = np.clip(processed_sub, 0, 255).astype(np.uint8)
+    if processed_sub.dtype != frame.dtype:
+        processed_sub = np.clip(processed_sub, 0, 255).astype(frame.dtype)
 
     # Composite back
     result = frame.copy()
 
-    if feather > 0:
-        mask = create_feather_mask(rw, rh, feather)
-        mask_3d = mask[:, :, np.newaxis]  # Broadcast to 3 channels
-        blended = (processed_sub.astype(np.float32) * mask_3d +
-                   sub.astype(np.float32) * (1.0 - mask_3d))
-        result[ry:ry + rh, rx:rx + rw] = np.clip(blended, 0, 255).astype(np.uint8)
+    if mask is not None:
+        blended = (processed_sub.astype(np.float32) * mask +
+                   sub.astype(np.float32) * (1.0 - mask))
+        result[ry:ry + rh, rx:rx + rw] = np.clip(blended, 0, 255).astype(frame.dtype)
     else:
         result[ry:ry + rh, rx:rx + rw] = processed_sub
 
     return result
 
 
+def apply_to_region(frame: np.ndarray, effect_fn, region_spec,
+                    feather: int = 0, **effect_params) -> np.ndarray:
+    """Apply an effect function only to a region of the frame.
+
+    Args:
+        frame: Input frame (H, W, 3) uint8.
+        effect_fn: Callable that takes (frame, **params) -> frame.
+        region_spec: Region specification (string, dict, tuple, or None).
+        feather: Feather radius for edge blending (0 = hard edge).
+        **effect_params: Parameters to pass to the effect function.
+
+    Returns:
+        Frame with effect applied only in the specified region.
+    """
+    h, w = frame.shape[:2]
+    geometry = region_geometry(region_spec, h, w, feather)
+    return composite_region(frame, effect_fn, geometry, **effect_params)
+
+
 def list_presets() -> dict:
     """Return all available region presets."""
     return REGION_PRESETS.copy()
@@ -0,0 +1,401 @@
+"""
+Entropic — Render Engine
+Decode → effects → encode as a three-stage pipeline.
+
+A decoder thread, the effect stage and an encoder thread are connected by
+bounded queues, so decoding and encoding (I/O, FFmpeg) overlap with effect
+processing, and a slow stage holds the others back instead of letting
+frames pile up. Peak memory is about one window of frames and nothing is
+staged on disk, so clip length is bounded only by the encoder. Frame
+numbering runs continuously, so temporal effects (stutter, feedback,
+delay...) keep their state for the whole render.
+
+The effect stage runs in the calling thread, or for chains with no stateful
+effects, frame-parallel on a process pool (render_chain); frames travel to
+the workers through a shared memory-mapped slot file rather than being
+pickled, and come back in order. Starting workers (each importing the
+package and compiling its own plan) costs more than short renders gain, so
+the pool only starts from PARALLEL_MIN_FRAMES frames up, with at most
+MAX_AUTO_WORKERS workers. ENTROPIC_RENDER_WORKERS overrides the worker count
+for every render (1 = always serial).
+"""
+
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from effects import compile_chain, is_stateless_chain
+
+DEFAULT_WINDOW_FRAMES = 32  # ~200MB of 1080p RGB in flight at most
+CUBE_MIN_FRAMES = 300  # Renders long enough to amortize building an RGB cube LUT
+PARALLEL_MIN_FRAMES = 300  # Renders long enough to amortize starting worker processes
+MAX_AUTO_WORKERS = 8  # Default worker cap: more rarely pays off against decode/encode
+
+_END = object()  # Queue sentinel: no more frames
+
+
+class RenderCancelled(RuntimeError):
+    """The render was stopped through its cancel event."""
+
+
+def iter_windows(frames, size: int = DEFAULT_WINDOW_FRAMES):
+    """Group an iterable of frames into lists of at most `size` frames."""
+    size = max(1, int(size))
+    frames = iter(frames)
+    while True:
+        window = list(islice(frames, size))
+        if not window:
+            return
+        yield window
+
+
+def chain_processor(
+    effects: list[dict],
+    total_frames: int,
+    mix: float = 1.0,
+    automation=None,
+    frame_offset: int = 0,
+    working_format: str | None = None,
+):
+    """Build a process(frame, frame_index) callable for an effect chain.
+
+    Args:
+        effects: Effect chain list.
+        total_frames: Frames in this render (passed to temporal effects).
+        mix: Wet/dry blend of the whole chain (0.0 = original, 1.0 = processed).
+        automation: Optional AutomationSession; looked up by source frame.
+        frame_offset: Source frame number of render frame 0 (for automation
+            lanes, which are keyed to the source timeline).
+        working_format: Format frames travel in between effects ("uint8" or
+            "float32", see effects.formats). None = default_working_format().
+
+    Returns:
+        Callable taking (frame, frame_index, chain=None) and returning the
+        processed frame; chain is an automated variant of `effects` to run
+        instead (None = look it up in `automation`). Its `pool` attribute is
+        the render's BufferPool (effects.buffers).
+    """
+    from effects.formats import default_working_format
+
+    mix = max(0.0, min(1.0, mix))
+    if working_format is None:
+        working_format = default_working_format()
+    # Resolved once; only frames with automated param changes recompile.
+    # Recompiled variants share the plan's RenderContext (this render's state)
+    # and skip the RGB cube, which would be rebuilt for every such frame.
+    plan = compile_chain(effects, cube=total_frames >= CUBE_MIN_FRAMES, working_format=working_format)
+
+    def process(frame: np.ndarray, frame_index: int, chain: list[dict] | None = None) -> np.ndarray:
+        if not effects:
+            return frame
+        run = plan
+        if chain is None and automation:
+            chain = automation.apply_to_chain(effects, frame_offset + frame_index)
+        if chain is not None and chain is not effects:
+            run = compile_chain(chain, context=plan.context, working_format=working_format)
+        original = frame if mix < 1.0 else None  # Effects never write to their input
+        frame = run(frame, frame_index, total_frames)
+        if original is not None:
+            frame = np.clip(
+                original.astype(float) * (1 - mix) + frame.astype(float) * mix,
+                0, 255
+            ).astype(np.uint8)
+        return frame
+
+    process.pool = plan.context.pool
+    return process
+
+
+def render_frames(
+    frames,
+    process,
+    writer,
+    window: int = DEFAULT_WINDOW_FRAMES,
+    progress=None,
+    cancel: threading.Event | None = None,
+) -> int:
+    """Run frames through `process` and into `writer`, pipelined.
+
+    Args:
+        frames: Iterable of (H, W, 3) uint8 frames (e.g. iter_frames(...)).
+        process: Callable (frame, frame_index) -> frame. frame_index counts
+            from 0 across the whole render.
+        writer: Object with write(frame), e.g. a FrameWriter.
+        window: Frames in flight between the stages (and between progress
+            reports).
+        progress: Optional callable(frames_done) invoked every `window`
+            frames and at the end (from the encoder thread).
+        cancel: Optional event; setting it stops all stages and raises
+            RenderCancelled.
+
+    Returns:
+        Number of frames written.
+    """
+    def stage(decoded):
+        for i, frame in enumerate(decoded):
+            yield process(frame, i)
+
+    return _pipeline(frames, stage, writer, window, progress, cancel)
+
+
+def _pipeline(frames, stage, writer, window, progress, cancel) -> int:
+    """Decoder thread -> stage(frames) in this thread -> encoder thread.
+
+    The first error from any stage stops the others and is re-raised here;
+    the decoder is always closed and both threads joined before returning.
+    """
+    window = max(1, int(window))
+    depth = max(1, window // 2)  # Two queues: ~one window in flight
+    decoded = queue.Queue(depth)
+    encoded = queue.Queue(depth)
+    stop = threading.Event()
+    errors = []
+    done = [0]
+    finished = [False]
+
+    def halted() -> bool:
+        return stop.is_set() or (cancel is not None and cancel.is_set())
+
+    def put(q, item) -> bool:
+        while not halted():
+            try:
+                q.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(q):
+        while not halted():
+            try:
+                return q.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        return _END
+
+    def fail(exc):
+        errors.append(exc)
+        stop.set()
+
+    def decode():
+        try:
+            for frame in frames:
+                if not put(decoded, frame):
+                    return
+            put(decoded, _END)
+        except BaseException as exc:
+            fail(exc)
+        finally:
+            # Closed from this thread: the generator may be mid-iteration
+            close = getattr(frames, "close", None)
+            if close is not None:
+                close()
+
+    def encode():
+        try:
+            while True:
+                frame = get(encoded)
+                if frame is _END:
+                    break
+                writer.write(frame)
+                done[0] += 1
+                if progress is not None and done[0] % window == 0:
+                    progress(done[0])
+            if not halted():
+                finished[0] = True
+                if progress is not None and done[0] % window:
+                    progress(done[0])
+        except BaseException as exc:
+            fail(exc)
+
+    def source():
+        while True:
+            frame = get(decoded)
+            if frame is _END:
+                return
+            yield frame
+
+    frames = iter(frames)
+    decoder = threading.Thread(target=decode, name="entropic-decode", daemon=True)
+    encoder = threading.Thread(target=encode, name="entropic-encode", daemon=True)
+    decoder.start()
+    encoder.start()
+    outputs = stage(source())
+    try:
+        for frame in outputs:
+            if not put(encoded, frame):
+                break
+        else:
+            put(encoded, _END)
+    except BaseException as exc:
+        fail(exc)
+    finally:
+        outputs.close()
+        if errors or halted():
+            stop.set()
+        encoder.join()
+        stop.set()
+        decoder.join()
+
+    if errors:
+        raise errors[0]
+    if not finished[0]:
+        raise RenderCancelled(f"Render cancelled after {done[0]} frames")
+    return done[0]
+
+
+def render_workers(total_frames: int | None = None) -> int:
+    """Worker processes for a parallel render of total_frames frames.
+
+    ENTROPIC_RENDER_WORKERS overrides (1 = serial). Otherwise renders of
+    PARALLEL_MIN_FRAMES or more get one worker per core, up to
+    MAX_AUTO_WORKERS, and shorter (or unknown-length) renders run serially.
+    """
+    try:
+        return max(1, int(os.environ.get("ENTROPIC_RENDER_WORKERS", "")))
+    except ValueError:
+        pass
+    if total_frames is None or total_frames < PARALLEL_MIN_FRAMES:
+        return 1
+    return max(1, min(os.cpu_count() or 1, MAX_AUTO_WORKERS))
+
+
+# Worker side: the slot file stays mapped and the chain compiled for the
+# life of the worker process
+_worker_slots = {}
+_worker_render = {}
+
+
+def _init_worker(effects, total_frames, mix, working_format):
+    _worker_render["process"] = chain_processor(effects, total_frames, mix=mix, working_format=working_format)
+
+
+def _process_slot(path, shape, slot, chain, frame_index):
+    """Run one frame through the chain in a worker, in place in its slot.
+
+    chain is None for the render's own chain, or an automated variant.
+
+    Returns:
+        (frame, buffer high-water bytes); frame is None when written to the slot.
+    """
+    slots = _worker_slots.get(path)
+    if slots is None:
+        _worker_slots.clear()
+        slots = _worker_slots[path] = np.memmap(path, dtype=np.uint8, mode="r+", shape=shape)
+    frame = np.array(slots[slot])
+    process = _worker_render["process"]
+    out = process(frame, frame_index, chain)
+    high_water = process.pool.high_water_bytes
+    if out.shape == frame.shape and out.dtype == np.uint8:
+        slots[slot] = out
+        return None, high_water
+    return out, high_water
+
+
+def render_chain(
+    frames,
+    effects: list[dict],
+    total_frames: int,
+    writer,
+    mix: float = 1.0,
+    automation=None,
+    frame_offset: int = 0,
+    workers: int | None = None,
+    window: int = DEFAULT_WINDOW_FRAMES,
+    progress=None,
+    cancel: threading.Event | None = None,
+    stats: dict | None = None,
+) -> int:
+    """Render an effect chain through the decode → effects → encode pipeline.
+
+    Stateless chains spread the effect stage over a process pool; output
+    order is the input order and each frame keeps its own frame_index, so
+    seeded effects (seed + frame_index) match a serial render exactly.
+    Chains with stateful effects, or a single worker, process frames in
+    order in the calling thread.
+
+    Args:
+        frames: Iterable of (H, W, 3) uint8 frames.
+        effects: Effect chain list.
+        total_frames: Frames in this render (passed to temporal effects).
+        writer: Object with write(frame), e.g. a FrameWriter.
+        mix: Wet/dry blend of the whole chain.
+        automation: Optional AutomationSession (resolved per frame here).
+        frame_offset: Source frame number of render frame 0.
+        workers: Worker processes. None = render_workers(total_frames).
+        window: Frames in flight between stages and between progress reports.
+        progress: Optional callable(frames_done).
+        cancel: Optional event that stops the render (RenderCancelled).
+        stats: Optional dict; gets "buffer_high_water_bytes", the peak
+            memory held in intermediate frame buffers by one effect stage
+            (per worker for parallel renders), for sizing worker counts.
+
+    Returns:
+        Number of frames written.
+    """
+    if stats is None:
+        stats = {}
+    stats["buffer_high_water_bytes"] = 0
+    workers = render_workers(total_frames) if workers is None else max(1, int(workers))
+    if workers == 1 or not effects or not is_stateless_chain(effects):
+        process = chain_processor(effects, total_frames, mix=mix, automation=automation, frame_offset=frame_offset)
+        try:
+            return render_frames(frames, process, writer, window=window, progress=progress, cancel=cancel)
+        finally:
+            stats["buffer_high_water_bytes"] = process.pool.high_water_bytes
+
+    from effects.formats import default_working_format
+
+    mix = max(0.0, min(1.0, mix))
+    working_format = default_working_format()
+
+    def stage(decoded):
+        from core.frame_store import FrameStore
+
+        store = None
+        pending = deque()  # (slot, future), oldest first
+        free = []
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(effects, total_frames, mix, working_format),
+        )
+        try:
+            for i, frame in enumerate(decoded):
+                if store is None:
+                    # Two frames in flight per worker keeps every core busy
+                    slot_count = workers * 2
+                    store = FrameStore.create(slot_count, frame.shape[0], frame.shape[1])
+                    free = list(range(slot_count))
+                    shape = (store.capacity, store.height, store.width, 3)
+                if not free:
+                    yield _collect_oldest(pending, free, store, stats)
+                slot = free.pop(0)
+                store.write_slot(slot, frame)
+                chain = automation.apply_to_chain(effects, frame_offset + i) if automation else effects
+                pending.append((slot, pool.submit(
+                    _process_slot, str(store.path), shape, slot,
+                    None if chain is effects else chain, i,
+                )))
+            while pending:
+                yield _collect_oldest(pending, free, store, stats)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            if store is not None:
+                store.close()
+
+    return _pipeline(frames, stage, writer, window, progress, cancel)
+
+
+def _collect_oldest(pending, free, store, stats) -> np.ndarray:
+    """Wait for the oldest in-flight frame and free its slot."""
+    slot, future = pending.popleft()
+    out, high_water = future.result()
+    stats["buffer_high_water_bytes"] = max(stats["buffer_high_water_bytes"], high_water)
+    frame = store.slot_view(slot).copy() if out is None else out
+    free.append(slot)
+    return frame
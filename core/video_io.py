@@ -4,9 +4,12 @@ Handles frame extraction (video → numpy arrays) and reassembly (arrays → vid
 Uses FFmpeg subprocess for codec work. Preserves audio.
 """
 
+import os
+import bisect
 import subprocess
 import shutil
 import tempfile
+import threading
 import json
 from pathlib import Path
 
@@ -30,9 +33,70 @@ def get_ffprobe():
     return path
 
 
-def probe_video(video_path: str) -> dict:
-    """Get video metadata: resolution, fps, duration, has_audio."""
+# Probe results keyed by file identity: (realpath, size, mtime_ns).
+# An edited or replaced file gets a new key, so entries never go stale.
+_PROBE_CACHE: dict[tuple, dict] = {}
+_PROBE_CACHE_MAX = 256
+_PROBE_CACHE_FILE = "probe_cache.json"
+_probe_lock = threading.Lock()
+
+
+def _probe_key(video_path: str) -> tuple[str, int, int]:
+    real = os.path.realpath(video_path)
+    st = os.stat(real)
+    return real, st.st_size, st.st_mtime_ns
+
+
+def _load_probe_store(cache_dir: Path) -> dict:
+    try:
+        return json.loads((cache_dir / _PROBE_CACHE_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_probe_store(cache_dir: Path, store: dict):
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = cache_dir / f".{_PROBE_CACHE_FILE}.tmp"
+    tmp.write_text(json.dumps(store, indent=2))
+    os.replace(tmp, cache_dir / _PROBE_CACHE_FILE)
+
+
+def clear_probe_cache():
+    """Drop all in-memory probe results and frame indexes."""
+    with _probe_lock:
+        _PROBE_CACHE.clear()
+        _INDEX_CACHE.clear()
+
+
+def probe_video(video_path: str, cache_dir: str | None = None) -> dict:
+    """Get video metadata: resolution, fps, duration, has_audio.
+
+    Results are cached in memory by (realpath, size, mtime), so repeated
+    probes of the same file skip the ffprobe process entirely.
+
+    Args:
+        video_path: Path to input video.
+        cache_dir: Optional directory (e.g. a project dir) for a persistent
+            probe_cache.json that survives restarts.
+    """
     video_path = str(video_path)
+    try:
+        key = _probe_key(video_path)
+    except OSError:
+        key = None  # Let ffprobe report the missing file
+
+    if key is not None:
+        with _probe_lock:
+            cached = _PROBE_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
+        if cache_dir is not None:
+            stored = _load_probe_store(Path(cache_dir)).get(key[0])
+            if stored and [stored["size"], stored["mtime_ns"]] == [key[1], key[2]]:
+                with _probe_lock:
+                    _PROBE_CACHE[key] = stored["info"]
+                return dict(stored["info"])
+
     cmd = [
         get_ffprobe(),
         "-v", "quiet",
@@ -58,9 +122,17 @@ def probe_video(video_path: str) -> dict:
     fps_parts = video_stream.get("r_frame_rate", "30/1").split("/")
     fps = float(fps_parts[0]) / float(fps_parts[1]) if len(fps_parts) == 2 else 30.0
 
-    return {
-        "width": int(video_stream["width"]),
-        "height": int(video_stream["height"]),
+    # FFmpeg auto-rotates on decode, so report the displayed dimensions
+    width, height = int(video_stream["width"]), int(video_stream["height"])
+    rotation = video_stream.get("tags", {}).get("rotate", 0)
+    for side_data in video_stream.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+    if int(float(rotation)) % 180 != 0:
+        width, height = height, width
+
+    info = {
+        "width": width,
+        "height": height,
         "fps": fps,
         "duration": float(data.get("format", {}).get("duration", 0)),
         "has_audio": has_audio,
@@ -68,10 +140,125 @@ def probe_video(video_path: str) -> dict:
         "total_frames": int(float(data.get("format", {}).get("duration", 0)) * fps),
     }
 
+    if key is not None:
+        with _probe_lock:
+            if len(_PROBE_CACHE) >= _PROBE_CACHE_MAX:
+                _PROBE_CACHE.pop(next(iter(_PROBE_CACHE)))
+            _PROBE_CACHE[key] = info
+            if cache_dir is not None:
+                store = _load_probe_store(Path(cache_dir))
+                store[key[0]] = {"size": key[1], "mtime_ns": key[2], "info": info}
+                try:
+                    _save_probe_store(Path(cache_dir), store)
+                except OSError:
+                    pass  # Persistent cache is best-effort
+
+    return dict(info)
+
+
+# Frame indexes keyed like the probe cache: (realpath, size, mtime_ns)
+_INDEX_CACHE: dict[tuple, dict] = {}
+_INDEX_CACHE_MAX = 32
+
+
+def load_frame_index(video_path: str, cache_dir: str | None = None) -> dict:
+    """Per-video index of frame presentation times and keyframes.
+
+    Built once from the container's packet table (demux only, no decode) and
+    cached in memory. With cache_dir, it is also stored as a sidecar
+    <video name>.frameindex.json so it survives restarts.
+
+    Args:
+        video_path: Path to input video.
+        cache_dir: Optional directory for the sidecar file.
+
+    Returns:
+        {"pts": [...], "keyframes": [...], "start": float} where pts[n] is
+        frame n's presentation time in seconds relative to the first frame
+        (whose absolute timestamp is start), and keyframes lists frame
+        numbers that start a decodable GOP (ascending). len(pts) is the
+        exact frame count.
+    """
+    video_path = str(video_path)
+    key = _probe_key(video_path)
+    with _probe_lock:
+        cached = _INDEX_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    sidecar = None
+    if cache_dir is not None:
+        sidecar = Path(cache_dir) / f"{Path(key[0]).name}.frameindex.json"
+        try:
+            stored = json.loads(sidecar.read_text())
+            if [stored["size"], stored["mtime_ns"]] == [key[1], key[2]]:
+                index = {k: stored[k] for k in ("pts", "keyframes", "start")}
+                with _probe_lock:
+                    _INDEX_CACHE[key] = index
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+
+    cmd = [
+        get_ffprobe(),
+        "-v", "quiet",
+        "-select_streams", "v:0",
+        "-show_packets",
+        "-show_entries", "packet=pts_time,flags",
+        "-print_format", "json",
+        video_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=120)
+    packets = json.loads(result.stdout).get("packets", [])
+
+    frames = []
+    for packet in packets:
+        flags = packet.get("flags", "")
+        pts_time = packet.get("pts_time", "N/A")
+        if pts_time == "N/A" or "D" in flags:
+            continue  # No timestamp, or dropped by an edit list
+        frames.append((float(pts_time), "K" in flags))
+    frames.sort()
+
+    origin = frames[0][0] if frames else 0.0
+    pts = [round(t - origin, 6) for t, _ in frames]
+    keyframes = [n for n, (_, is_key) in enumerate(frames) if is_key]
+    if not keyframes or keyframes[0] != 0:
+        keyframes.insert(0, 0)  # Decoding always starts from the top
+    index = {"pts": pts, "keyframes": keyframes, "start": origin}
+
+    with _probe_lock:
+        if len(_INDEX_CACHE) >= _INDEX_CACHE_MAX:
+            _INDEX_CACHE.pop(next(iter(_INDEX_CACHE)))
+        _INDEX_CACHE[key] = index
+    if sidecar is not None:
+        try:
+            sidecar.parent.mkdir(parents=True, exist_ok=True)
+            sidecar.write_text(json.dumps({"size": key[1], "mtime_ns": key[2], **index}))
+        except OSError:
+            pass  # Sidecar is best-effort
+
+    return index
+
+
+def scaled_size(info: dict, scale: float) -> tuple[int, int]:
+    """Output (width, height) for a decode at the given scale factor."""
+    w, h = info["width"], info["height"]
+    if scale < 1.0:
+        w = int(w * scale)
+        h = int(h * scale)
+        # Ensure even dimensions (required by most codecs)
+        w = w + (w % 2)
+        h = h + (h % 2)
+    return w, h
+
 
 def extract_frames(video_path: str, output_dir: str, scale: float = 1.0) -> list[Path]:
     """Extract all frames from video as PNG files.
 
+    Stages the whole clip on disk; renders stream through iter_frames()
+    and core.render instead, which have no clip-length limit.
+
     Args:
         video_path: Path to input video.
         output_dir: Directory to write frame PNGs.
@@ -87,12 +274,7 @@ def extract_frames(video_path: str, output_dir: str, scale: float = 1.0) -> list
     cmd = [get_ffmpeg(), "-i", video_path]
 
     if scale < 1.0:
-        info = probe_video(video_path)
-        w = int(info["width"] * scale)
-        h = int(info["height"] * scale)
-        # Ensure even dimensions (required by most codecs)
-        w = w + (w % 2)
-        h = h + (h % 2)
+        w, h = scaled_size(probe_video(video_path), scale)
         cmd += ["-vf", f"scale={w}:{h}"]
 
     cmd += [
@@ -105,16 +287,181 @@ def extract_frames(video_path: str, output_dir: str, scale: float = 1.0) -> list
     frames = sorted(output_dir.glob("frame_*.png"))
     if not frames:
         raise RuntimeError(f"No frames extracted from {video_path}")
-
-    MAX_FRAMES = 3000
-    if len(frames) > MAX_FRAMES:
-        raise RuntimeError(
-            f"Video has {len(frames)} frames (max {MAX_FRAMES}). "
-            f"Use a shorter clip or lower resolution."
-        )
     return frames
 
 
+def _read_exact(stream, n: int) -> bytearray | None:
+    """Read exactly n bytes from a pipe. Returns None on EOF/short read."""
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        chunk = stream.readinto(view[got:])
+        if not chunk:
+            return None
+        got += chunk
+    return buf
+
+
+def iter_frames(
+    video_path: str,
+    scale: float = 1.0,
+    start: int = 0,
+    end: int | None = None,
+):
+    """Stream decoded frames from video as numpy arrays (no temp files).
+
+    FFmpeg decodes to rawvideo rgb24 on a stdout pipe; each frame is read
+    straight into its own (H, W, 3) uint8 buffer.
+
+    Args:
+        video_path: Path to input video.
+        scale: Resolution scale factor (1.0 = original, 0.5 = half).
+        start: First frame number to decode (0-indexed, inclusive).
+        end: Stop before this frame number (exclusive). None = end of video.
+
+    Yields:
+        (H, W, 3) uint8 RGB frames, in order.
+    """
+    video_path = str(video_path)
+    info = probe_video(video_path)
+    w, h = scaled_size(info, scale)
+    start = max(0, int(start))
+
+    cmd = [get_ffmpeg(), "-v", "error"]
+    if start > 0:
+        # Accurate seek to half a frame before the indexed timestamp: FFmpeg
+        # decodes from the previous keyframe and drops everything earlier
+        pts = load_frame_index(video_path)["pts"]
+        if start < len(pts):
+            half = (pts[1] - pts[0]) / 2 if len(pts) > 1 else 0.5 / info["fps"]
+            cmd += ["-ss", f"{max(0.0, pts[start] - half):.6f}"]
+        else:
+            cmd += ["-ss", str(start / info["fps"])]
+    cmd += ["-i", video_path]
+    if end is not None:
+        cmd += ["-frames:v", str(max(0, int(end) - start))]
+    if scale < 1.0:
+        cmd += ["-vf", f"scale={w}:{h}"]
+    cmd += [
+        "-vsync", "0",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "pipe:1",
+    ]
+
+    frame_bytes = w * h * 3
+    # stderr goes to a temp file so a chatty decoder can never fill the pipe
+    errlog = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errlog)
+    count = 0
+    try:
+        while True:
+            buf = _read_exact(proc.stdout, frame_bytes)
+            if buf is None:
+                break
+            count += 1
+            yield np.frombuffer(buf, dtype=np.uint8).reshape(h, w, 3)
+
+        if proc.wait(timeout=30) != 0 and count == 0:
+            errlog.seek(0)
+            detail = errlog.read().decode(errors="replace").strip()[-500:]
+            raise RuntimeError(f"No frames extracted from {video_path}: {detail}")
+    finally:
+        # Consumer may stop early — don't leave FFmpeg blocked on a full pipe
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait(timeout=30)
+        errlog.close()
+
+
+class DecoderSession:
+    """Long-lived decoder for one source that remembers its position.
+
+    Keeps one FFmpeg rawvideo pipe open between requests. Asking for the
+    same frame again or for a frame a little ahead decodes forward from the
+    current position, with no new process and no seek. Jumping backwards,
+    or past the next keyframe, restarts the pipe at the target frame.
+
+    Usage:
+        session = DecoderSession("in.mp4")
+        frame = session.read(120)
+        frame = session.read(121)   # decoded forward, same process
+        session.close()
+
+    Args:
+        video_path: Path to input video.
+        scale: Resolution scale factor (1.0 = original, 0.5 = half).
+        cache_dir: Optional directory for persistent probe/index caches.
+    """
+
+    def __init__(self, video_path: str, scale: float = 1.0, cache_dir: str | None = None):
+        self.video_path = str(video_path)
+        self.scale = scale
+        self.info = probe_video(self.video_path, cache_dir=cache_dir)
+        index = load_frame_index(self.video_path, cache_dir=cache_dir)
+        self.total_frames = max(1, len(index["pts"]))
+        self._keyframes = index["keyframes"]
+        self._frames = None
+        self._pos = 0  # Frame number the pipe will yield next
+        self._last = None  # (frame_number, array) most recently decoded
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _restart(self, frame_number: int):
+        if self._frames is not None:
+            self._frames.close()
+        self._frames = iter_frames(self.video_path, scale=self.scale, start=frame_number)
+        self._pos = frame_number
+
+    def _should_restart(self, frame_number: int) -> bool:
+        if self._frames is None or frame_number < self._pos:
+            return True
+        # A seek lands on the target's keyframe; only decode forward when
+        # that keyframe is no further along than where the pipe already is
+        key = self._keyframes[bisect.bisect_right(self._keyframes, frame_number) - 1]
+        return key > self._pos
+
+    def read(self, frame_number: int) -> np.ndarray:
+        """Return frame `frame_number` (clamped to the valid range) as (H, W, 3) uint8."""
+        frame_number = max(0, min(int(frame_number), self.total_frames - 1))
+        with self._lock:
+            if self._last is not None and self._last[0] == frame_number:
+                return self._last[1].copy()
+            if self._should_restart(frame_number):
+                self._restart(frame_number)
+
+            frame = None
+            while self._pos <= frame_number:
+                frame = next(self._frames, None)
+                if frame is None:
+                    break
+                self._pos += 1
+            if frame is None:
+                # Decoder ran out before the indexed frame count
+                self._frames.close()
+                self._frames = None
+                raise RuntimeError(f"Could not decode frame {frame_number} from {self.video_path}")
+
+            self._last = (frame_number, frame)
+            return frame.copy()
+
+    def close(self):
+        """Stop the decoder process."""
+        with self._lock:
+            if self._frames is not None:
+                self._frames.close()
+                self._frames = None
+            self._last = None
+
+
 def load_frame(frame_path: str) -> np.ndarray:
     """Load a frame PNG as a numpy array (H, W, 3) uint8 RGB."""
     img = Image.open(str(frame_path)).convert("RGB")
@@ -127,59 +474,195 @@ def save_frame(array: np.ndarray, output_path: str):
     img.save(str(output_path))
 
 
-def reassemble_video(
-    frames_dir: str,
-    output_path: str,
-    fps: float,
-    audio_source: str | None = None,
-    quality: str = "lo",
-) -> Path:
-    """Reassemble frames into a video file.
-
-    Args:
-        frames_dir: Directory containing frame_XXXXXX.png files.
-        output_path: Output video file path.
-        fps: Frames per second.
-        audio_source: Original video to copy audio from (or None).
-        quality: 'lo' (480p h264), 'mid' (720p h264), 'hi' (prores 422).
-
-    Returns:
-        Path to output video.
-    """
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+# Encoder arguments for the legacy quality tiers
+QUALITY_PRESETS = {
+    "lo": ["-c:v", "libx264", "-crf", "28", "-preset", "fast", "-pix_fmt", "yuv420p"],
+    "mid": ["-c:v", "libx264", "-crf", "23", "-preset", "medium", "-pix_fmt", "yuv420p"],
+    "hi": ["-c:v", "prores_ks", "-profile:v", "2", "-pix_fmt", "yuv422p10le"],
+}
 
-    cmd = [
-        get_ffmpeg(),
-        "-y",
-        "-framerate", str(fps),
-        "-i", str(Path(frames_dir) / "frame_%06d.png"),
-    ]
 
-    # Add audio from original
-    if audio_source:
-        cmd += ["-i", str(audio_source), "-map", "0:v", "-map", "1:a?", "-shortest"]
+class FrameWriter:
+    """Encode numpy frames to a video file through one long-lived FFmpeg process.
 
-    # Quality presets
-    if quality == "hi":
-        cmd += ["-c:v", "prores_ks", "-profile:v", "2", "-pix_fmt", "yuv422p10le"]
-        if str(output_path).endswith(".mp4"):
-            output_path = output_path.with_suffix(".mov")
-    elif quality == "mid":
-        cmd += ["-c:v", "libx264", "-crf", "23", "-preset", "medium", "-pix_fmt", "yuv420p"]
-    else:  # lo
-        cmd += ["-c:v", "libx264", "-crf", "28", "-preset", "fast", "-pix_fmt", "yuv420p"]
+    Frames are written to FFmpeg's stdin as rawvideo rgb24, so encoding runs
+    alongside effect processing and nothing is staged on disk. FFmpeg is
+    started lazily on the first frame (dimensions come from its shape).
 
-    if audio_source:
-        cmd += ["-c:a", "aac", "-b:a", "192k"]
+    Usage:
+        with FrameWriter("out.mp4", fps=30, audio_source="in.mp4") as writer:
+            for frame in frames:
+                writer.write(frame)
+        print(writer.output_path)
 
-    cmd.append(str(output_path))
-    subprocess.run(cmd, capture_output=True, check=True, timeout=600)
+    Args:
+        output_path: Output file (or an image pattern such as frame_%06d.png).
+        fps: Input frame rate of the written frames.
+        audio_source: Video to mux audio from (or None).
+        quality: 'lo' (h264 crf28), 'mid' (h264 crf23), 'hi' (ProRes 422).
+            Ignored when video_args is given.
+        video_args: Explicit video encoder args (e.g. ["-c:v", "libvpx-vp9", ...]).
+        audio_args: Audio encoder args used when audio_source is set.
+        vf: Optional FFmpeg filter graph applied before encoding. With
+            extra_inputs it is used as a -filter_complex graph (frames are
+            [0:v], extra inputs [1:v], [2:v]...).
+        extra_inputs: Additional input files (e.g. a GIF palette image).
+        output_args: Extra args placed just before the output path (-r, -loop, ...).
+        audio_offset: Seconds into audio_source where the audio should start.
+        timeout: Seconds to wait for FFmpeg to finish after the last frame.
+    """
 
-    if not output_path.exists():
-        raise RuntimeError(f"Failed to create output video: {output_path}")
+    def __init__(
+        self,
+        output_path: str,
+        fps: float,
+        audio_source: str | None = None,
+        quality: str = "lo",
+        video_args: list[str] | None = None,
+        audio_args: list[str] | None = None,
+        vf: str | None = None,
+        extra_inputs: list[str] | None = None,
+        output_args: list[str] | None = None,
+        audio_offset: float = 0.0,
+        timeout: float = 600,
+    ):
+        output_path = Path(output_path)
+        if video_args is None:
+            video_args = QUALITY_PRESETS.get(quality, QUALITY_PRESETS["lo"])
+            if quality == "hi" and output_path.suffix == ".mp4":
+                output_path = output_path.with_suffix(".mov")
+        if audio_args is None:
+            audio_args = ["-c:a", "aac", "-b:a", "192k"]
+
+        self.output_path = output_path
+        self.fps = fps
+        self.audio_source = str(audio_source) if audio_source else None
+        self.video_args = list(video_args)
+        self.audio_args = list(audio_args)
+        self.vf = vf
+        self.extra_inputs = [str(p) for p in extra_inputs or []]
+        self.output_args = list(output_args or [])
+        self.audio_offset = max(0.0, float(audio_offset))
+        self.timeout = timeout
+        self.frame_count = 0
+        self._shape = None
+        self._proc = None
+        self._errlog = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def _build_cmd(self, width: int, height: int) -> list[str]:
+        cmd = [
+            get_ffmpeg(),
+            "-y",
+            "-v", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}",
+            "-framerate", str(self.fps),
+            "-i", "pipe:0",
+        ]
+        for path in self.extra_inputs:
+            cmd += ["-i", path]
+        if self.audio_source:
+            audio_input = 1 + len(self.extra_inputs)
+            if self.audio_offset > 0:
+                cmd += ["-ss", str(self.audio_offset)]
+            cmd += ["-i", self.audio_source, "-map", "0:v", "-map", f"{audio_input}:a?", "-shortest"]
+        if self.vf:
+            cmd += ["-filter_complex" if self.extra_inputs else "-vf", self.vf]
+        cmd += self.video_args
+        if self.audio_source:
+            cmd += self.audio_args
+        cmd += self.output_args
+        cmd.append(str(self.output_path))
+        return cmd
+
+    def _start(self, width: int, height: int):
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        # stderr goes to a temp file so a chatty encoder can never fill the pipe
+        self._errlog = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(
+            self._build_cmd(width, height),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._errlog,
+        )
 
-    return output_path
+    def _stderr_tail(self) -> str:
+        if self._errlog is None:
+            return ""
+        self._errlog.seek(0)
+        return self._errlog.read().decode(errors="replace").strip()[-500:]
+
+    def write(self, frame: np.ndarray):
+        """Send one (H, W, 3) frame to the encoder."""
+        if frame.dtype != np.uint8:
+            frame = np.clip(frame, 0, 255).astype(np.uint8)
+        if frame.ndim != 3 or frame.shape[2] != 3:
+            raise ValueError(f"Expected (H, W, 3) RGB frame, got shape {frame.shape}")
+        if self._shape is None:
+            self._shape = frame.shape
+            self._start(frame.shape[1], frame.shape[0])
+        elif frame.shape != self._shape:
+            raise ValueError(
+                f"Frame {self.frame_count} has shape {frame.shape}, "
+                f"expected {self._shape} (all frames must match)"
+            )
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            self._proc.wait(timeout=self.timeout)
+            raise RuntimeError(f"FFmpeg encoder exited early: {self._stderr_tail()}")
+        self.frame_count += 1
+
+    def close(self) -> Path:
+        """Finish encoding and wait for FFmpeg. Returns the output path."""
+        if self._closed:
+            return self.output_path
+        if self._proc is None:
+            raise RuntimeError(f"No frames written to {self.output_path}")
+        try:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            code = self._proc.wait(timeout=self.timeout)
+            if code != 0:
+                raise RuntimeError(f"Failed to create output video: {self._stderr_tail()}")
+        finally:
+            if self._proc.poll() is None:
+                self._proc.kill()
+                self._proc.wait(timeout=30)
+            self._errlog.close()
+            self._proc = None
+            self._closed = True
+        return self.output_path
+
+    def abort(self):
+        """Stop FFmpeg without finishing the file and remove partial output."""
+        self._closed = True
+        if self._proc is None:
+            return
+        self._proc.kill()
+        try:
+            self._proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._proc.wait(timeout=30)
+        self._errlog.close()
+        self._proc = None
+        if "%" not in self.output_path.name:
+            self.output_path.unlink(missing_ok=True)
 
 
 def clip_video(
@@ -238,28 +721,168 @@ def clip_video(
     return output_path
 
 
-def extract_single_frame(video_path: str, frame_number: int = 0) -> np.ndarray:
-    """Extract a single frame as numpy array. Fast — doesn't decode entire video."""
+def extract_single_frame(
+    video_path: str,
+    frame_number: int = 0,
+    cache_dir: str | None = None,
+) -> np.ndarray:
+    """Extract a single frame as numpy array. Fast — doesn't decode entire video.
+
+    Uses the frame index to seek straight to the keyframe at or before the
+    requested frame, then decodes forward only as far as that exact frame.
+
+    Args:
+        video_path: Path to input video.
+        frame_number: 0-indexed frame number (clamped to the valid range).
+        cache_dir: Optional directory for persistent probe/index caches.
+    """
     video_path = str(video_path)
-    info = probe_video(video_path)
+    info = probe_video(video_path, cache_dir=cache_dir)
+    index = load_frame_index(video_path, cache_dir=cache_dir)
+    pts, keyframes = index["pts"] or [0.0], index["keyframes"]
     # Clamp frame number to valid range
-    total = max(1, info.get("total_frames", 1))
-    frame_number = max(0, min(frame_number, total - 1))
-    timestamp = frame_number / info["fps"]
+    total = len(pts)
+    frame_number = max(0, min(int(frame_number), total - 1))
+    key = keyframes[bisect.bisect_right(keyframes, frame_number) - 1]
+
+    # Half a frame either side of a timestamp: robust to rounding in pts_time
+    half = (pts[1] - pts[0] if len(pts) > 1 else 1.0 / info["fps"]) / 2
+
+    # Seek just past the keyframe without accurate-seek trimming, so the
+    # demuxer lands on that keyframe (or earlier, for containers without a
+    # seek index), then keep timestamps intact and select the exact frame.
+    cmd = [get_ffmpeg(), "-v", "error", "-copyts"]
+    if key > 0:
+        cmd += ["-noaccurate_seek", "-ss", f"{pts[key] + half:.6f}"]
+    cmd += [
+        "-i", video_path,
+        "-vf", f"select=gte(t\\,{index['start'] + pts[frame_number] - half:.6f})",
+        "-frames:v", "1",
+        "-vsync", "0",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "pipe:1",
+    ]
 
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-        tmp_path = tmp.name
+    # Frame comes back on stdout: no temp file to clean up on any path
+    result = subprocess.run(cmd, capture_output=True, check=True, timeout=30)
+    w, h = info["width"], info["height"]
+    if len(result.stdout) < w * h * 3:
+        raise RuntimeError(f"Could not decode frame {frame_number} from {video_path}")
+    return np.frombuffer(bytearray(result.stdout[:w * h * 3]), dtype=np.uint8).reshape(h, w, 3)
 
-    try:
-        cmd = [
-            get_ffmpeg(),
-            "-ss", str(timestamp),
-            "-i", video_path,
-            "-frames:v", "1",
-            "-y",
-            tmp_path,
-        ]
-        subprocess.run(cmd, capture_output=True, check=True, timeout=30)
-        return load_frame(tmp_path)
-    finally:
-        Path(tmp_path).unlink(missing_ok=True)
+
+def sample_frame_numbers(total_frames: int, count: int) -> list[int]:
+    """Evenly spaced frame numbers from first to last frame (at most `count`)."""
+    total_frames, count = max(1, int(total_frames)), max(1, int(count))
+    if total_frames <= count:
+        return list(range(total_frames))
+    if count == 1:
+        return [0]
+    return [round(i * (total_frames - 1) / (count - 1)) for i in range(count)]
+
+
+def extract_frame_batch(
+    video_path: str,
+    frame_numbers: list[int] | None = None,
+    count: int | None = None,
+    scale: float = 1.0,
+    cache_dir: str | None = None,
+) -> list[np.ndarray]:
+    """Extract several frames in one FFmpeg run (sample frames, filmstrips).
+
+    Requested frames are grouped so that each group can be reached by one
+    keyframe seek and decoded forward; every group becomes one seeked input
+    of the same FFmpeg process, so N thumbnails cost one spawn, not N.
+
+    Args:
+        video_path: Path to input video.
+        frame_numbers: Frames to extract (clamped to the valid range; any
+            order, duplicates allowed).
+        count: Instead of frame_numbers, this many evenly spaced frames.
+        scale: Scale factor for thumbnails (1.0 = source size).
+        cache_dir: Optional directory for persistent probe/index caches.
+
+    Returns:
+        List of (H, W, 3) uint8 arrays, one per requested frame, in order.
+    """
+    video_path = str(video_path)
+    info = probe_video(video_path, cache_dir=cache_dir)
+    index = load_frame_index(video_path, cache_dir=cache_dir)
+    pts, keyframes = index["pts"] or [0.0], index["keyframes"] or [0]
+    total = len(pts)
+    if frame_numbers is None:
+        frame_numbers = sample_frame_numbers(total, count or 1)
+    frame_numbers = [max(0, min(int(n), total - 1)) for n in frame_numbers]
+    if not frame_numbers:
+        return []
+    wanted = sorted(set(frame_numbers))
+
+    # Consecutive frames share an input while decoding forward from the
+    # previous one is no further than seeking to the next keyframe
+    groups = []
+    for n in wanted:
+        key = keyframes[bisect.bisect_right(keyframes, n) - 1]
+        if groups and key <= groups[-1][-1]:
+            groups[-1].append(n)
+        else:
+            groups.append([n])
+
+    step = pts[1] - pts[0] if total > 1 else 1.0 / info["fps"]
+
+    def bounds(n: int) -> tuple[float, float]:
+        # Midpoints to the neighbouring frames: exact even for VFR sources
+        lo = (pts[n - 1] + pts[n]) / 2 if n > 0 else pts[n] - step / 2
+        hi = (pts[n] + pts[n + 1]) / 2 if n + 1 < total else pts[n] + step / 2
+        return lo, hi
+
+    def window(n: int) -> str:
+        lo, hi = bounds(n)
+        return f"gte(t\\,{index['start'] + lo:.6f})*lt(t\\,{index['start'] + hi:.6f})"
+
+    w, h = scaled_size(info, scale)
+    resize = (w, h) != (info["width"], info["height"])
+    cmd = [get_ffmpeg(), "-v", "error", "-copyts"]
+    graph = []
+    for i, group in enumerate(groups):
+        # Accurate seek to the group's first frame: the demuxer may land on
+        # an earlier keyframe (MKV cues, containers without a seek index),
+        # but decoding is trimmed to the absolute [-ss, -ss + -t) window, so
+        # -t doesn't count from wherever the demuxer landed
+        lo, hi = bounds(group[0])[0], bounds(group[-1])[1]
+        if group[0] > 0:
+            cmd += ["-ss", f"{lo:.6f}"]
+        cmd += ["-t", f"{hi - max(lo, 0.0):.6f}", "-i", video_path]
+        select = "+".join(window(n) for n in group)
+        chain = f"[{i}:v]select={select}"
+        if resize:
+            chain += f",scale={w}:{h}:flags=area"
+        graph.append(f"{chain}[v{i}]")
+    labels = "".join(f"[v{i}]" for i in range(len(groups)))
+    graph.append(f"{labels}concat=n={len(groups)}:v=1:a=0[out]")
+    cmd += [
+        "-filter_complex", ";".join(graph),
+        "-map", "[out]",
+        "-vsync", "0",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "pipe:1",
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, check=True, timeout=60)
+    frame_bytes = w * h * 3
+    if len(result.stdout) < frame_bytes * len(wanted):
+        # Frames can't be matched to groups in a short output: fall back to
+        # one exact seek per frame
+        decoded = {}
+        for n in wanted:
+            frame = extract_single_frame(video_path, n, cache_dir=cache_dir)
+            if resize:
+                frame = np.asarray(Image.fromarray(frame).resize((w, h), Image.BOX))
+            decoded[n] = frame
+    else:
+        decoded = {
+            n: np.frombuffer(result.stdout, dtype=np.uint8, count=frame_bytes, offset=k * frame_bytes).reshape(h, w, 3)
+            for k, n in enumerate(wanted)
+        }
+    return [decoded[n].copy() for n in frame_numbers]
@@ -7,7 +7,7 @@ Every effect is a function: (frame: np.ndarray, **params) -> np.ndarray
 import numpy as np
 
 from effects.pixelsort import pixelsort
-from effects.channelshift import channelshift
+from effects.channelshift import channelshift, channelshift_map
 from effects.scanlines import scanlines
 from effects.bitcrush import bitcrush
 from effects.color import (
@@ -28,6 +28,10 @@ from effects.distortion import (
     chromatic_aberration,
     pencil_sketch,
     cumulative_smear,
+    wave_map,
+    displacement_map,
+    mirror_map,
+    chromatic_map,
 )
 from effects.texture import (
     vhs,
@@ -65,7 +69,49 @@ from effects.adsr import adsr_wrap, ADSREnvelope
 # Actual execution goes through entropic_datamosh.py or gradio_datamosh.py.
 _REAL_DATAMOSH_REGISTERED = True
 
-# Master registry: name -> (function, default_params, description)
+
+def _caps(stateful: bool, pointwise: bool, radius: int | None,
+          deterministic: bool = True, resolution_params: tuple = (),
+          channelwise: bool = False, float32: bool = False) -> dict:
+    """Capability declaration for an EFFECTS entry (its "caps" key).
+
+    Schedulers, caches and fusers read these instead of special-casing names.
+
+    Args:
+        stateful: Carries state from one frame to the next (frame buffers,
+            held frames, accumulated flow). Stateless effects are a pure
+            function of (frame, params, frame_index, seed), so frames can be
+            rendered in any order or in parallel.
+        pointwise: Each output pixel depends only on the same input pixel's
+            value (not its position or neighbours) — fusable into a lookup.
+        radius: Spatial support in pixels: how far away an input pixel can
+            affect an output pixel (0 = same pixel, None = unbounded or global,
+            e.g. whole-frame statistics, wrap-around shifts, sorting).
+        deterministic: Same inputs (params, seed, frame_index) always give
+            the same output. False for effects drawing unseeded randomness.
+        resolution_params: Params measured in pixels, which should be scaled
+            with the frame when rendering at a different resolution.
+        channelwise: Pointwise, and each output channel depends only on the
+            same input channel — exactly representable as a per-channel
+            256-entry lookup table.
+        float32: Also accepts float32 frames (0-255, unrounded) and returns
+            float32 for them, so float32 chains need not quantize around it
+            (see effects.formats).
+    """
+    return {
+        "stateful": stateful,
+        "pointwise": pointwise,
+        "radius": radius,
+        "deterministic": deterministic,
+        "resolution_params": tuple(resolution_params),
+        "channelwise": channelwise,
+        "float32": float32,
+    }
+
+
+# Master registry: name -> (function, default_params, description, caps).
+# Geometric effects also give a "warp" map builder (see effects.warp) so
+# consecutive warps can be fused into one resample.
 EFFECTS = {
     # === GLITCH ===
     "pixelsort": {
@@ -73,24 +119,30 @@ EFFECTS = {
         "category": "glitch",
         "params": {"threshold": 0.5, "sort_by": "brightness", "direction": "horizontal"},
         "description": "Sort pixels by brightness, hue, or saturation",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "channelshift": {
         "fn": channelshift,
         "category": "glitch",
         "params": {"r_offset": (10, 0), "g_offset": (0, 0), "b_offset": (-10, 0)},
         "description": "Offset RGB channels independently",
+        "warp": channelshift_map,
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('r_offset', 'g_offset', 'b_offset'), float32=True),
     },
     "displacement": {
         "fn": displacement,
         "category": "glitch",
-        "params": {"block_size": 16, "intensity": 10.0, "seed": 42},
+        "params": {"block_size": 16, "intensity": 10.0, "seed": 42, "layout": "legacy"},
         "description": "Randomly displace image blocks",
+        "warp": displacement_map,
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('block_size', 'intensity'), float32=True),
     },
     "bitcrush": {
         "fn": bitcrush,
         "category": "glitch",
         "params": {"color_depth": 4, "resolution_scale": 1.0},
         "description": "Reduce color depth and/or resolution",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
 
     # === DISTORTION ===
@@ -99,30 +151,38 @@ EFFECTS = {
         "category": "distortion",
         "params": {"sigma_s": 60.0, "sigma_r": 0.07, "shade": 0.05},
         "description": "Pencil sketch drawing effect (OpenCV pencilSketch)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('sigma_s',)),
     },
     "smear": {
         "fn": cumulative_smear,
         "category": "distortion",
         "params": {"direction": "horizontal", "decay": 0.95},
         "description": "Cumulative paint-smear / light-trail streaks",
+        "caps": _caps(stateful=False, pointwise=False, radius=None, float32=True),
     },
     "wave": {
         "fn": wave_distort,
         "category": "distortion",
-        "params": {"amplitude": 10.0, "frequency": 0.05, "direction": "horizontal"},
+        "params": {"amplitude": 10.0, "frequency": 0.05, "direction": "horizontal", "subpixel": False},
         "description": "Sine wave displacement distortion",
+        "warp": wave_map,
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('amplitude', 'frequency'), float32=True),
     },
     "mirror": {
         "fn": mirror,
         "category": "distortion",
         "params": {"axis": "vertical", "position": 0.5},
         "description": "Mirror one half onto the other",
+        "warp": mirror_map,
+        "caps": _caps(stateful=False, pointwise=False, radius=None, float32=True),
     },
     "chromatic": {
         "fn": chromatic_aberration,
         "category": "distortion",
         "params": {"offset": 5, "direction": "horizontal"},
         "description": "RGB channel split (lens aberration)",
+        "warp": chromatic_map,
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('offset',), float32=True),
     },
 
     # === TEXTURE ===
@@ -131,66 +191,78 @@ EFFECTS = {
         "category": "texture",
         "params": {"intensity": 0.8, "sync_drift": 0.3, "seed": 42},
         "description": "TV static with horizontal sync drift (between-channels)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "contours": {
         "fn": contour_lines,
         "category": "texture",
         "params": {"levels": 8},
         "description": "Topographic contour lines from luminance bands",
+        "caps": _caps(stateful=False, pointwise=False, radius=1),
     },
     "scanlines": {
         "fn": scanlines,
         "category": "texture",
         "params": {"line_width": 2, "opacity": 0.3, "flicker": False, "color": (0, 0, 0)},
         "description": "CRT/VHS scan line overlay",
+        "caps": _caps(stateful=False, pointwise=False, radius=0, deterministic=False, resolution_params=('line_width',), float32=True),
     },
     "vhs": {
         "fn": vhs,
         "category": "texture",
         "params": {"tracking": 0.5, "noise_amount": 0.2, "color_bleed": 3, "seed": 42},
         "description": "VHS tape degradation simulation",
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('color_bleed',)),
     },
     "noise": {
         "fn": noise,
         "category": "texture",
         "params": {"amount": 0.3, "noise_type": "gaussian", "seed": 42},
         "description": "Add grain/noise overlay",
+        "caps": _caps(stateful=False, pointwise=False, radius=0),
     },
     "blur": {
         "fn": blur,
         "category": "texture",
         "params": {"radius": 3, "blur_type": "box"},
-        "description": "Box or motion blur",
+        "description": "Box, motion or gaussian blur",
+        # radius is clamped to 20; gaussian (sigma = radius / 2) reaches 3 sigma
+        "caps": _caps(stateful=False, pointwise=False, radius=30, resolution_params=('radius',)),
     },
     "sharpen": {
         "fn": sharpen,
         "category": "texture",
         "params": {"amount": 1.0},
         "description": "Sharpen/enhance edges",
+        "caps": _caps(stateful=False, pointwise=False, radius=3),
     },
     "edges": {
         "fn": edge_detect,
         "category": "texture",
         "params": {"threshold": 0.3, "mode": "overlay"},
         "description": "Edge detection (overlay, neon, or edges-only)",
+        "caps": _caps(stateful=False, pointwise=False, radius=1),
     },
     "posterize": {
         "fn": posterize,
         "category": "texture",
         "params": {"levels": 4},
         "description": "Reduce to N color levels per channel",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True),
     },
     "asciiart": {
         "fn": ascii_art,
         "category": "texture",
         "params": {"charset": "basic", "width": 80, "invert": False, "color_mode": "mono", "edge_mix": 0.0, "seed": 42},
         "description": "Convert frame to ASCII art (basic/dense/block charset, mono/green/amber/original color)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "brailleart": {
         "fn": braille_art,
         "category": "texture",
         "params": {"width": 80, "threshold": 128, "invert": False, "dither": True, "color_mode": "mono", "seed": 42},
-        "description": "Convert frame to braille unicode art (2×4 dot grid, 4× resolution, Floyd-Steinberg dither)",
+        "description": "Convert frame to braille unicode art (2×4 dot grid, 4× resolution, ordered or Floyd-Steinberg dither)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
 
     # === COLOR ===
@@ -199,54 +271,63 @@ EFFECTS = {
         "category": "color",
         "params": {"drive": 1.5, "warmth": 0.3},
         "description": "Analog tape saturation curve (tanh soft-clip + warmth)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True, float32=True),
     },
     "cyanotype": {
         "fn": cyanotype,
         "category": "color",
         "params": {"intensity": 1.0},
         "description": "Prussian blue cyanotype photographic print simulation",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, float32=True),
     },
     "infrared": {
         "fn": infrared,
         "category": "color",
         "params": {"vegetation_glow": 1.0},
         "description": "Infrared film simulation (vegetation glows, sky darkens)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, float32=True),
     },
     "hueshift": {
         "fn": hue_shift,
         "category": "color",
         "params": {"degrees": 180},
         "description": "Rotate the hue wheel",
+        "caps": _caps(stateful=False, pointwise=True, radius=0),
     },
     "contrast": {
         "fn": contrast_crush,
         "category": "color",
         "params": {"amount": 50, "curve": "linear"},
         "description": "Extreme contrast manipulation",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True, float32=True),
     },
     "saturation": {
         "fn": saturation_warp,
         "category": "color",
         "params": {"amount": 1.5, "channel": "all"},
         "description": "Boost or kill saturation",
+        "caps": _caps(stateful=False, pointwise=True, radius=0),
     },
     "exposure": {
         "fn": brightness_exposure,
         "category": "color",
         "params": {"stops": 1.0, "clip_mode": "clip"},
         "description": "Push exposure up or down",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True, float32=True),
     },
     "invert": {
         "fn": color_invert,
         "category": "color",
         "params": {"channel": "all", "amount": 1.0},
         "description": "Full or partial color inversion",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True, float32=True),
     },
     "temperature": {
         "fn": color_temperature,
         "category": "color",
         "params": {"temp": 30},
         "description": "Warm/cool color temperature shift",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True, float32=True),
     },
 
     # === TEMPORAL ===
@@ -255,54 +336,63 @@ EFFECTS = {
         "category": "temporal",
         "params": {"repeat": 3, "interval": 8},
         "description": "Freeze-stutter: hold frames at intervals (skipping record)",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "dropout": {
         "fn": frame_drop,
         "category": "temporal",
         "params": {"drop_rate": 0.3, "seed": 42},
         "description": "Random frame drops to black (signal loss)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0),
     },
     "timestretch": {
         "fn": time_stretch,
         "category": "temporal",
         "params": {"speed": 0.5},
         "description": "Speed change with visual artifacts",
+        "caps": _caps(stateful=False, pointwise=True, radius=0),
     },
     "feedback": {
         "fn": feedback,
         "category": "temporal",
         "params": {"decay": 0.3},
         "description": "Ghost trails from previous frames (video echo)",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "tapestop": {
         "fn": tape_stop,
         "category": "temporal",
         "params": {"trigger": 0.7, "ramp_frames": 15},
         "description": "Freeze and fade to black like a tape machine stopping",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "tremolo": {
         "fn": tremolo,
         "category": "temporal",
         "params": {"rate": 2.0, "depth": 0.5},
         "description": "Brightness oscillation over time (LFO on brightness)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True),
     },
     "delay": {
         "fn": delay,
         "category": "temporal",
         "params": {"delay_frames": 5, "decay": 0.4},
         "description": "Ghost echo from N frames ago (video delay line)",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "decimator": {
         "fn": decimator,
         "category": "temporal",
         "params": {"factor": 3},
         "description": "Reduce effective framerate (choppy lo-fi motion)",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "samplehold": {
         "fn": sample_and_hold,
         "category": "temporal",
         "params": {"hold_min": 4, "hold_max": 15, "seed": 42},
         "description": "Freeze at random intervals (sample & hold)",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "granulator": {
         "fn": granulator,
@@ -312,6 +402,7 @@ EFFECTS = {
             "density": 1, "scan_speed": 0.0, "reverse_prob": 0.0, "seed": 42,
         },
         "description": "Video granular synthesis — rearrange slices by position, spray, grain size, density. Inspired by Ableton Granulator II.",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "beatrepeat": {
         "fn": beat_repeat,
@@ -321,6 +412,7 @@ EFFECTS = {
             "variation": 0.0, "chance": 1.0, "decay": 0.0, "pitch_decay": 0.0, "seed": 42,
         },
         "description": "Triggered frame repetition — captures buffer on trigger and repeats with grid subdivision, decay, pitch decay. Inspired by Ableton Beat Repeat.",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "strobe": {
         "fn": strobe,
@@ -330,6 +422,7 @@ EFFECTS = {
             "opacity": 1.0, "duty": 0.5, "seed": 42,
         },
         "description": "Video strobe — flash color/shape/invert at regular intervals. Colors: white, black, red, blue, green, invert, random. Shapes: full, circle, bars_h, bars_v, grid.",
+        "caps": _caps(stateful=False, pointwise=False, radius=0),
     },
     "lfo": {
         "fn": lfo,
@@ -339,6 +432,7 @@ EFFECTS = {
             "waveform": "sine", "seed": 42,
         },
         "description": "Multi-target LFO — oscillate brightness, displacement, channelshift, blur, moire, glitch, invert, or posterize. Waveforms: sine, square, saw, triangle, random.",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
 
     # === MODULATION ===
@@ -347,24 +441,28 @@ EFFECTS = {
         "category": "modulation",
         "params": {"threshold": 0.7, "folds": 3},
         "description": "Audio wavefolding — pixel brightness folds at threshold",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True, float32=True),
     },
     "amradio": {
         "fn": am_radio,
         "category": "modulation",
         "params": {"carrier_freq": 10.0, "depth": 0.8},
         "description": "AM radio interference bands (sine carrier on rows)",
+        "caps": _caps(stateful=False, pointwise=False, radius=0, float32=True),
     },
     "ringmod": {
         "fn": ring_mod,
         "category": "modulation",
         "params": {"frequency": 4.0, "direction": "horizontal"},
         "description": "Sine wave carrier modulation (alternating bands)",
+        "caps": _caps(stateful=False, pointwise=False, radius=0, float32=True),
     },
     "gate": {
         "fn": gate,
         "category": "modulation",
         "params": {"threshold": 0.3, "mode": "brightness"},
         "description": "Black out pixels below brightness threshold (noise gate)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0),
     },
 
     # === ENHANCE ===
@@ -373,54 +471,63 @@ EFFECTS = {
         "category": "enhance",
         "params": {},
         "description": "Per-channel histogram equalization (reveal hidden detail)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "clahe": {
         "fn": clahe,
         "category": "enhance",
         "params": {"clip_limit": 2.0, "grid_size": 8},
         "description": "CLAHE — adaptive local contrast enhancement (night vision)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "parallelcompress": {
         "fn": parallel_compression,
         "category": "enhance",
         "params": {"crush": 0.5, "blend": 0.5},
         "description": "Parallel compression (NY compression for video)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True, float32=True),
     },
     "solarize": {
         "fn": solarize,
         "category": "enhance",
         "params": {"threshold": 128},
         "description": "Partial inversion above threshold (Sabattier/Man Ray effect)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0, channelwise=True),
     },
     "duotone": {
         "fn": duotone,
         "category": "enhance",
         "params": {"shadow_color": (0, 0, 80), "highlight_color": (255, 200, 100)},
         "description": "Two-color gradient mapping (graphic design aesthetic)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0),
     },
     "emboss": {
         "fn": emboss,
         "category": "enhance",
         "params": {"amount": 1.0},
         "description": "3D raised/carved texture effect",
+        "caps": _caps(stateful=False, pointwise=False, radius=1),
     },
     "autolevels": {
         "fn": auto_levels,
         "category": "enhance",
         "params": {"cutoff": 2.0},
         "description": "Auto-contrast histogram stretch (professional color correction)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "median": {
         "fn": median_filter,
         "category": "enhance",
         "params": {"size": 5},
         "description": "Median filter (watercolor / noise reduction)",
+        "caps": _caps(stateful=False, pointwise=False, radius=7, resolution_params=('size',)),
     },
     "falsecolor": {
         "fn": false_color,
         "category": "enhance",
         "params": {"colormap": "jet"},
         "description": "Map luminance to false-color palette (thermal vision)",
+        "caps": _caps(stateful=False, pointwise=True, radius=0),
     },
 
     # === DESTRUCTION ===
@@ -429,6 +536,7 @@ EFFECTS = {
         "category": "destruction",
         "params": {"pattern": 128, "mode": "fixed", "seed": 42},
         "description": "Bitwise XOR corruption (fixed, random, or gradient pattern)",
+        "caps": _caps(stateful=False, pointwise=False, radius=0),
     },
     "datamosh": {
         "fn": datamosh,
@@ -439,78 +547,91 @@ EFFECTS = {
             "macroblock_size": 16, "donor_offset": 10, "blend_mode": "normal",
         },
         "description": "Datamosh (optical flow) — 8 modes: melt, bloom, rip, replace, annihilate, freeze_through (authentic I-frame removal), pframe_extend (P-frame duplication/bloom-glide), donor (cross-clip pixel feeding). Blend modes: normal, multiply, average, swap.",
+        "caps": _caps(stateful=True, pointwise=False, radius=None, resolution_params=('macroblock_size',)),
     },
     "bytecorrupt": {
         "fn": byte_corrupt,
         "category": "destruction",
         "params": {"amount": 20, "jpeg_quality": 75, "seed": 42},
         "description": "JPEG data bending — corrupt compressed bytes for authentic glitch",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "blockcorrupt": {
         "fn": block_corrupt,
         "category": "destruction",
         "params": {"num_blocks": 15, "block_size": 32, "mode": "random", "seed": 42},
         "description": "Corrupt random macroblocks (shift, noise, repeat, invert, zero)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('block_size',)),
     },
     "rowshift": {
         "fn": row_shift,
         "category": "destruction",
         "params": {"max_shift": 30, "density": 0.3, "seed": 42},
         "description": "Horizontal scanline tearing — rows displaced randomly",
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('max_shift',)),
     },
     "jpegdamage": {
         "fn": jpeg_artifacts,
         "category": "destruction",
         "params": {"quality": 5, "block_damage": 20, "seed": 42},
         "description": "Extreme JPEG compression + block corruption artifacts",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "invertbands": {
         "fn": invert_bands,
         "category": "destruction",
         "params": {"band_height": 10, "offset": 0},
         "description": "Alternating inverted horizontal bands (CRT damage)",
+        "caps": _caps(stateful=False, pointwise=False, radius=0, resolution_params=('band_height',)),
     },
     "databend": {
         "fn": data_bend,
         "category": "destruction",
         "params": {"effect": "echo", "intensity": 0.5, "seed": 42},
         "description": "Audio DSP on pixel data — echo, distort, bitcrush, reverse",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "flowdistort": {
         "fn": flow_distort,
         "category": "destruction",
         "params": {"strength": 3.0, "direction": "forward"},
         "description": "Warp frame using optical flow as displacement map",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "filmgrain": {
         "fn": film_grain,
         "category": "destruction",
         "params": {"intensity": 0.4, "grain_size": 2, "seed": 42},
         "description": "Realistic film grain (brightness-responsive, chunky texture)",
+        "caps": _caps(stateful=False, pointwise=False, radius=0, resolution_params=('grain_size',)),
     },
     "glitchrepeat": {
         "fn": glitch_repeat,
         "category": "destruction",
         "params": {"num_slices": 8, "max_height": 20, "shift": True, "seed": 42},
         "description": "Repeat and shift random horizontal slices (buffer overflow)",
+        "caps": _caps(stateful=False, pointwise=False, radius=None, resolution_params=('max_height',)),
     },
     "pixelannihilate": {
         "fn": pixel_annihilate,
         "category": "destruction",
         "params": {"threshold": 0.5, "mode": "dissolve", "replacement": "black", "seed": 42},
         "description": "Kill pixels by dissolve, threshold, edge-kill, or channel-rip",
+        "caps": _caps(stateful=False, pointwise=False, radius=1),
     },
     "framesmash": {
         "fn": frame_smash,
         "category": "destruction",
         "params": {"aggression": 0.5, "seed": 42},
         "description": "One-stop apocalypse — rows, blocks, channels, XOR, dissolve combined",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
     "channeldestroy": {
         "fn": channel_destroy,
         "category": "destruction",
         "params": {"mode": "separate", "intensity": 0.5, "seed": 42},
         "description": "Rip color channels apart — separate, swap, crush, eliminate, XOR",
+        "caps": _caps(stateful=False, pointwise=False, radius=None),
     },
 
     # === SIDECHAIN ===
@@ -519,18 +640,21 @@ EFFECTS = {
         "category": "modulation",
         "params": {"source": "brightness", "threshold": 0.5, "ratio": 4.0, "attack": 0.3, "release": 0.7, "mode": "brightness", "invert": False, "seed": 42},
         "description": "Sidechain duck — key signal ducks brightness/saturation/blur/invert/displace",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "sidechainpump": {
         "fn": sidechain_pump,
         "category": "modulation",
         "params": {"rate": 2.0, "depth": 0.7, "curve": "exponential", "mode": "brightness", "seed": 42},
         "description": "Rhythmic sidechain pump — 4-on-the-floor ducking at fixed BPM",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "sidechaingate": {
         "fn": sidechain_gate,
         "category": "modulation",
         "params": {"source": "brightness", "threshold": 0.4, "mode": "freeze", "hold_frames": 5, "seed": 42},
         "description": "Sidechain gate — video only passes when signal exceeds threshold",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "sidechaincross": {
         "fn": sidechain_cross,
@@ -540,18 +664,21 @@ EFFECTS = {
                    "attack": 0.0, "decay": 0.0, "sustain": 1.0, "release": 0.0,
                    "lookahead": 0, "seed": 42},
         "description": "Cross-video sidechain — one video busts through another with ADSR envelope and pre-processing",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "sidechaincrossfeed": {
         "fn": sidechain_crossfeed,
         "category": "color",
         "params": {"channel_map": "rgb_shift", "strength": 0.7, "seed": 42},
         "description": "Cross-video channel feed — mix color channels between two videos",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "sidechaininterference": {
         "fn": sidechain_interference,
         "category": "modulation",
         "params": {"mode": "phase", "strength": 0.7, "seed": 42},
         "description": "Cross-video interference — treat two videos as waves, create phase/amplitude interference",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
 
     # === DSP FILTERS ===
@@ -560,72 +687,84 @@ EFFECTS = {
         "category": "modulation",
         "params": {"rate": 0.5, "depth": 10, "feedback": 0.4, "wet": 0.5, "seed": 42},
         "description": "Temporal flanger — blend with oscillating-delay past frame (comb-filter interference)",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "videophaser": {
         "fn": video_phaser,
         "category": "modulation",
         "params": {"rate": 0.3, "stages": 4, "depth": 1.0, "feedback": 0.3, "seed": 42},
         "description": "Spatial phaser — FFT phase sweep creates sweeping notch interference",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "spatialflanger": {
         "fn": spatial_flanger,
         "category": "modulation",
         "params": {"rate": 0.8, "depth": 20, "feedback": 0.3, "seed": 42},
         "description": "Per-row horizontal shift with LFO — diagonal sweep flanging",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "channelphaser": {
         "fn": channel_phaser,
         "category": "modulation",
         "params": {"r_rate": 0.05, "g_rate": 0.3, "b_rate": 1.2, "stages": 5, "depth": 1.5, "wet": 0.8, "seed": 42},
         "description": "Per-channel FFT phase sweep at different rates — color fringing and tearing",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "brightnessphaser": {
         "fn": brightness_phaser,
         "category": "modulation",
         "params": {"rate": 0.25, "bands": 6, "depth": 0.3, "strength": 0.8, "seed": 42},
         "description": "Sweeping brightness inversion bands — psychedelic solarization sweep",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "hueflanger": {
         "fn": hue_flanger,
         "category": "color",
         "params": {"rate": 0.3, "depth": 60.0, "sat_depth": 0.0, "seed": 42},
         "description": "Blend with hue-rotated copy, rotation oscillates — color interference",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "resonantfilter": {
         "fn": resonant_filter,
         "category": "modulation",
         "params": {"rate": 0.2, "q": 50.0, "gain": 3.0, "wet": 0.7, "seed": 42},
         "description": "High-Q bandpass sweep through spatial frequencies — synth filter on video",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "combfilter": {
         "fn": comb_filter,
         "category": "modulation",
         "params": {"teeth": 7, "spacing": 8, "rate": 0.3, "depth": 3.0, "wet": 0.7, "seed": 42},
         "description": "Multi-tooth spatial comb filter — offset copies create interference patterns",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "feedbackphaser": {
         "fn": feedback_phaser,
         "category": "modulation",
         "params": {"rate": 0.3, "stages": 6, "feedback": 0.5, "escalation": 0.01, "seed": 42},
         "description": "Self-feeding 2D FFT phaser that escalates over time — builds to self-oscillation",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "spectralfreeze": {
         "fn": spectral_freeze,
         "category": "temporal",
         "params": {"interval": 30, "blend_peak": 0.7, "envelope_frames": 25, "seed": 42},
         "description": "Freeze frequency magnitude at intervals, impose on later frames — spectral imprint",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "visualreverb": {
         "fn": visual_reverb,
         "category": "temporal",
         "params": {"rate": 0.15, "depth": 0.5, "ir_interval": 30, "seed": 42},
         "description": "Convolve frame with past frame as impulse response — visual echo/room",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
     "freqflanger": {
         "fn": freq_flanger,
         "category": "modulation",
         "params": {"rate": 0.5, "depth": 10, "mag_blend": 0.4, "phase_blend": 0.15, "seed": 42},
         "description": "2D FFT magnitude+phase blend with delayed frame — spectral ghosting",
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
 
     # === REAL DATAMOSH (video-level, not per-frame) ===
@@ -643,6 +782,7 @@ EFFECTS = {
         },
         "description": "REAL H.264 P-frame datamosh (not simulation). Modes: splice, interleave, replace, multi, strategic. Requires two input videos. Use 'entropic_datamosh.py' CLI or 'python gradio_datamosh.py' for browser UI.",
         "video_level": True,  # Flag: this effect operates on full video, not single frames
+        "caps": _caps(stateful=True, pointwise=False, radius=None),
     },
 }
 
@@ -677,6 +817,18 @@ def get_effect(name: str):
     return entry["fn"], entry["params"].copy()
 
 
+def get_caps(name: str) -> dict:
+    """Capability declaration of an effect (see _caps).
+
+    Unknown names get the most conservative declaration (stateful,
+    non-pointwise, unbounded radius, non-deterministic).
+    """
+    entry = EFFECTS.get(name)
+    if entry is None:
+        return _caps(stateful=True, pointwise=False, radius=None, deterministic=False)
+    return entry["caps"]
+
+
 def is_video_level(name: str) -> bool:
     """Check if an effect is video-level (not per-frame)."""
     return EFFECTS.get(name, {}).get("video_level", False)
@@ -723,6 +875,22 @@ def search_effects(query: str, max_query_len: int = 200) -> list[dict]:
     return results
 
 
+# Effects that carry state from one frame to the next (see _caps)
+STATEFUL_EFFECTS = frozenset(name for name, entry in EFFECTS.items() if entry["caps"]["stateful"])
+
+
+def is_stateless_chain(effects_list: list[dict]) -> bool:
+    """True if every effect in the chain renders each frame independently.
+
+    ADSR envelopes track their trigger over time, so an enveloped effect
+    counts as stateful too.
+    """
+    return all(
+        not get_caps(effect["name"])["stateful"] and effect.get("envelope") is None
+        for effect in effects_list
+    )
+
+
 def apply_effect(frame, effect_name: str, frame_index: int = 0, total_frames: int = 1, **params):
     """Apply a named effect to a frame with given params.
 
@@ -731,54 +899,17 @@ def apply_effect(frame, effect_name: str, frame_index: int = 0, total_frames: in
         region: Region spec — "x,y,w,h", preset name, or dict. None = full frame.
         feather (int): Edge feather radius for region blending (0 = hard edge).
     """
-    # Extract special params before passing to effect function
-    mix = float(params.pop("mix", 1.0))
-    mix = max(0.0, min(1.0, mix))
-    region = params.pop("region", None)
-    feather = int(params.pop("feather", 0))
-
-    fn, defaults = get_effect(effect_name)
-    merged = {**defaults, **params}
-
-    # Inject temporal context for effects that need it
-    import inspect
-    sig = inspect.signature(fn)
-    if "frame_index" in sig.parameters:
-        merged["frame_index"] = frame_index
-    if "total_frames" in sig.parameters:
-        merged["total_frames"] = total_frames
-
-    # Warn about temporal effects + region (experimental interaction)
-    _TEMPORAL_EFFECTS = {"stutter", "dropout", "feedback", "tapestop", "tremolo",
-                         "delay", "decimator", "samplehold"}
-    if region is not None and effect_name in _TEMPORAL_EFFECTS:
-        import warnings
-        warnings.warn(
-            f"Region + temporal effect '{effect_name}' is experimental. "
-            f"Temporal state is shared globally and may produce unexpected results "
-            f"when combined with region masking.",
-            stacklevel=2
-        )
-
-    # Apply with region masking if specified
-    if region is not None:
-        from core.region import apply_to_region
-        wet = apply_to_region(frame, fn, region, feather=feather, **merged)
-    else:
-        wet = fn(frame, **merged)
-
-    # Dry/wet blend (parallel processing)
-    if mix >= 1.0:
-        return wet
-    if mix <= 0.0:
-        return frame.copy()
+    from effects.chain import EffectStep
+    return EffectStep(effect_name, params, stacklevel=3)(frame, frame_index, total_frames)
 
-    # Linear blend: output = dry * (1 - mix) + wet * mix
-    blended = (frame.astype(np.float32) * (1.0 - mix) + wet.astype(np.float32) * mix)
-    return np.clip(blended, 0, 255).astype(np.uint8)
 
-
-def apply_chain(frame, effects_list: list[dict], frame_index: int = 0, total_frames: int = 1):
+def apply_chain(
+    frame,
+    effects_list: list[dict],
+    frame_index: int = 0,
+    total_frames: int = 1,
+    context=None,
+):
     """Apply a chain of effects sequentially.
 
     effects_list: [{"name": "pixelsort", "params": {"threshold": 0.6}}, ...]
@@ -798,31 +929,20 @@ def apply_chain(frame, effects_list: list[dict], frame_index: int = 0, total_fra
                  "edges", "motion", "contrast", "saturation").
         rate: For LFO trigger, frequency in Hz. For time trigger,
               pulses per second. For content triggers, threshold (0-1).
+
+    Stateful effects keep their frame history in `context` (a RenderContext).
+    Without one, calls share a module-level context, so frame-by-frame calls
+    behave like one long render; pass RenderContext() for an isolated preview.
+
+    For repeated calls with the same chain (rendering), compile it once
+    with compile_chain() and call the plan per frame instead.
     """
-    from core.safety import validate_chain_depth
-    validate_chain_depth(effects_list)
-
-    for effect in effects_list:
-        name = effect["name"]
-        params = effect.get("params", {})
-        envelope = effect.get("envelope")
-
-        if envelope is not None:
-            # Wrap effect with ADSR envelope
-            fn, defaults = get_effect(name)
-            merged_params = {**defaults, **params}
-            frame = adsr_wrap(
-                frame, fn, merged_params,
-                attack=envelope.get("attack", 0),
-                decay=envelope.get("decay", 0),
-                sustain=envelope.get("sustain", 1.0),
-                release=envelope.get("release", 0),
-                trigger_source=envelope.get("trigger", "lfo"),
-                trigger_threshold=envelope.get("rate", 1.0),
-                seed=merged_params.get("seed", 42),
-                frame_index=frame_index,
-                total_frames=total_frames,
-            )
-        else:
-            frame = apply_effect(frame, name, frame_index=frame_index, total_frames=total_frames, **params)
-    return frame
+    if context is None:
+        context = _shared_context
+    return compile_chain(effects_list, stacklevel=3)(frame, frame_index, total_frames, context)
+
+
+# Compiled chains (imported last: effects.chain uses the registry above)
+from effects.chain import compile_chain, ChainPlan, RenderContext
+
+_shared_context = RenderContext()
@@ -4,8 +4,15 @@ Convert video frames to ASCII art rendered back as images.
 
 Techniques from: ascii-image-converter (braille), video-to-ascii (luminance/color),
 gradscii-art (optimization), pic2ascii (edge detection).
+
+Rendering uses a glyph atlas: every glyph of a charset is rasterized once per
+cell size into an (N, cell_h, cell_w) coverage array, each cell's luminance
+is quantized to a glyph index, and the image is composed with one gather
+(atlas[indices]). Per-cell colour is a multiply on the gathered tiles.
 """
 
+from functools import lru_cache
+
 import numpy as np
 
 # Character sets ordered by visual density (darkest → lightest)
@@ -23,55 +30,103 @@ BRAILLE_DOTS = [
     [0x40, 0x80],
 ]
 
+# Shade glyphs the Hershey fonts can't draw: fraction of the cell filled
+SHADES = {" ": 0.0, "░": 0.25, "▒": 0.5, "▓": 0.75, "█": 1.0}
 
-def _render_text_to_frame(lines, width, height, font_scale=1.0, color=(255, 255, 255), bg_color=(0, 0, 0)):
-    """Render list of text lines back into an image frame using OpenCV putText.
-
-    Returns (H, W, 3) uint8 BGR array matching original dimensions.
-    """
-    import cv2
+TEXT_COLORS = {
+    "mono": (255, 255, 255),
+    "green": (0, 255, 0),
+    "amber": (0, 191, 255),  # BGR for amber
+}
 
-    # Create background
-    canvas = np.full((height, width, 3), bg_color, dtype=np.uint8)
+# 4×4 Bayer matrix: ordered dither thresholds and shade fill patterns
+_BAYER4 = np.array([
+    [0, 8, 2, 10],
+    [12, 4, 14, 6],
+    [3, 11, 1, 9],
+    [15, 7, 13, 5],
+], dtype=np.float32)
 
-    if not lines:
-        return canvas
 
-    # Calculate font size to fit all lines
-    num_lines = len(lines)
-    max_line_len = max(len(line) for line in lines) if lines else 1
+def _tile(pattern: np.ndarray, h: int, w: int) -> np.ndarray:
+    """Repeat a small 2D pattern over an (h, w) area."""
+    ph, pw = pattern.shape
+    return np.tile(pattern, (h // ph + 1, w // pw + 1))[:h, :w]
 
-    # Font: FONT_HERSHEY_SIMPLEX for clean monospace-like rendering
-    font = cv2.FONT_HERSHEY_SIMPLEX
 
-    # Calculate scale: fit widest line and all rows
-    # getTextSize returns ((width, height), baseline)
-    test_size = cv2.getTextSize("X", font, 1.0, 1)
-    char_w = test_size[0][0]
-    char_h = test_size[0][1] + test_size[1]
+@lru_cache(maxsize=32)
+def _glyph_atlas(chars: str, cell_w: int, cell_h: int) -> np.ndarray:
+    """Coverage tiles (len(chars), cell_h, cell_w) uint8 for a charset.
 
-    scale_x = (width * 0.98) / (max_line_len * char_w) if max_line_len > 0 else 1.0
-    scale_y = (height * 0.95) / (num_lines * char_h) if num_lines > 0 else 1.0
-    scale = min(scale_x, scale_y) * font_scale
-    scale = max(0.15, min(scale, 3.0))
+    Text glyphs are drawn with the same Hershey font the old line renderer
+    used, scaled to the cell; block shades are Bayer fill patterns.
+    """
+    import cv2
 
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    (char_w, char_h), baseline = cv2.getTextSize("X", font, 1.0, 1)
+    scale = min(cell_w * 0.9 / char_w, cell_h * 0.8 / (char_h + baseline))
     thickness = max(1, int(scale * 1.2))
+    y = int(round((cell_h + char_h * scale) / 2))
+
+    atlas = np.zeros((len(chars), cell_h, cell_w), dtype=np.uint8)
+    for i, ch in enumerate(chars):
+        if ch in SHADES:
+            atlas[i] = (_tile(_BAYER4, cell_h, cell_w) < SHADES[ch] * 16) * 255
+            continue
+        (gw, _), _ = cv2.getTextSize(ch, font, scale, thickness)
+        cv2.putText(atlas[i], ch, ((cell_w - gw) // 2, y), font, scale, 255, thickness, cv2.LINE_AA)
+    atlas.setflags(write=False)
+    return atlas
+
+
+@lru_cache(maxsize=8)
+def _braille_atlas(cell_w: int, cell_h: int) -> np.ndarray:
+    """Coverage tiles (256, cell_h, cell_w) uint8 for every braille pattern."""
+    import cv2
+
+    radius = max(1, int(min(cell_w / 2, cell_h / 4) * 0.35))
+    weights = np.array(BRAILLE_DOTS).ravel()
+    dots = np.zeros((len(weights), cell_h, cell_w), dtype=np.uint8)
+    for k, (dy, dx) in enumerate(np.ndindex(4, 2)):
+        center = (int((dx + 0.5) * cell_w / 2), int((dy + 0.5) * cell_h / 4))
+        cv2.circle(dots[k], center, radius, 255, -1, cv2.LINE_AA)
+    # Pattern b shows every dot whose bit is set in b
+    shown = (np.arange(256)[:, None] & weights[None, :]) > 0
+    atlas = (shown[:, :, None, None] * dots[None]).max(axis=1).astype(np.uint8)
+    atlas.setflags(write=False)
+    return atlas
+
 
-    # Recalculate char dimensions at final scale
-    test_size = cv2.getTextSize("X", font, scale, thickness)
-    final_char_h = test_size[0][1] + test_size[1]
-    line_spacing = int(final_char_h * 1.15)
+def _compose(atlas: np.ndarray, indices: np.ndarray, colors: np.ndarray,
+             height: int, width: int) -> np.ndarray:
+    """Gather glyph tiles into a (height, width, 3) image, centred on black.
 
-    # Starting Y position (center vertically)
-    total_text_h = num_lines * line_spacing
-    y_start = max(final_char_h, (height - total_text_h) // 2 + final_char_h)
+    Args:
+        atlas: (N, cell_h, cell_w) uint8 coverage tiles.
+        indices: (rows, cols) glyph index per cell.
+        colors: (3,) text colour, or (rows, cols, 3) colour per cell.
+    """
+    import cv2
 
-    for i, line in enumerate(lines):
-        y = y_start + i * line_spacing
-        if y > height:
-            break
-        cv2.putText(canvas, line, (2, y), font, scale, color, thickness, cv2.LINE_AA)
+    rows, cols = indices.shape
+    _, cell_h, cell_w = atlas.shape
+    colors = np.asarray(colors)
 
+    if colors.ndim == 1:
+        # One colour: colour the atlas, then the gather is the whole render
+        tinted = ((atlas[..., None] * colors.astype(np.uint16) + 127) // 255).astype(np.uint8)
+        grid = tinted[indices].transpose(0, 2, 1, 3, 4).reshape(rows * cell_h, cols * cell_w, 3)
+    else:
+        coverage = atlas[indices].transpose(0, 2, 1, 3).reshape(rows * cell_h, cols * cell_w)
+        cell_colors = cv2.resize(np.ascontiguousarray(colors, dtype=np.uint8), (cols * cell_w, rows * cell_h),
+                                 interpolation=cv2.INTER_NEAREST)
+        grid = cv2.multiply(cv2.merge([coverage] * 3), cell_colors, scale=1 / 255)
+
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+    gh, gw = min(height, grid.shape[0]), min(width, grid.shape[1])
+    y, x = (height - gh) // 2, (width - gw) // 2
+    canvas[y:y + gh, x:x + gw] = grid[:gh, :gw]
     return canvas
 
 
@@ -86,7 +141,7 @@ def ascii_art(frame: np.ndarray, charset: str = "basic", width: int = 80,
         width: ASCII width in characters (controls detail level).
         invert: Invert brightness mapping (swap light/dark chars).
         color_mode: "mono" (white on black), "green" (matrix), "amber" (retro terminal),
-                    "original" (sample colors from source image).
+                    "original" (each character in its source cell's colour).
         edge_mix: Blend in edge detection (0.0 = none, 1.0 = full). Enhances outlines.
         seed: Random seed (unused but kept for interface consistency).
 
@@ -119,40 +174,44 @@ def ascii_art(frame: np.ndarray, charset: str = "basic", width: int = 80,
         gray = gray * (1.0 - edge_mix * edges / 255 * 0.7)
         gray = np.clip(gray, 0, 255)
 
-    # Map pixels to ASCII characters
+    # Map cells to characters by brightness
     num_chars = len(chars)
-    lines = []
-    for y in range(ascii_height):
-        row = ""
-        for x in range(width):
-            brightness = gray[y, x]
-            idx = int(brightness / 256 * num_chars)
-            idx = min(idx, num_chars - 1)
-            row += chars[idx]
-        lines.append(row)
-
-    # Determine text color
-    color_map = {
-        "mono": (255, 255, 255),
-        "green": (0, 255, 0),
-        "amber": (0, 191, 255),  # BGR for amber
-    }
+    indices = np.minimum((gray / 256 * num_chars).astype(np.intp), num_chars - 1)
+
+    colors = small if color_mode == "original" else TEXT_COLORS.get(color_mode, TEXT_COLORS["mono"])
+    atlas = _glyph_atlas(chars, max(1, w // width), max(1, h // ascii_height))
+    return _compose(atlas, indices, colors, h, w)
+
+
+def _floyd_steinberg(gray: np.ndarray, threshold: int) -> np.ndarray:
+    """Error-diffusion dither of a float32 grayscale image to 0/255 (in place)."""
+    img_height, img_width = gray.shape
+    for y in range(img_height):
+        for x in range(img_width):
+            old_val = gray[y, x]
+            new_val = 255.0 if old_val > threshold else 0.0
+            error = old_val - new_val
+            gray[y, x] = new_val
+            if x + 1 < img_width:
+                gray[y, x + 1] = max(0, min(255, gray[y, x + 1] + error * 7 / 16))
+            if y + 1 < img_height:
+                if x - 1 >= 0:
+                    gray[y + 1, x - 1] = max(0, min(255, gray[y + 1, x - 1] + error * 3 / 16))
+                gray[y + 1, x] = max(0, min(255, gray[y + 1, x] + error * 5 / 16))
+                if x + 1 < img_width:
+                    gray[y + 1, x + 1] = max(0, min(255, gray[y + 1, x + 1] + error * 1 / 16))
+    return gray
 
-    if color_mode == "original":
-        # Render with per-line average color (approximation for non-OpenCV text)
-        # For simplicity, use dominant color of frame
-        avg = frame.mean(axis=(0, 1)).astype(int)
-        text_color = tuple(int(c) for c in avg)
-        bg = (0, 0, 0)
-    else:
-        text_color = color_map.get(color_mode, (255, 255, 255))
-        bg = (0, 0, 0)
 
-    return _render_text_to_frame(lines, w, h, color=text_color, bg_color=bg)
+def _braille_bits(on: np.ndarray) -> np.ndarray:
+    """Braille pattern per 2×4 block of a (rows*4, cols*2) dot mask."""
+    rows, cols = on.shape[0] // 4, on.shape[1] // 2
+    blocks = on.reshape(rows, 4, cols, 2).transpose(0, 2, 1, 3)
+    return (blocks * np.array(BRAILLE_DOTS)).sum(axis=(2, 3))
 
 
 def braille_art(frame: np.ndarray, width: int = 80, threshold: int = 128,
-                invert: bool = False, dither: bool = True,
+                invert: bool = False, dither=True,
                 color_mode: str = "mono", seed: int = 42, **kwargs) -> np.ndarray:
     """Convert frame to braille unicode art rendered back as an image.
 
@@ -164,8 +223,10 @@ def braille_art(frame: np.ndarray, width: int = 80, threshold: int = 128,
         width: Braille width in characters.
         threshold: Brightness threshold for dot on/off (0-255).
         invert: Invert dot pattern.
-        dither: Apply Floyd-Steinberg dithering (better detail).
-        color_mode: "mono" (white on black), "green" (matrix), "amber" (retro).
+        dither: True/"ordered" (Bayer ordered dither, vectorized), "floyd"
+            (Floyd-Steinberg error diffusion, per-pixel and slow), or False.
+        color_mode: "mono" (white on black), "green" (matrix), "amber" (retro),
+            "original" (each character in its source cell's colour).
         seed: Random seed (unused).
 
     Returns:
@@ -189,48 +250,20 @@ def braille_art(frame: np.ndarray, width: int = 80, threshold: int = 128,
     small = cv2.resize(frame, (img_width, img_height), interpolation=cv2.INTER_AREA)
     gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
 
-    # Floyd-Steinberg dithering
-    if dither:
-        for y in range(img_height):
-            for x in range(img_width):
-                old_val = gray[y, x]
-                new_val = 255.0 if old_val > threshold else 0.0
-                error = old_val - new_val
-                gray[y, x] = new_val
-                if x + 1 < img_width:
-                    gray[y, x + 1] = max(0, min(255, gray[y, x + 1] + error * 7 / 16))
-                if y + 1 < img_height:
-                    if x - 1 >= 0:
-                        gray[y + 1, x - 1] = max(0, min(255, gray[y + 1, x - 1] + error * 3 / 16))
-                    gray[y + 1, x] = max(0, min(255, gray[y + 1, x] + error * 5 / 16))
-                    if x + 1 < img_width:
-                        gray[y + 1, x + 1] = max(0, min(255, gray[y + 1, x + 1] + error * 1 / 16))
-
-    # Convert to braille characters
-    lines = []
-    for row in range(char_rows):
-        line = ""
-        for col in range(char_cols):
-            bits = 0
-            for dy in range(4):
-                for dx in range(2):
-                    py = row * 4 + dy
-                    px = col * 2 + dx
-                    if py < img_height and px < img_width:
-                        pixel_on = gray[py, px] > threshold
-                        if invert:
-                            pixel_on = not pixel_on
-                        if pixel_on:
-                            bits |= BRAILLE_DOTS[dy][dx]
-            line += chr(0x2800 + bits)
-        lines.append(line)
-
-    # Determine text color
-    color_map = {
-        "mono": (255, 255, 255),
-        "green": (0, 255, 0),
-        "amber": (0, 191, 255),
-    }
-    text_color = color_map.get(color_mode, (255, 255, 255))
-
-    return _render_text_to_frame(lines, w, h, color=text_color, bg_color=(0, 0, 0))
+    if dither == "floyd":
+        gray = _floyd_steinberg(gray, threshold)
+    elif dither:
+        # Ordered dither: the threshold varies over a 4×4 Bayer cell
+        gray = gray - (_tile(_BAYER4, img_height, img_width) + 0.5 - 8) * (256 / 16)
+
+    on = gray > threshold
+    if invert:
+        on = ~on
+    indices = _braille_bits(on)
+
+    if color_mode == "original":
+        colors = cv2.resize(frame, (char_cols, char_rows), interpolation=cv2.INTER_AREA)
+    else:
+        colors = TEXT_COLORS.get(color_mode, TEXT_COLORS["mono"])
+    atlas = _braille_atlas(max(1, w // char_cols), max(1, h // char_rows))
+    return _compose(atlas, indices, colors, h, w)
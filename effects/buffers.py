@@ -0,0 +1,88 @@
+"""
+Entropic — Frame Buffer Pool
+Reuse intermediate frame arrays across the frames of a render.
+
+Each effect step used to allocate a fresh output frame per frame. A
+BufferPool (one per RenderContext) hands out arrays keyed by (shape, dtype)
+and takes them back once the next step has consumed them, so a render
+settles on a few buffers that are reused for every frame.
+
+Effects opt in by accepting an `out` argument: a preallocated array shaped
+and typed like their input, which they may fill and return (or ignore and
+return a new array). `out` never aliases the input frame.
+
+Frames are read-only between effects. An effect never writes to its input
+(it copies first if it has to), so pass-through effects return their input
+and stateful effects keep frames by reference instead of copying them. In
+return, whoever hands a frame to a chain must not modify it afterwards.
+"""
+
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+
+def read_only(frame: np.ndarray) -> np.ndarray:
+    """A non-writeable view of frame (frame itself if already read-only)."""
+    if not frame.flags.writeable:
+        return frame
+    view = frame.view()
+    view.setflags(write=False)
+    return view
+
+
+class BufferPool:
+    """Free arrays keyed by (shape, dtype), with a high-water mark.
+
+    Attributes:
+        allocated_bytes: Bytes of all arrays the pool has created.
+        in_use_bytes: Bytes currently handed out.
+        high_water_bytes: Peak of in_use_bytes.
+    """
+
+    def __init__(self):
+        self._free = defaultdict(list)
+        self._lock = threading.Lock()
+        self.allocated_bytes = 0
+        self.in_use_bytes = 0
+        self.high_water_bytes = 0
+
+    def take(self, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        """An array of the given shape and dtype (contents undefined)."""
+        key = (tuple(shape), np.dtype(dtype))
+        with self._lock:
+            free = self._free[key]
+            buf = free.pop() if free else None
+            if buf is None:
+                buf = np.empty(key[0], dtype=key[1])
+                self.allocated_bytes += buf.nbytes
+            self.in_use_bytes += buf.nbytes
+            self.high_water_bytes = max(self.high_water_bytes, self.in_use_bytes)
+        return buf
+
+    def give(self, buf: np.ndarray):
+        """Return an array from take() for reuse. The caller must drop it."""
+        with self._lock:
+            self._free[(buf.shape, buf.dtype)].append(buf)
+            self.in_use_bytes -= buf.nbytes
+
+    def discard(self, buf: np.ndarray):
+        """Stop tracking an array from take() that is still in use elsewhere."""
+        with self._lock:
+            self.in_use_bytes -= buf.nbytes
+            self.allocated_bytes -= buf.nbytes
+
+    def clear(self):
+        """Release the free arrays (handed-out arrays stay valid)."""
+        with self._lock:
+            for free in self._free.values():
+                self.allocated_bytes -= sum(buf.nbytes for buf in free)
+            self._free.clear()
+
+    def stats(self) -> dict:
+        return {
+            "allocated_bytes": self.allocated_bytes,
+            "in_use_bytes": self.in_use_bytes,
+            "high_water_bytes": self.high_water_bytes,
+        }
@@ -0,0 +1,350 @@
+"""
+Entropic — Compiled Effect Chains
+Resolve an effect chain once per render instead of once per frame.
+
+compile_chain() validates the chain, looks up every effect, merges its
+defaults, inspects its signature for temporal context and splits off the
+special params (mix, region, feather). The returned ChainPlan only calls
+the effect functions:
+
+    plan = compile_chain(effects_list)
+    for i, frame in enumerate(frames):
+        out = plan(frame, i, total_frames)
+
+Stateful effects (stutter, feedback, datamosh, ...) keep their frame history
+in a RenderContext: one dict per chain slot, owned by the plan. Two plans
+never share state, so concurrent renders and previews can't corrupt each
+other, and the same effect can appear twice in one chain.
+
+compile_chain(..., working_format="float32") keeps frames in float32 between
+effects that accept it instead of rounding to uint8 after every effect (see
+effects.formats); the plan still returns uint8.
+
+Effects that accept an `out` array write into buffers from the context's
+BufferPool (effects.buffers), so intermediate frames are reused across frames
+instead of allocated per effect. Effects get read-only frames: pass-through
+effects return them as is and stateful effects keep them by reference, so
+frames handed to a plan must not be modified afterwards.
+"""
+
+import inspect
+import warnings
+
+import numpy as np
+
+from effects import get_effect, get_caps
+from effects.adsr import adsr_wrap
+from effects.buffers import BufferPool, read_only
+from effects.formats import WORKING_FORMATS, like_input, to_float32, to_uint8
+
+
+class RenderContext:
+    """Frame state of one render, one dict per stateful chain slot.
+
+    Slots are keyed by (chain position, effect name), so automated variants
+    of the same chain keep their state while a reordered chain starts fresh.
+    The render's intermediate frame buffers live in `pool`.
+    """
+
+    def __init__(self):
+        self.slots = {}
+        self.pool = BufferPool()
+
+    def slot(self, key: tuple) -> dict:
+        """State dict for a chain slot (created empty on first use)."""
+        return self.slots.setdefault(key, {})
+
+    def reset(self):
+        """Drop all state (e.g. before re-rendering from the start)."""
+        self.slots.clear()
+
+
+class EffectStep:
+    """One effect with its params resolved; call as step(frame, frame_index, total_frames).
+
+    Args:
+        name: Registered effect name.
+        params: Effect params, including the optional special params
+            mix (0.0-1.0), region and feather.
+        stacklevel: Stack level for the region + temporal warning.
+    """
+
+    def __init__(self, name: str, params: dict, stacklevel: int = 2):
+        params = dict(params)
+        mix = float(params.pop("mix", 1.0))
+        self.mix = max(0.0, min(1.0, mix))
+        self.region = params.pop("region", None)
+        self.feather = int(params.pop("feather", 0))
+
+        self.name = name
+        self.fn, defaults = get_effect(name)
+        self.params = {**defaults, **params}
+
+        # Temporal context is injected only for effects that accept it
+        sig = inspect.signature(self.fn).parameters
+        self.wants_index = "frame_index" in sig
+        self.wants_total = "total_frames" in sig
+        self.wants_state = "state" in sig
+        self.slot = None  # (chain position, name) for stateful steps
+        self.stateful = get_caps(name)["stateful"]
+        self.float32 = get_caps(name)["float32"]
+        # Output buffers are only useful when the effect's result is the output
+        self.wants_out = "out" in sig and self.region is None and self.mix >= 1.0
+
+        # Frame state follows the region crop, not the whole frame
+        if self.region is not None and self.stateful:
+            warnings.warn(
+                f"Region + temporal effect '{name}' is experimental. "
+                f"Temporal state only sees the region and may produce unexpected results "
+                f"when combined with region masking.",
+                stacklevel=stacklevel
+            )
+        self._geometry = {}  # (h, w) -> region geometry
+
+    def __call__(
+        self,
+        frame: np.ndarray,
+        frame_index: int = 0,
+        total_frames: int = 1,
+        state: dict | None = None,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        kwargs = self.params
+        if self.wants_index or self.wants_total or state is not None or out is not None:
+            kwargs = dict(kwargs)
+            if self.wants_index:
+                kwargs["frame_index"] = frame_index
+            if self.wants_total:
+                kwargs["total_frames"] = total_frames
+            if state is not None and self.wants_state:
+                kwargs["state"] = state
+            if out is not None and self.wants_out:
+                kwargs["out"] = out
+
+        # Apply with region masking if specified
+        if self.region is not None:
+            from core.region import region_geometry, composite_region
+            size = frame.shape[:2]
+            if size not in self._geometry:
+                self._geometry[size] = region_geometry(self.region, size[0], size[1], self.feather)
+            wet = composite_region(frame, self.fn, self._geometry[size], **kwargs)
+        else:
+            wet = self.fn(frame, **kwargs)
+
+        # Dry/wet blend (parallel processing)
+        if self.mix >= 1.0:
+            return wet
+        if self.mix <= 0.0:
+            return read_only(frame)
+
+        # Linear blend: output = dry * (1 - mix) + wet * mix
+        blended = (frame.astype(np.float32, copy=False) * (1.0 - self.mix)
+                   + wet.astype(np.float32, copy=False) * self.mix)
+        return like_input(np.clip(blended, 0, 255), frame)
+
+
+class EnvelopeStep:
+    """An effect wrapped in an ADSR envelope (see apply_chain)."""
+
+    def __init__(self, name: str, params: dict, envelope: dict):
+        self.name = name
+        self.fn, defaults = get_effect(name)
+        self.params = {**defaults, **params}
+        self.wants_state = "state" in inspect.signature(self.fn).parameters
+        self.slot = None
+        self.stateful = get_caps(name)["stateful"]
+        self.float32 = False
+        self.wants_out = False
+        self.envelope = {
+            "attack": envelope.get("attack", 0),
+            "decay": envelope.get("decay", 0),
+            "sustain": envelope.get("sustain", 1.0),
+            "release": envelope.get("release", 0),
+            "trigger_source": envelope.get("trigger", "lfo"),
+            "trigger_threshold": envelope.get("rate", 1.0),
+            "seed": self.params.get("seed", 42),
+        }
+
+    def __call__(
+        self,
+        frame: np.ndarray,
+        frame_index: int = 0,
+        total_frames: int = 1,
+        state: dict | None = None,
+    ) -> np.ndarray:
+        params = dict(self.params)
+        if state is not None and self.wants_state:
+            params["state"] = state
+        return adsr_wrap(
+            frame, self.fn, params,
+            frame_index=frame_index,
+            total_frames=total_frames,
+            **self.envelope,
+        )
+
+
+class ChainPlan:
+    """A compiled effect chain; call as plan(frame, frame_index, total_frames).
+
+    Args:
+        steps: EffectStep/EnvelopeStep/LutStep/WarpStep list.
+        context: RenderContext for stateful steps. None = a fresh one.
+        working_format: "uint8" (frames pass between steps as they come) or
+            "float32" (frames stay float32 across steps with a float32 attribute
+            and are quantized before other steps and at the end).
+    """
+
+    def __init__(
+        self,
+        steps: list,
+        context: RenderContext | None = None,
+        working_format: str = "uint8",
+    ):
+        if working_format not in WORKING_FORMATS:
+            raise ValueError(f"Unknown working format: {working_format} (expected one of {WORKING_FORMATS})")
+        self.steps = steps
+        self.context = context if context is not None else RenderContext()
+        self.working_format = working_format
+        # Only stateful steps get a slot
+        self._slots = [step.slot for step in steps]
+        # Pool buffers for step outputs, except the last (it goes to the
+        # caller) and those feeding a stateful step (it may keep the frame,
+        # with or without a state param)
+        self._pooled = [
+            getattr(step, "wants_out", False) and i + 1 < len(steps)
+            and not _keeps_frames(steps[i + 1])
+            for i, step in enumerate(steps)
+        ]
+        # Conversion before each step; None = pass the frame through as is
+        if working_format == "float32":
+            self._converts = [to_float32 if getattr(step, "float32", False) else to_uint8 for step in steps]
+        else:
+            self._converts = [None] * len(steps)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    @property
+    def names(self) -> list[str]:
+        return [step.name for step in self.steps]
+
+    def __call__(
+        self,
+        frame: np.ndarray,
+        frame_index: int = 0,
+        total_frames: int = 1,
+        context: RenderContext | None = None,
+    ) -> np.ndarray:
+        if context is None:
+            context = self.context
+        pool = context.pool
+        leased = None  # Pool buffer holding the current frame
+        for step, key, convert, pooled in zip(self.steps, self._slots, self._converts, self._pooled):
+            if convert is not None:
+                frame = convert(frame)
+            frame = read_only(frame)
+            state = context.slot(key) if key is not None else None
+            if pooled:
+                out = pool.take(frame.shape, frame.dtype)
+                result = step(frame, frame_index, total_frames, state, out=out)
+                if result is not out:
+                    _release(pool, out, result)
+                    out = None
+            else:
+                out = None
+                result = step(frame, frame_index, total_frames, state)
+            if leased is not None:
+                _release(pool, leased, result)
+            leased, frame = out, result
+        if self.working_format != "uint8":
+            frame = to_uint8(frame)
+        return frame
+
+    def stages(
+        self,
+        frame: np.ndarray,
+        frame_index: int = 0,
+        total_frames: int = 1,
+        context: RenderContext | None = None,
+        start: int = 0,
+    ):
+        """Run steps[start:], yielding the frame after every step (for caching).
+
+        Frames are yielded in the working format, not quantized.
+        """
+        if context is None:
+            context = self.context
+        for step, key, convert in zip(self.steps[start:], self._slots[start:], self._converts[start:]):
+            if convert is not None:
+                frame = convert(frame)
+            frame = read_only(frame)
+            state = context.slot(key) if key is not None else None
+            frame = step(frame, frame_index, total_frames, state)
+            yield frame
+
+
+def _keeps_frames(step) -> bool:
+    """Whether a step may hold on to its input frame after returning."""
+    return getattr(step, "wants_state", False) or getattr(step, "stateful", False)
+
+
+def _release(pool: BufferPool, buf: np.ndarray, result: np.ndarray):
+    """Return buf to the pool unless result still uses its memory."""
+    if np.may_share_memory(buf, result):
+        pool.discard(buf)
+    else:
+        pool.give(buf)
+
+
+def compile_chain(
+    effects_list: list[dict],
+    stacklevel: int = 2,
+    context: RenderContext | None = None,
+    fuse: bool = True,
+    cube: bool = False,
+    working_format: str = "uint8",
+) -> ChainPlan:
+    """Compile an effect chain (same format as apply_chain) into a ChainPlan.
+
+    Args:
+        effects_list: Effect chain list.
+        stacklevel: Stack level for warnings raised while compiling.
+        context: RenderContext to keep the chain's frame state in. None = a
+            fresh one per plan.
+        fuse: Bake runs of channelwise effects into exact lookup tables
+            (effects.lut) and compose runs of warps into one resample
+            (effects.warp). Off keeps one step per effect.
+        cube: Also bake other pointwise runs into a 256³ RGB cube (slow to
+            build; for long renders).
+        working_format: "uint8" or "float32" (see effects.formats). float32
+            chains skip lookup-table fusion, since tables are 8-bit.
+
+    Raises:
+        SafetyError: If the chain is too deep.
+        ValueError: For unknown or video-level effects, or an unknown
+            working format.
+    """
+    from core.safety import validate_chain_depth
+    validate_chain_depth(effects_list)
+
+    steps = []
+    for index, effect in enumerate(effects_list):
+        name = effect["name"]
+        params = effect.get("params", {})
+        envelope = effect.get("envelope")
+        if envelope is not None:
+            step = EnvelopeStep(name, params, envelope)
+        else:
+            step = EffectStep(name, params, stacklevel=stacklevel + 1)
+        # State follows the effect's chain position, not its fused step
+        if step.wants_state:
+            step.slot = (index, name)
+        steps.append(step)
+
+    if fuse:
+        from effects.lut import fuse_steps
+        from effects.warp import fuse_warps
+        if working_format == "uint8":
+            steps = fuse_steps(steps, cube=cube)
+        steps = fuse_warps(steps)
+    return ChainPlan(steps, context, working_format)
@@ -5,9 +5,27 @@ Offsets RGB channels independently to create chromatic aberration.
 
 import numpy as np
 
+from effects.warp import cached_map, grid, pack
+
+
+@cached_map
+def channelshift_map(h: int, w: int, r_offset: tuple = (10, 0),
+                     g_offset: tuple = (0, 0), b_offset: tuple = (-10, 0)) -> np.ndarray:
+    """Warp map for channelshift, used when fused with other warps (see effects.warp).
+
+    On its own, channelshift stays three np.roll calls: per-channel remaps
+    are slower than rolling.
+    """
+    ys, xs = grid(h, w)
+    offsets = [r_offset, g_offset, b_offset]
+    dx = np.array([int(o[0]) for o in offsets])[:, None, None]
+    dy = np.array([int(o[1]) for o in offsets])[:, None, None]
+    return pack((ys[None] - dy) % h, (xs[None] - dx) % w)
+
 
 def channelshift(frame: np.ndarray, r_offset: tuple = (10, 0),
-                 g_offset: tuple = (0, 0), b_offset: tuple = (-10, 0)) -> np.ndarray:
+                 g_offset: tuple = (0, 0), b_offset: tuple = (-10, 0),
+                 out: np.ndarray | None = None) -> np.ndarray:
     """Shift R, G, B channels by independent x,y pixel offsets.
 
     Args:
@@ -15,11 +33,12 @@ def channelshift(frame: np.ndarray, r_offset: tuple = (10, 0),
         r_offset: (x, y) pixel shift for red channel.
         g_offset: (x, y) pixel shift for green channel.
         b_offset: (x, y) pixel shift for blue channel.
+        out: Optional preallocated output array (see effects.buffers).
 
     Returns:
         Channel-shifted frame.
     """
-    result = np.zeros_like(frame)
+    result = np.zeros_like(frame) if out is None else out
 
     for ch_idx, (dx, dy) in enumerate([r_offset, g_offset, b_offset]):
         dx, dy = int(dx), int(dy)
@@ -6,6 +6,8 @@ Hue shift, contrast, saturation, exposure, invert, temperature.
 import numpy as np
 import cv2
 
+from effects.formats import like_input
+
 
 def hue_shift(frame: np.ndarray, degrees: float = 180) -> np.ndarray:
     """Rotate the hue wheel by N degrees.
@@ -35,7 +37,7 @@ def contrast_crush(frame: np.ndarray, amount: float = 50,
     Returns:
         Contrast-modified frame.
     """
-    f = frame.astype(np.float32) / 255.0
+    f = frame.astype(np.float32, copy=False) / 255.0
     amount = max(-100, min(100, float(amount)))
 
     if curve == "hard":
@@ -55,7 +57,7 @@ def contrast_crush(frame: np.ndarray, amount: float = 50,
         factor = (259 * (amount + 255)) / (255 * (259 - amount))
         f = factor * (f - 0.5) + 0.5
 
-    return np.clip(f * 255, 0, 255).astype(np.uint8)
+    return like_input(np.clip(f * 255, 0, 255), frame)
 
 
 def saturation_warp(frame: np.ndarray, amount: float = 1.5,
@@ -105,7 +107,7 @@ def brightness_exposure(frame: np.ndarray, stops: float = 1.0,
     stops = max(-3.0, min(3.0, float(stops)))
     multiplier = 2.0 ** stops
 
-    f = frame.astype(np.float32) * multiplier
+    f = frame.astype(np.float32, copy=False) * multiplier
 
     if clip_mode == "wrap":
         f = np.mod(f, 256)
@@ -116,7 +118,7 @@ def brightness_exposure(frame: np.ndarray, stops: float = 1.0,
     else:
         f = np.clip(f, 0, 255)
 
-    return f.astype(np.uint8)
+    return like_input(f, frame)
 
 
 def color_invert(frame: np.ndarray, channel: str = "all",
@@ -143,7 +145,7 @@ def color_invert(frame: np.ndarray, channel: str = "all",
         inverted = 255.0 - result[:, :, ch_idx]
         result[:, :, ch_idx] = result[:, :, ch_idx] * (1 - amount) + inverted * amount
 
-    return np.clip(result, 0, 255).astype(np.uint8)
+    return like_input(np.clip(result, 0, 255), frame)
 
 
 def color_temperature(frame: np.ndarray, temp: float = 30) -> np.ndarray:
@@ -166,7 +168,7 @@ def color_temperature(frame: np.ndarray, temp: float = 30) -> np.ndarray:
     # Slight green adjustment for natural look
     result[:, :, 1] = np.clip(result[:, :, 1] + shift * 0.1, 0, 255)  # Green
 
-    return result.astype(np.uint8)
+    return like_input(result, frame)
 
 
 def tape_saturation(frame: np.ndarray, drive: float = 1.5,
@@ -186,12 +188,12 @@ def tape_saturation(frame: np.ndarray, drive: float = 1.5,
     """
     drive = max(0.5, min(5.0, float(drive)))
     warmth = max(0.0, min(1.0, float(warmth)))
-    f = frame.astype(np.float32) / 255.0
+    f = frame.astype(np.float32, copy=False) / 255.0
     f = np.tanh(f * drive) / np.tanh(drive)
     if warmth > 0:
         f[:, :, 0] = np.clip(f[:, :, 0] + warmth * 0.05, 0, 1)
         f[:, :, 2] = np.clip(f[:, :, 2] - warmth * 0.03, 0, 1)
-    return np.clip(f * 255, 0, 255).astype(np.uint8)
+    return like_input(np.clip(f * 255, 0, 255), frame)
 
 
 def cyanotype(frame: np.ndarray, intensity: float = 1.0) -> np.ndarray:
@@ -208,13 +210,14 @@ def cyanotype(frame: np.ndarray, intensity: float = 1.0) -> np.ndarray:
         Cyanotype-tinted frame.
     """
     intensity = max(0.0, min(1.0, float(intensity)))
-    gray = np.mean(frame.astype(np.float32), axis=2)
+    f = frame.astype(np.float32, copy=False)
+    gray = np.mean(f, axis=2)
     r = np.clip(gray * 0.3, 0, 255)
     g = np.clip(gray * 0.5, 0, 255)
     b = np.clip(gray * 0.9 + 30, 0, 255)
     cyan = np.stack([r, g, b], axis=2)
-    result = frame.astype(np.float32) * (1 - intensity) + cyan * intensity
-    return np.clip(result, 0, 255).astype(np.uint8)
+    result = f * (1 - intensity) + cyan * intensity
+    return like_input(np.clip(result, 0, 255), frame)
 
 
 def infrared(frame: np.ndarray, vegetation_glow: float = 1.0) -> np.ndarray:
@@ -231,8 +234,8 @@ def infrared(frame: np.ndarray, vegetation_glow: float = 1.0) -> np.ndarray:
         Infrared-simulated frame.
     """
     vegetation_glow = max(0.0, min(2.0, float(vegetation_glow)))
-    f = frame.astype(np.float32)
+    f = frame.astype(np.float32, copy=False)
     r = np.clip(f[:, :, 1] * vegetation_glow + f[:, :, 0] * 0.3, 0, 255)
     g = np.clip(f[:, :, 0] * 0.8, 0, 255)
     b = np.clip(f[:, :, 2] * 0.3, 0, 255)
-    return np.stack([r, g, b], axis=2).astype(np.uint8)
+    return like_input(np.stack([r, g, b], axis=2), frame)
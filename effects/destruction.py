@@ -13,12 +13,11 @@ import io
 # 1. DATAMOSH — Optical flow warping (simulates I-frame removal)
 # ============================================================================
 
-# Frame buffer for temporal effects
-_datamosh_prev_frame = None
-_datamosh_flow_accum = None
-_datamosh_donor_buffer = []  # Ring buffer for donor mode
-_datamosh_frozen_frame = None  # Frozen base for freeze_through
-_datamosh_pframe_flow = None  # Captured flow for pframe_extend
+# Frame state for direct calls; compiled chains pass each datamosh its own
+# dict from a RenderContext. Keys: prev_frame, flow_accum, donor_buffer
+# (ring buffer for donor mode), frozen_frame (base for freeze_through) and
+# pframe_flow (captured flow for pframe_extend).
+_datamosh_state = {}
 
 
 def datamosh(
@@ -34,6 +33,7 @@ def datamosh(
     macroblock_size: int = 16,
     donor_offset: int = 10,
     blend_mode: str = "normal",
+    state: dict | None = None,
 ) -> np.ndarray:
     """Simulated datamosh — pixels rip apart and bleed across frames.
 
@@ -70,15 +70,13 @@ def datamosh(
         donor_offset: For donor mode, how many frames back to pull pixel data from.
         blend_mode: How to mix mosh result with current frame.
                     'normal', 'multiply', 'average', 'swap'.
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
         Datamoshed frame.
     """
     import cv2
 
-    global _datamosh_prev_frame, _datamosh_flow_accum, _datamosh_donor_buffer
-    global _datamosh_frozen_frame, _datamosh_pframe_flow
-
     h, w = frame.shape[:2]
     intensity = max(0.1, min(100.0, float(intensity)))
     decay = max(0.0, min(0.9999, float(decay)))
@@ -87,21 +85,26 @@ def datamosh(
     donor_offset = max(1, min(120, int(donor_offset)))
 
     # Reset on first frame or if prev_frame is uninitialized/wrong size
-    if frame_index == 0 or _datamosh_prev_frame is None or _datamosh_prev_frame.shape != frame.shape:
-        _datamosh_prev_frame = frame.copy()
-        _datamosh_flow_accum = np.zeros((h, w, 2), dtype=np.float32)
-        _datamosh_donor_buffer = [frame.copy()]
-        _datamosh_frozen_frame = frame.copy()
-        _datamosh_pframe_flow = None
+    if state is None:
+        state = _datamosh_state
+    prev = state.get("prev_frame")
+    if frame_index == 0 or prev is None or prev.shape != frame.shape:
+        state.update(
+            prev_frame=frame.copy(),
+            flow_accum=np.zeros((h, w, 2), dtype=np.float32),
+            donor_buffer=[frame.copy()],
+            frozen_frame=frame.copy(),
+            pframe_flow=None,
+        )
         return frame.copy()
 
     # Maintain donor buffer (ring buffer of recent frames)
-    _datamosh_donor_buffer.append(frame.copy())
-    if len(_datamosh_donor_buffer) > donor_offset + 5:
-        _datamosh_donor_buffer = _datamosh_donor_buffer[-(donor_offset + 5):]
+    state["donor_buffer"].append(frame.copy())
+    if len(state["donor_buffer"]) > donor_offset + 5:
+        state["donor_buffer"] = state["donor_buffer"][-(donor_offset + 5):]
 
     # Convert to grayscale for flow calculation
-    prev_gray = cv2.cvtColor(_datamosh_prev_frame, cv2.COLOR_RGB2GRAY)
+    prev_gray = cv2.cvtColor(state["prev_frame"], cv2.COLOR_RGB2GRAY)
     curr_gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
 
     # Calculate dense optical flow — more pyramid levels at high intensity
@@ -132,30 +135,30 @@ def datamosh(
 
     # Accumulate flow — this is what makes datamosh compound
     if accumulate:
-        _datamosh_flow_accum = _datamosh_flow_accum * decay + flow * intensity
+        state["flow_accum"] = state["flow_accum"] * decay + flow * intensity
     else:
-        _datamosh_flow_accum = flow * intensity
+        state["flow_accum"] = flow * intensity
 
     # Create remap coordinates
     map_y, map_x = np.mgrid[0:h, 0:w].astype(np.float32)
-    map_x += _datamosh_flow_accum[:, :, 0]
-    map_y += _datamosh_flow_accum[:, :, 1]
+    map_x += state["flow_accum"][:, :, 0]
+    map_y += state["flow_accum"][:, :, 1]
 
     if mode == "melt":
         # REAL datamosh: warp the PREVIOUS frame by current motion
         # Old pixels move with new motion — progressively detaches from reality
         result = cv2.remap(
-            _datamosh_prev_frame, map_x, map_y,
+            state["prev_frame"], map_x, map_y,
             interpolation=cv2.INTER_LINEAR,
             borderMode=cv2.BORDER_WRAP,
         )
         # Compound: prev = warped result, so next frame warps the warp
-        _datamosh_prev_frame = result.copy()
+        state["prev_frame"] = result.copy()
 
     elif mode == "bloom":
         # Smear previous frame outward — nothing from current frame enters
         result = cv2.remap(
-            _datamosh_prev_frame, map_x, map_y,
+            state["prev_frame"], map_x, map_y,
             interpolation=cv2.INTER_LINEAR,
             borderMode=cv2.BORDER_WRAP,
         )
@@ -164,7 +167,7 @@ def datamosh(
             shift = int(intensity * 2)
             result[:, :, 0] = np.roll(result[:, :, 0], shift, axis=1)
             result[:, :, 2] = np.roll(result[:, :, 2], -shift, axis=1)
-        _datamosh_prev_frame = result.copy()
+        state["prev_frame"] = result.copy()
 
     elif mode == "replace":
         # I-frame skip: blocks of previous frame stamped over current
@@ -180,16 +183,16 @@ def datamosh(
                     if rng.random() < 0.3 and intensity > 2.0:
                         src_y = rng.randint(0, max(1, h - bh))
                         src_x = rng.randint(0, max(1, w - bw))
-                        result[by:by+bh, bx:bx+bw] = _datamosh_prev_frame[src_y:src_y+bh, src_x:src_x+bw]
+                        result[by:by+bh, bx:bx+bw] = state["prev_frame"][src_y:src_y+bh, src_x:src_x+bw]
                     else:
-                        result[by:by+bh, bx:bx+bw] = _datamosh_prev_frame[by:by+bh, bx:bx+bw]
-        _datamosh_prev_frame = frame.copy()
+                        result[by:by+bh, bx:bx+bw] = state["prev_frame"][by:by+bh, bx:bx+bw]
+        state["prev_frame"] = frame.copy()
 
     elif mode == "annihilate":
         # EVERYTHING AT ONCE: warp prev + block replace + row tear + channel split
         # 1. Warp previous frame
         warped = cv2.remap(
-            _datamosh_prev_frame, map_x, map_y,
+            state["prev_frame"], map_x, map_y,
             interpolation=cv2.INTER_LINEAR,
             borderMode=cv2.BORDER_WRAP,
         )
@@ -222,7 +225,7 @@ def datamosh(
         result[:, :, 0] = np.roll(result[:, :, 0], ch_shift, axis=1)
         result[:, :, 2] = np.roll(result[:, :, 2], -ch_shift, axis=1)
         result[:, :, 1] = np.roll(result[:, :, 1], ch_shift // 2, axis=0)
-        _datamosh_prev_frame = warped.copy()
+        state["prev_frame"] = warped.copy()
 
     elif mode == "freeze_through":
         # AUTHENTIC I-FRAME REMOVAL: Previous frame stays frozen.
@@ -235,7 +238,7 @@ def datamosh(
         mb = macroblock_size
         thresh = max(0.5, motion_threshold if motion_threshold > 0 else intensity * 0.5)
 
-        result = _datamosh_frozen_frame.copy()
+        result = state["frozen_frame"].copy()
         for by in range(0, h, mb):
             for bx in range(0, w, mb):
                 bh = min(mb, h - by)
@@ -245,9 +248,9 @@ def datamosh(
                     # This block has enough motion — new pixels break through
                     result[by:by+bh, bx:bx+bw] = frame[by:by+bh, bx:bx+bw]
                     # Update the frozen frame for this block too
-                    _datamosh_frozen_frame[by:by+bh, bx:bx+bw] = frame[by:by+bh, bx:bx+bw]
+                    state["frozen_frame"][by:by+bh, bx:bx+bw] = frame[by:by+bh, bx:bx+bw]
 
-        _datamosh_prev_frame = frame.copy()
+        state["prev_frame"] = frame.copy()
 
     elif mode == "pframe_extend":
         # P-FRAME DUPLICATION: Capture motion vectors from one moment,
@@ -256,33 +259,33 @@ def datamosh(
 
         # Capture flow on the first non-reset frame, or when motion is strong
         flow_mag = np.sqrt(flow[:, :, 0]**2 + flow[:, :, 1]**2).mean()
-        if _datamosh_pframe_flow is None or flow_mag > intensity * 2.0:
-            _datamosh_pframe_flow = flow.copy()
+        if state["pframe_flow"] is None or flow_mag > intensity * 2.0:
+            state["pframe_flow"] = flow.copy()
 
         # Amplify the captured flow and apply it cumulatively
-        extend_flow = _datamosh_pframe_flow * intensity * 2.0
+        extend_flow = state["pframe_flow"] * intensity * 2.0
         if accumulate:
-            _datamosh_flow_accum = _datamosh_flow_accum * decay + extend_flow
+            state["flow_accum"] = state["flow_accum"] * decay + extend_flow
         else:
-            _datamosh_flow_accum = extend_flow
+            state["flow_accum"] = extend_flow
 
         ext_map_y, ext_map_x = np.mgrid[0:h, 0:w].astype(np.float32)
-        ext_map_x += _datamosh_flow_accum[:, :, 0]
-        ext_map_y += _datamosh_flow_accum[:, :, 1]
+        ext_map_x += state["flow_accum"][:, :, 0]
+        ext_map_y += state["flow_accum"][:, :, 1]
 
         result = cv2.remap(
-            _datamosh_prev_frame, ext_map_x, ext_map_y,
+            state["prev_frame"], ext_map_x, ext_map_y,
             interpolation=cv2.INTER_LINEAR,
             borderMode=cv2.BORDER_WRAP,
         )
-        _datamosh_prev_frame = result.copy()
+        state["prev_frame"] = result.copy()
 
     elif mode == "donor":
         # DONOR-BASED MOSH: Motion vectors from current frame, but pixel data
         # pulled from a different temporal position (donor_offset frames back).
         # Simulates the After Effects "donor layer" technique.
-        buf_idx = max(0, len(_datamosh_donor_buffer) - 1 - donor_offset)
-        donor_frame = _datamosh_donor_buffer[buf_idx]
+        buf_idx = max(0, len(state["donor_buffer"]) - 1 - donor_offset)
+        donor_frame = state["donor_buffer"][buf_idx]
 
         # Warp the donor frame using current motion
         result = cv2.remap(
@@ -290,7 +293,7 @@ def datamosh(
             interpolation=cv2.INTER_LINEAR,
             borderMode=cv2.BORDER_WRAP,
         )
-        _datamosh_prev_frame = frame.copy()
+        state["prev_frame"] = frame.copy()
 
     else:  # "rip" (flow already amplified above)
         result = cv2.remap(
@@ -306,7 +309,7 @@ def datamosh(
                 sz = rng.randint(1, max(2, int(intensity)))
                 ey, ex = min(y + sz, h), min(x + sz, w)
                 result[y:ey, x:ex] = 0 if rng.random() < 0.5 else 255
-        _datamosh_prev_frame = frame.copy()
+        state["prev_frame"] = frame.copy()
 
     # Apply blend mode (from transcript learnings — multiply, average, swap)
     if blend_mode == "multiply":
@@ -318,7 +321,7 @@ def datamosh(
     elif blend_mode == "swap":
         # Swap: use motion magnitude to decide which pixels come from which source
         flow_mag = np.sqrt(
-            _datamosh_flow_accum[:, :, 0]**2 + _datamosh_flow_accum[:, :, 1]**2
+            state["flow_accum"][:, :, 0]**2 + state["flow_accum"][:, :, 1]**2
         )
         if flow_mag.max() > 0:
             swap_mask = (flow_mag / flow_mag.max()) > 0.5
@@ -697,7 +700,7 @@ def data_bend(
 # 8. FLOW DISTORT — Motion-based warping (optical flow as displacement map)
 # ============================================================================
 
-_flow_prev = None
+_flow_state = {}  # Direct calls; chains pass per-render state
 
 
 def flow_distort(
@@ -706,6 +709,7 @@ def flow_distort(
     direction: str = "forward",
     frame_index: int = 0,
     total_frames: int = 1,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Warp frame using optical flow as displacement map.
 
@@ -716,22 +720,24 @@ def flow_distort(
         frame: (H, W, 3) uint8 RGB array.
         strength: Displacement multiplier (0.5-50.0).
         direction: 'forward' (push) or 'backward' (pull).
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
         Flow-distorted frame.
     """
     import cv2
 
-    global _flow_prev
-
     h, w = frame.shape[:2]
     strength = max(0.5, min(50.0, float(strength)))
 
-    if frame_index == 0 or _flow_prev is None or _flow_prev.shape != frame.shape:
-        _flow_prev = frame.copy()
+    if state is None:
+        state = _flow_state
+    prev = state.get("prev_frame")
+    if frame_index == 0 or prev is None or prev.shape != frame.shape:
+        state["prev_frame"] = frame.copy()
         return frame.copy()
 
-    prev_gray = cv2.cvtColor(_flow_prev, cv2.COLOR_RGB2GRAY)
+    prev_gray = cv2.cvtColor(prev, cv2.COLOR_RGB2GRAY)
     curr_gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
 
     flow = cv2.calcOpticalFlowFarneback(
@@ -751,7 +757,7 @@ def flow_distort(
         borderMode=cv2.BORDER_WRAP,
     )
 
-    _flow_prev = frame.copy()
+    state["prev_frame"] = frame.copy()
     return result
 
 
@@ -792,16 +798,17 @@ def film_grain(
     grain = rng.normal(0, 1, (gh, gw)).astype(np.float32)
 
     if grain_size > 1:
-        grain = np.repeat(np.repeat(grain, grain_size, axis=0), grain_size, axis=1)
-        grain = grain[:h, :w]
+        # Nearest-neighbour upscale: square grains, stretched slightly when
+        # the frame isn't a multiple of grain_size
+        import cv2
+        grain = cv2.resize(grain, (w, h), interpolation=cv2.INTER_NEAREST)
 
     luminance = np.mean(f, axis=2) / 255.0
     midtone_mask = 1.0 - 4.0 * (luminance - 0.5) ** 2
     midtone_mask = np.clip(midtone_mask, 0.2, 1.0)
 
     grain_scaled = grain * intensity * 120.0 * midtone_mask
-    for c in range(3):
-        f[:, :, c] += grain_scaled
+    f += grain_scaled[:, :, np.newaxis]
 
     return np.clip(f, 0, 255).astype(np.uint8)
 
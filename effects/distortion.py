@@ -6,9 +6,34 @@ Wave distortion, displacement, mirror, and geometric glitches.
 import numpy as np
 from PIL import Image
 
+from effects.formats import like_input
+from effects.warp import cached_map, grid, pack, apply_warp
+
+
+@cached_map
+def wave_map(h: int, w: int, amplitude: float = 10.0,
+             frequency: float = 0.05, direction: str = "horizontal",
+             subpixel: bool = False) -> np.ndarray:
+    """Warp map for wave_distort (see effects.warp)."""
+    amplitude = max(0, min(amplitude, max(h, w) // 2))
+    ys, xs = grid(h, w)
+    along = w if direction == "vertical" else h
+    shifts = amplitude * np.sin(2 * np.pi * frequency * np.arange(along))
+    if not subpixel:
+        shifts = shifts.astype(np.int64)
+    if direction == "vertical":
+        # Each column rolls down by its own shift
+        ys = (ys - shifts[None, :]) % h
+    else:
+        # Each row rolls right by its own shift
+        xs = (xs - shifts[:, None]) % w
+    return pack(ys, xs)
+
 
 def wave_distort(frame: np.ndarray, amplitude: float = 10.0,
-                 frequency: float = 0.05, direction: str = "horizontal") -> np.ndarray:
+                 frequency: float = 0.05, direction: str = "horizontal",
+                 subpixel: bool = False,
+                 out: np.ndarray | None = None) -> np.ndarray:
     """Apply sine wave distortion to the image.
 
     Args:
@@ -16,30 +41,64 @@ def wave_distort(frame: np.ndarray, amplitude: float = 10.0,
         amplitude: Pixel displacement amount.
         frequency: Wave frequency (higher = more waves).
         direction: 'horizontal' or 'vertical'.
+        subpixel: Interpolate fractional shifts (smooth wave) instead of
+            rounding them down to whole pixels (stepped wave).
+        out: Optional preallocated output array (see effects.buffers).
 
     Returns:
         Distorted frame.
     """
     h, w, c = frame.shape
-    result = np.zeros_like(frame)
-    amplitude = max(0, min(amplitude, max(h, w) // 2))
+    warp = wave_map(h, w, amplitude=amplitude, frequency=frequency, direction=direction, subpixel=subpixel)
+    return apply_warp(frame, warp, out=out)
 
-    if direction == "vertical":
-        for x in range(w):
-            shift = int(amplitude * np.sin(2 * np.pi * frequency * x))
-            col = frame[:, x, :]
-            result[:, x, :] = np.roll(col, shift, axis=0)
-    else:
-        for y in range(h):
-            shift = int(amplitude * np.sin(2 * np.pi * frequency * y))
-            row = frame[y, :, :]
-            result[y, :, :] = np.roll(row, shift, axis=0)
 
-    return result
+@cached_map
+def displacement_map(h: int, w: int, block_size: int = 16,
+                     intensity: float = 10.0, seed: int = 42,
+                     layout: str = "legacy") -> np.ndarray:
+    """Warp map for displacement (see effects.warp)."""
+    block_size = max(4, min(block_size, min(h, w)))
+    intensity = max(0, min(intensity, max(h, w) // 2))
+    rng = np.random.RandomState(seed)
+    ys, xs = grid(h, w)
+    rows, cols = -(-h // block_size), -(-w // block_size)
+    low, high = -int(intensity), int(intensity) + 1
+
+    if layout == "grid":
+        # One array draw each: which blocks move, then all their offsets
+        moved = rng.random((rows, cols)) > 0.6  # Only displace some blocks
+        dy = rng.randint(low, high, (rows, cols))
+        dx = rng.randint(low, high, (rows, cols))
+    else:
+        # Block by block, offsets drawn only for moving blocks: the draw
+        # order saved seeds were tuned against
+        moved = np.zeros((rows, cols), dtype=bool)
+        dy = np.zeros((rows, cols), dtype=np.int64)
+        dx = np.zeros((rows, cols), dtype=np.int64)
+        for r in range(rows):
+            for c in range(cols):
+                if rng.random() > 0.6:
+                    moved[r, c] = True
+                    dy[r, c] = rng.randint(low, high)
+                    dx[r, c] = rng.randint(low, high)
+
+    # Source block origins are clamped so whole blocks stay inside the frame
+    y0 = np.arange(rows)[:, None] * block_size
+    x0 = np.arange(cols)[None, :] * block_size
+    oy = np.where(moved, np.clip(y0 + dy, 0, h - block_size) - y0, 0)
+    ox = np.where(moved, np.clip(x0 + dx, 0, w - block_size) - x0, 0)
+
+    by, bx = np.arange(h) // block_size, np.arange(w) // block_size
+    ys += oy.astype(np.int32)[by][:, bx]
+    xs += ox.astype(np.int32)[by][:, bx]
+    return pack(ys, xs)
 
 
 def displacement(frame: np.ndarray, block_size: int = 16,
-                 intensity: float = 10.0, seed: int = 42) -> np.ndarray:
+                 intensity: float = 10.0, seed: int = 42,
+                 layout: str = "legacy",
+                 out: np.ndarray | None = None) -> np.ndarray:
     """Randomly displace blocks of the image (glitch block effect).
 
     Args:
@@ -47,104 +106,119 @@ def displacement(frame: np.ndarray, block_size: int = 16,
         block_size: Size of each block in pixels.
         intensity: Maximum displacement in pixels.
         seed: Random seed for reproducibility.
+        layout: How the seed picks blocks. 'legacy' (default) keeps the
+            original block-by-block draws, so saved seeds keep their look;
+            'grid' draws all blocks at once, which builds much faster for
+            small blocks but picks a different set of blocks per seed.
+        out: Optional preallocated output array (see effects.buffers).
 
     Returns:
         Frame with displaced blocks.
     """
     h, w, c = frame.shape
-    block_size = max(4, min(block_size, min(h, w)))
-    intensity = max(0, min(intensity, max(h, w) // 2))
-    rng = np.random.RandomState(seed)
-    result = frame.copy()
-
-    for y in range(0, h, block_size):
-        for x in range(0, w, block_size):
-            if rng.random() > 0.6:  # Only displace some blocks
-                dy = rng.randint(-int(intensity), int(intensity) + 1)
-                dx = rng.randint(-int(intensity), int(intensity) + 1)
-                by = min(y + block_size, h)
-                bx = min(x + block_size, w)
-                # Source coordinates (clamped)
-                sy = max(0, min(y + dy, h - block_size))
-                sx = max(0, min(x + dx, w - block_size))
-                sby = min(sy + (by - y), h)
-                sbx = min(sx + (bx - x), w)
-                bh = min(by - y, sby - sy)
-                bw = min(bx - x, sbx - sx)
-                if bh > 0 and bw > 0:
-                    result[y:y+bh, x:x+bw] = frame[sy:sy+bh, sx:sx+bw]
+    warp = displacement_map(h, w, block_size=block_size, intensity=intensity, seed=seed, layout=layout)
+    return apply_warp(frame, warp, out=out)
 
-    return result
+
+@cached_map
+def mirror_map(h: int, w: int, axis: str = "vertical", position: float = 0.5) -> np.ndarray:
+    """Warp map for mirror (see effects.warp)."""
+    position = max(0.1, min(0.9, position))
+    rows, cols = np.arange(h), np.arange(w)
+
+    if axis == "horizontal":
+        split = int(h * position)
+        n = min(split, h - split)
+        rows[split:split + n] = split - 1 - np.arange(n)
+    else:
+        split = int(w * position)
+        n = min(split, w - split)
+        cols[split:split + n] = split - 1 - np.arange(n)
+
+    return pack(rows[:, None], cols[None, :])
 
 
 def mirror(frame: np.ndarray, axis: str = "vertical",
-           position: float = 0.5) -> np.ndarray:
+           position: float = 0.5, out: np.ndarray | None = None) -> np.ndarray:
     """Mirror one half of the image onto the other.
 
     Args:
         frame: (H, W, 3) uint8 RGB array.
         axis: 'vertical' (left-right) or 'horizontal' (top-bottom).
         position: Split position (0.0-1.0).
+        out: Optional preallocated output array (see effects.buffers).
 
     Returns:
         Mirrored frame.
     """
     h, w, c = frame.shape
-    position = max(0.1, min(0.9, position))
-    result = frame.copy()
+    return apply_warp(frame, mirror_map(h, w, axis=axis, position=position), out=out)
 
-    if axis == "horizontal":
-        split = int(h * position)
-        top = result[:split]
-        result[split:split + top.shape[0]] = top[::-1][:h - split]
-    else:
-        split = int(w * position)
-        left = result[:, :split]
-        result[:, split:split + left.shape[1]] = left[:, ::-1][:, :w - split]
 
-    return result
+@cached_map
+def chromatic_map(h: int, w: int, offset: int = 5,
+                  direction: str = "horizontal") -> np.ndarray | None:
+    """Warp map for chromatic_aberration, used when fused with other warps.
+
+    None for radial, which is a resize rather than a shift.
+    """
+    if direction == "radial":
+        return None
+    ys, xs = grid(h, w)
+    # R rolls forward, G stays, B rolls back
+    shifts = np.array([int(offset), 0, -int(offset)])[:, None, None]
+    if direction == "vertical":
+        ys = (ys[None] - shifts) % h
+    else:
+        xs = (xs[None] - shifts) % w
+    return pack(ys, xs)
 
 
 def chromatic_aberration(frame: np.ndarray, offset: int = 5,
-                         direction: str = "horizontal") -> np.ndarray:
+                         direction: str = "horizontal",
+                         out: np.ndarray | None = None) -> np.ndarray:
     """Simulate lens chromatic aberration by splitting RGB channels.
 
     Args:
         frame: (H, W, 3) uint8 RGB array.
         offset: Pixel offset for R and B channels.
         direction: 'horizontal', 'vertical', or 'radial'.
+        out: Optional preallocated output array (see effects.buffers).
 
     Returns:
         Frame with chromatic aberration.
     """
     h, w, c = frame.shape
-    result = np.zeros_like(frame)
+    # Every channel is written below, so out needs no clearing
+    result = np.zeros_like(frame) if out is None else out
 
-    if direction == "radial":
-        # Simple radial: shift R outward, B inward
-        cy, cx = h // 2, w // 2
-        for ch_idx, mult in enumerate([-1, 0, 1]):
-            channel = frame[:, :, ch_idx]
-            if mult == 0:
-                result[:, :, ch_idx] = channel
-            else:
-                # Approximate radial with scaled resize
-                scale = 1.0 + mult * offset * 0.002
-                img = Image.fromarray(channel)
-                new_w, new_h = int(w * scale), int(h * scale)
-                if new_w < 1 or new_h < 1:
-                    result[:, :, ch_idx] = channel
-                    continue
-                scaled = np.array(img.resize((new_w, new_h), Image.BILINEAR))
-                # Center crop/pad
-                sy = (new_h - h) // 2
-                sx = (new_w - w) // 2
-                result[:, :, ch_idx] = scaled[sy:sy+h, sx:sx+w]
-    else:
+    if direction != "radial":
+        # Per-channel rolls beat per-channel remaps; chromatic_map is for fusion
         axis = 0 if direction == "vertical" else 1
         result[:, :, 0] = np.roll(frame[:, :, 0], offset, axis=axis)   # R
         result[:, :, 1] = frame[:, :, 1]                                # G stays
         result[:, :, 2] = np.roll(frame[:, :, 2], -offset, axis=axis)  # B
+        return result
+
+    # Simple radial: shift R outward, B inward
+    cy, cx = h // 2, w // 2
+    for ch_idx, mult in enumerate([-1, 0, 1]):
+        channel = frame[:, :, ch_idx]
+        if mult == 0:
+            result[:, :, ch_idx] = channel
+        else:
+            # Approximate radial with scaled resize
+            scale = 1.0 + mult * offset * 0.002
+            img = Image.fromarray(channel)
+            new_w, new_h = int(w * scale), int(h * scale)
+            if new_w < 1 or new_h < 1:
+                result[:, :, ch_idx] = channel
+                continue
+            scaled = np.array(img.resize((new_w, new_h), Image.BILINEAR))
+            # Center crop/pad
+            sy = (new_h - h) // 2
+            sx = (new_w - w) // 2
+            result[:, :, ch_idx] = scaled[sy:sy+h, sx:sx+w]
 
     return result
 
@@ -180,7 +254,8 @@ def cumulative_smear(frame: np.ndarray, direction: str = "horizontal",
     """Cumulative smear — paint-smear / light-trail effect.
 
     Each pixel takes the max of itself or the decayed previous pixel,
-    creating directional streaks like a smeared painting.
+    creating directional streaks like a smeared painting. The recurrence
+    is sequential, so it still steps once per line (in place, in float32).
 
     Args:
         frame: (H, W, 3) uint8 RGB array.
@@ -191,11 +266,18 @@ def cumulative_smear(frame: np.ndarray, direction: str = "horizontal",
         Smeared frame.
     """
     decay = max(0.5, min(0.999, float(decay)))
-    f = frame.astype(np.float32) / 255.0
-    if direction == "vertical":
-        for y in range(1, f.shape[0]):
-            f[y] = np.maximum(f[y], f[y - 1] * decay)
-    else:
-        for x in range(1, f.shape[1]):
-            f[:, x] = np.maximum(f[:, x], f[:, x - 1] * decay)
-    return np.clip(f * 255, 0, 255).astype(np.uint8)
+    horizontal = direction != "vertical"
+
+    # The recurrence runs line by line, each step over a whole contiguous
+    # line: horizontal smears work on the transposed frame so columns are
+    # rows. Computed in place on the 0-255 scale (max commutes with scaling).
+    # A scan over the closed form (decay^i * running max of f[k] * decay^-k)
+    # is not used: np.maximum.accumulate across lines is slower than this loop.
+    lines = frame.transpose(1, 0, 2) if horizontal else frame
+    f = lines.astype(np.float32, order="C")
+    trail = np.empty_like(f[0])
+    for i in range(1, len(f)):
+        np.multiply(f[i - 1], decay, out=trail)
+        np.maximum(f[i], trail, out=f[i])
+
+    return like_input(f.transpose(1, 0, 2) if horizontal else f, frame)
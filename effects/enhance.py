@@ -6,6 +6,8 @@ Quick-win effects leveraging Pillow and OpenCV built-in operations.
 import numpy as np
 from PIL import Image, ImageFilter, ImageOps
 
+from effects.formats import like_input
+
 
 def solarize(
     frame: np.ndarray,
@@ -253,7 +255,7 @@ def parallel_compression(
     """
     crush = max(0.1, min(1.0, float(crush)))
     blend = max(0.0, min(1.0, float(blend)))
-    f = frame.astype(np.float32) / 255.0
+    f = frame.astype(np.float32, copy=False) / 255.0
     crushed = np.power(f, crush)
     result = f * (1.0 - blend) + crushed * blend
-    return np.clip(result * 255, 0, 255).astype(np.uint8)
+    return like_input(np.clip(result * 255, 0, 255), frame)
@@ -0,0 +1,47 @@
+"""
+Entropic — Working Formats
+Frame formats passed between the effects of a chain.
+
+    uint8:   (H, W, 3) 0-255 integers. What decoders produce and encoders
+             take; every effect accepts it. Each effect rounds its result
+             back to uint8, so a long chain requantizes once per effect.
+    float32: (H, W, 3) 0-255 floats, clipped but not rounded. Effects that
+             declare the "float32" cap return float32 for float32 input.
+             A chain compiled with working_format="float32" keeps frames in
+             float32 across those effects and quantizes only before an
+             effect that needs uint8, and once at the end.
+"""
+
+import os
+
+import numpy as np
+
+WORKING_FORMATS = ("uint8", "float32")
+
+
+def default_working_format() -> str:
+    """Working format for renders (ENTROPIC_WORKING_FORMAT overrides)."""
+    fmt = os.environ.get("ENTROPIC_WORKING_FORMAT", "uint8").strip().lower()
+    return fmt if fmt in WORKING_FORMATS else "uint8"
+
+
+def to_uint8(frame: np.ndarray) -> np.ndarray:
+    """Quantize a working frame to uint8 (truncating, like the effects do)."""
+    if frame.dtype == np.uint8:
+        return frame
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def to_float32(frame: np.ndarray) -> np.ndarray:
+    """Frame as float32 (no copy if it already is)."""
+    return frame.astype(np.float32, copy=False)
+
+
+def like_input(result: np.ndarray, frame: np.ndarray) -> np.ndarray:
+    """An effect's result (already clipped to 0-255) in its input's format.
+
+    float32 input stays float32; anything else is truncated to uint8.
+    """
+    if frame.dtype == np.float32:
+        return result.astype(np.float32, copy=False)
+    return result.astype(np.uint8)
@@ -0,0 +1,152 @@
+"""
+Entropic — Pointwise LUT Fusion
+Bake runs of consecutive pointwise effects into one lookup table.
+
+A pointwise effect maps each pixel value to a new value regardless of where
+the pixel is (see the "pointwise" and "channelwise" caps in effects). A run
+of them is a single function of the pixel value, so it can be evaluated once
+on every possible input and then applied as one vectorized lookup instead of
+a float32 round trip (and often an HSV conversion) per effect.
+
+    Channelwise runs: exact 256-entry table per channel (cv2.LUT).
+    Mixed runs:       256³ RGB cube (48 MB), built on first use — only
+                      worth it for long renders (fuse_steps(cube=True)).
+
+Cube entries can differ by 1 from applying the effects directly: OpenCV's
+8-bit HSV conversions round differently in their vectorized and scalar
+paths, so the same pixel value is not always mapped identically.
+"""
+
+import numpy as np
+import cv2
+
+from effects import get_caps
+
+MIN_RUN = 2  # Single effects are left alone
+CUBE_BUILD_ROWS = 16  # Red values evaluated per block while building a cube
+
+
+def is_fusable(step) -> bool:
+    """True if a compiled step is a pure function of the pixel value.
+
+    Regions make an effect position-dependent; frame_index/total_frames or
+    frame state make its lookup change from frame to frame.
+    """
+    if getattr(step, "envelope", None) is not None:
+        return False
+    if step.region is not None or step.wants_index or step.wants_total or step.wants_state:
+        return False
+    return get_caps(step.name)["pointwise"]
+
+
+class LutStep:
+    """Consecutive pointwise steps applied as one lookup.
+
+    Args:
+        steps: Fusable EffectSteps, applied in order.
+        cube: Build a full RGB cube (any pointwise run) instead of
+            per-channel tables (channelwise runs only).
+    """
+
+    def __init__(self, steps: list, cube: bool = False):
+        self.steps = steps
+        self.cube = cube
+        self.name = "+".join(step.name for step in steps)
+        self.region = None
+        self.wants_index = self.wants_total = self.wants_state = False
+        self.slot = None
+        self.stateful = False
+        self.float32 = False  # Tables map uint8 values
+        self.wants_out = True
+        self._lut = None
+
+    def _run(self, frame: np.ndarray) -> np.ndarray:
+        for step in self.steps:
+            frame = step(frame)
+        return frame
+
+    def _build(self) -> np.ndarray:
+        values = np.arange(256, dtype=np.uint8)
+        if not self.cube:
+            # One row holding every value in every channel
+            ramp = np.repeat(values[:, None], 3, axis=1).reshape(1, 256, 3)
+            return np.ascontiguousarray(self._run(ramp))
+
+        # Every RGB triple, CUBE_BUILD_ROWS red values at a time to bound
+        # the effects' float32 temporaries
+        lut = np.empty((256, 256, 256, 3), dtype=np.uint8)
+        g, b = np.meshgrid(values, values, indexing="ij")
+        for r0 in range(0, 256, CUBE_BUILD_ROWS):
+            block = np.empty((CUBE_BUILD_ROWS, 256, 256, 3), dtype=np.uint8)
+            block[..., 0] = values[r0:r0 + CUBE_BUILD_ROWS, None, None]
+            block[..., 1] = g
+            block[..., 2] = b
+            out = self._run(block.reshape(CUBE_BUILD_ROWS * 256, 256, 3))
+            lut[r0:r0 + CUBE_BUILD_ROWS] = out.reshape(CUBE_BUILD_ROWS, 256, 256, 3)
+        return lut.reshape(-1, 3)
+
+    def __call__(
+        self,
+        frame: np.ndarray,
+        frame_index: int = 0,
+        total_frames: int = 1,
+        state: dict | None = None,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        if frame.dtype != np.uint8 or frame.ndim != 3 or frame.shape[2] != 3:
+            return self._run(frame)
+        if self._lut is None:
+            self._lut = self._build()
+        if not self.cube:
+            return cv2.LUT(np.ascontiguousarray(frame), self._lut, dst=out)
+
+        index = frame[:, :, 0].astype(np.uint32)
+        index <<= 8
+        index |= frame[:, :, 1]
+        index <<= 8
+        index |= frame[:, :, 2]
+        return np.take(self._lut, index, axis=0, out=out)
+
+
+def fuse_steps(steps: list, cube: bool = False) -> list:
+    """Replace runs of fusable steps with LutSteps.
+
+    Args:
+        steps: Compiled chain steps.
+        cube: Also fuse runs that mix channels (hue, saturation, palettes)
+            through a full RGB cube. Off by default: building the cube runs
+            the effects over 16.7M pixels, which only pays off over many frames.
+
+    Returns:
+        New step list; runs of channelwise steps become per-channel tables.
+    """
+    fused, run = [], []
+
+    def flush():
+        if cube and len(run) >= MIN_RUN:
+            channelwise = all(get_caps(step.name)["channelwise"] for step in run)
+            fused.append(LutStep(list(run), cube=not channelwise))
+        else:
+            # Per-channel tables for the channelwise stretches only
+            stretch = []
+            for step in run + [None]:
+                if step is not None and get_caps(step.name)["channelwise"]:
+                    stretch.append(step)
+                    continue
+                if len(stretch) >= MIN_RUN:
+                    fused.append(LutStep(stretch))
+                else:
+                    fused.extend(stretch)
+                stretch = []
+                if step is not None:
+                    fused.append(step)
+        run.clear()
+
+    for step in steps:
+        if is_fusable(step):
+            run.append(step)
+        else:
+            flush()
+            fused.append(step)
+    flush()
+    return fused
@@ -5,6 +5,8 @@ Per-frame effects inspired by audio synthesis modulation techniques.
 
 import numpy as np
 
+from effects.formats import like_input
+
 
 def ring_mod(
     frame: np.ndarray,
@@ -50,8 +52,7 @@ def ring_mod(
         carrier = 0.5 + 0.5 * np.sin(2.0 * np.pi * frequency * coords / w + phase)
         carrier = carrier[:, :, np.newaxis]  # (1, W, 1)
 
-    result = np.clip(frame.astype(np.float32) * carrier, 0, 255).astype(np.uint8)
-    return result
+    return like_input(np.clip(frame.astype(np.float32, copy=False) * carrier, 0, 255), frame)
 
 
 def gate(
@@ -114,11 +115,11 @@ def wavefold(
     """
     threshold = max(0.1, min(0.95, float(threshold)))
     folds = max(1, min(8, int(folds)))
-    f = frame.astype(np.float32) / 255.0
+    f = frame.astype(np.float32, copy=False) / 255.0
     for _ in range(folds):
         f = np.where(f > threshold, 2.0 * threshold - f, f)
         f = np.abs(f)
-    return np.clip(f * 255, 0, 255).astype(np.uint8)
+    return like_input(np.clip(f * 255, 0, 255), frame)
 
 
 def am_radio(
@@ -152,5 +153,5 @@ def am_radio(
         2.0 * np.pi * carrier_freq * rows / h + phase
     ))
     carrier = carrier.reshape(-1, 1, 1)
-    result = frame.astype(np.float32) * carrier
-    return np.clip(result, 0, 255).astype(np.uint8)
+    result = frame.astype(np.float32, copy=False) * carrier
+    return like_input(np.clip(result, 0, 255), frame)
@@ -39,6 +39,10 @@ def pixelsort(frame: np.ndarray, threshold: float = 0.5, sort_by: str = "brightn
               direction: str = "horizontal") -> np.ndarray:
     """Sort pixels in each row (or column) within threshold-defined intervals.
 
+    All intervals in the frame are sorted at once: each run of above-threshold
+    pixels gets a group id, and one stable lexsort by (group, key) reorders
+    the pixels inside every run. Pixels with equal keys keep their order.
+
     Args:
         frame: (H, W, 3) uint8 RGB array.
         threshold: 0.0-1.0 — pixels above this value get sorted. Lower = more sorting.
@@ -48,46 +52,37 @@ def pixelsort(frame: np.ndarray, threshold: float = 0.5, sort_by: str = "brightn
     Returns:
         Sorted frame.
     """
-    result = frame.copy()
     sort_fn = SORT_KEYS.get(sort_by, _brightness)
 
-    if direction == "vertical":
-        result = result.transpose(1, 0, 2)  # Swap H and W
-
-    h, w, _ = result.shape
+    rows = frame.transpose(1, 0, 2) if direction == "vertical" else frame  # Swap H and W
+    h, w, _ = rows.shape
     threshold_val = threshold * 255
 
-    for row_idx in range(h):
-        row = result[row_idx]
-        keys = sort_fn(row)
-
-        # Find intervals where pixels exceed threshold
-        if sort_by == "brightness":
-            mask = keys > threshold_val
-        else:
-            # For hue/saturation, normalize and use threshold directly
-            normalized = (keys - keys.min()) / (keys.max() - keys.min() + 1e-8) * 255
-            mask = normalized > threshold_val
-
-        # Find contiguous runs of True in mask
-        changes = np.diff(mask.astype(int))
-        starts = np.where(changes == 1)[0] + 1
-        ends = np.where(changes == -1)[0] + 1
-
-        # Handle edge cases
-        if mask[0]:
-            starts = np.concatenate([[0], starts])
-        if mask[-1]:
-            ends = np.concatenate([ends, [w]])
-
-        # Sort each interval
-        for start, end in zip(starts, ends):
-            if end - start < 2:
-                continue
-            segment = row[start:end]
-            seg_keys = sort_fn(segment)
-            order = np.argsort(seg_keys)
-            result[row_idx, start:end] = segment[order]
+    pixels = np.ascontiguousarray(rows).reshape(-1, 3)
+    keys = sort_fn(pixels)
+    row_keys = keys.reshape(h, w)
+
+    # Find intervals where pixels exceed threshold
+    if sort_by == "brightness":
+        mask = row_keys > threshold_val
+    else:
+        # For hue/saturation, normalize per row and use threshold directly
+        lo = row_keys.min(axis=1, keepdims=True)
+        hi = row_keys.max(axis=1, keepdims=True)
+        normalized = (row_keys - lo) / (hi - lo + 1e-8) * 255
+        mask = normalized > threshold_val
+
+    # Number the runs of True; a run can't continue onto the next row
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    inside = np.flatnonzero(mask)
+    group = np.cumsum(starts.ravel())[inside]
+
+    # Runs stay in place (group ids increase along the rows), sorted inside
+    order = np.lexsort((keys[inside], group))
+    result = pixels.copy()
+    result[inside] = pixels[inside[order]]
+    result = result.reshape(h, w, 3)
 
     if direction == "vertical":
         result = result.transpose(1, 0, 2)
@@ -6,6 +6,8 @@ Overlays CRT/VHS-style scan lines with optional flicker.
 import numpy as np
 import random
 
+from effects.formats import like_input
+
 
 def scanlines(frame: np.ndarray, line_width: int = 2, opacity: float = 0.3,
               flicker: bool = False, color: tuple = (0, 0, 0)) -> np.ndarray:
@@ -40,4 +42,4 @@ def scanlines(frame: np.ndarray, line_width: int = 2, opacity: float = 0.3,
 
         result[y:end_y] = result[y:end_y] * (1 - line_opacity) + line_color * line_opacity
 
-    return np.clip(result, 0, 255).astype(np.uint8)
+    return like_input(np.clip(result, 0, 255), frame)
@@ -5,16 +5,36 @@ Effects that operate across frames (need frame_index context).
 
 import numpy as np
 
+from effects.buffers import read_only
 
-# Module-level state for stateful temporal effects
-_stutter_state = {"held_frame": None, "hold_until": -1}
-_feedback_state = {"prev_frame": None}
-_tapestop_state = {"frozen_frame": None, "trigger_frame": -1}
-_delay_state = {"buffer": []}
-_decimator_state = {"held_frame": None}
-_samplehold_state = {"held_frame": None, "hold_until": -1}
-_granulator_state = {"buffer": [], "grain_pos": 0.0}
-_beatrepeat_state = {"buffer": [], "repeating": False, "repeat_until": -1, "repeat_start": -1, "grid_frames": 4}
+
+# Fallback state for direct calls. Compiled chains pass each stateful effect
+# its own dict from a RenderContext instead (see effects.chain).
+_stutter_state = {}
+_feedback_state = {}
+_tapestop_state = {}
+_delay_state = {}
+_decimator_state = {}
+_samplehold_state = {}
+_granulator_state = {}
+_beatrepeat_state = {}
+
+
+def _frame_state(state: dict | None, fallback: dict, frame_index: int, **initial) -> dict:
+    """State dict for this call, reset in place at frame 0 (new render).
+
+    Args:
+        state: The chain slot's dict, or None for the module-level fallback.
+        fallback: Module-level state dict of the effect.
+        frame_index: Current frame number.
+        **initial: Fresh state values.
+    """
+    if state is None:
+        state = fallback
+    if frame_index == 0 or not state:
+        state.clear()
+        state.update(initial)
+    return state
 
 
 def stutter(
@@ -23,6 +43,7 @@ def stutter(
     interval: int = 8,
     frame_index: int = 0,
     total_frames: int = 1,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Freeze-stutter: hold a frame for `repeat` frames every `interval` frames.
 
@@ -34,35 +55,33 @@ def stutter(
         interval: How often to trigger a stutter (every N frames).
         frame_index: Current frame number (injected by render loop).
         total_frames: Total frame count (injected by render loop).
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
-        Frame (H, W, 3) uint8 — either the original or a held copy.
+        Frame (H, W, 3) uint8 — either the input or the held frame (read-only).
     """
-    global _stutter_state
-
     repeat = max(1, int(repeat))
     interval = max(1, int(interval))
 
     # Reset state at frame 0 (new render)
-    if frame_index == 0:
-        _stutter_state = {"held_frame": None, "hold_until": -1}
+    state = _frame_state(state, _stutter_state, frame_index, held_frame=None, hold_until=-1)
 
     # If we're in a hold period, return the held frame
-    if frame_index <= _stutter_state["hold_until"] and _stutter_state["held_frame"] is not None:
-        held = _stutter_state["held_frame"]
+    if frame_index <= state["hold_until"] and state["held_frame"] is not None:
+        held = state["held_frame"]
         # Resize if frame dimensions changed (safety)
         if held.shape != frame.shape:
-            _stutter_state["held_frame"] = None
-            return frame.copy()
-        return held.copy()
+            state["held_frame"] = None
+            return read_only(frame)
+        return held
 
     # Check if this frame triggers a new stutter
     if frame_index % interval == 0:
-        _stutter_state["held_frame"] = frame.copy()
-        _stutter_state["hold_until"] = frame_index + repeat - 1
-        return frame.copy()
+        state["held_frame"] = read_only(frame)
+        state["hold_until"] = frame_index + repeat - 1
+        return read_only(frame)
 
-    return frame.copy()
+    return read_only(frame)
 
 
 def frame_drop(
@@ -91,7 +110,7 @@ def frame_drop(
     if rng.random() < drop_rate:
         return np.zeros_like(frame)
 
-    return frame.copy()
+    return read_only(frame)
 
 
 def time_stretch(
@@ -129,7 +148,7 @@ def time_stretch(
         result = np.clip(frame.astype(np.float32) * brightness_mod, 0, 255).astype(np.uint8)
         return result
 
-    return frame.copy()
+    return read_only(frame)
 
 
 def feedback(
@@ -137,6 +156,7 @@ def feedback(
     decay: float = 0.3,
     frame_index: int = 0,
     total_frames: int = 1,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Overlay previous frame at partial opacity, creating ghost trails.
 
@@ -148,24 +168,22 @@ def feedback(
         decay: How much of the previous frame persists (0.0-0.95).
         frame_index: Current frame number.
         total_frames: Total frame count.
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
         Frame with ghost overlay from previous frame.
     """
-    global _feedback_state
-
     decay = max(0.0, min(0.95, float(decay)))
 
     # Reset at frame 0
-    if frame_index == 0:
-        _feedback_state = {"prev_frame": None}
+    state = _frame_state(state, _feedback_state, frame_index, prev_frame=None)
 
-    prev = _feedback_state["prev_frame"]
+    prev = state["prev_frame"]
 
     if prev is None or prev.shape != frame.shape:
         # No previous frame — pass through
-        _feedback_state["prev_frame"] = frame.copy()
-        return frame.copy()
+        state["prev_frame"] = read_only(frame)
+        return state["prev_frame"]
 
     # Blend: current * (1 - decay) + previous * decay
     result = np.clip(
@@ -173,8 +191,8 @@ def feedback(
         0, 255
     ).astype(np.uint8)
 
-    _feedback_state["prev_frame"] = result.copy()
-    return result
+    state["prev_frame"] = read_only(result)
+    return state["prev_frame"]
 
 
 def tape_stop(
@@ -183,6 +201,7 @@ def tape_stop(
     ramp_frames: int = 15,
     frame_index: int = 0,
     total_frames: int = 1,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Tape stop: freeze and darken like a tape machine powering down.
 
@@ -195,31 +214,29 @@ def tape_stop(
         ramp_frames: How many frames the fade-to-black takes.
         frame_index: Current frame number.
         total_frames: Total frame count.
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
         Frame — normal before trigger, frozen+darkening after.
     """
-    global _tapestop_state
-
     trigger = max(0.0, min(1.0, float(trigger)))
     ramp_frames = max(1, int(ramp_frames))
     trigger_frame = int(trigger * max(1, total_frames - 1))
 
     # Reset at frame 0
-    if frame_index == 0:
-        _tapestop_state = {"frozen_frame": None, "trigger_frame": trigger_frame}
+    state = _frame_state(state, _tapestop_state, frame_index, frozen_frame=None, trigger_frame=trigger_frame)
 
     # Before trigger — pass through
     if frame_index < trigger_frame:
-        return frame.copy()
+        return read_only(frame)
 
     # At trigger — capture the freeze frame
-    if _tapestop_state["frozen_frame"] is None or frame_index == trigger_frame:
-        _tapestop_state["frozen_frame"] = frame.copy()
+    if state["frozen_frame"] is None or frame_index == trigger_frame:
+        state["frozen_frame"] = read_only(frame)
 
-    frozen = _tapestop_state["frozen_frame"]
+    frozen = state["frozen_frame"]
     if frozen.shape != frame.shape:
-        return frame.copy()
+        return read_only(frame)
 
     # After trigger — frozen frame with progressive darkening
     frames_since_trigger = frame_index - trigger_frame
@@ -270,6 +287,7 @@ def delay(
     decay: float = 0.4,
     frame_index: int = 0,
     total_frames: int = 1,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Ghost frames overlaid with decay — video echo/delay effect.
 
@@ -282,23 +300,21 @@ def delay(
         decay: Opacity of the delayed frame (0.0-0.9).
         frame_index: Current frame number.
         total_frames: Total frame count.
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
         Frame blended with a frame from N frames ago.
     """
-    global _delay_state
-
     delay_frames = max(1, min(60, int(delay_frames)))
     decay = max(0.0, min(0.9, float(decay)))
 
     # Reset at frame 0
-    if frame_index == 0:
-        _delay_state = {"buffer": []}
+    state = _frame_state(state, _delay_state, frame_index, buffer=[])
 
-    buf = _delay_state["buffer"]
+    buf = state["buffer"]
 
     # Store current frame in buffer
-    buf.append(frame.copy())
+    buf.append(read_only(frame))
 
     # Keep buffer bounded
     max_buf = delay_frames + 1
@@ -307,13 +323,13 @@ def delay(
 
     # If we don't have enough history yet, pass through
     if len(buf) <= delay_frames:
-        return frame.copy()
+        return read_only(frame)
 
     # Get the delayed frame
     delayed = buf[-(delay_frames + 1)]
 
     if delayed.shape != frame.shape:
-        return frame.copy()
+        return read_only(frame)
 
     # Blend: current * (1 - decay) + delayed * decay
     result = np.clip(
@@ -328,6 +344,7 @@ def decimator(
     factor: int = 3,
     frame_index: int = 0,
     total_frames: int = 1,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Reduce effective framerate by holding every Nth frame.
 
@@ -339,29 +356,27 @@ def decimator(
         factor: Hold every Nth frame (2 = half framerate, 4 = quarter).
         frame_index: Current frame number.
         total_frames: Total frame count.
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
         Current frame if on a sample point, otherwise the last sampled frame.
     """
-    global _decimator_state
-
     factor = max(1, min(30, int(factor)))
 
     # Reset at frame 0
-    if frame_index == 0:
-        _decimator_state = {"held_frame": None}
+    state = _frame_state(state, _decimator_state, frame_index, held_frame=None)
 
     # On a sample point: capture and return
     if frame_index % factor == 0:
-        _decimator_state["held_frame"] = frame.copy()
-        return frame.copy()
+        state["held_frame"] = read_only(frame)
+        return read_only(frame)
 
     # Between sample points: return held frame
-    held = _decimator_state.get("held_frame")
+    held = state.get("held_frame")
     if held is not None and held.shape == frame.shape:
-        return held.copy()
+        return held
 
-    return frame.copy()
+    return read_only(frame)
 
 
 def sample_and_hold(
@@ -371,6 +386,7 @@ def sample_and_hold(
     frame_index: int = 0,
     total_frames: int = 1,
     seed: int = 42,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Freeze frame at random intervals — like sample & hold in a synth.
 
@@ -384,34 +400,32 @@ def sample_and_hold(
         frame_index: Current frame number.
         total_frames: Total frame count.
         seed: Random seed for reproducible hold durations.
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
-        Current frame or a held copy.
+        Current frame or the held frame (read-only).
     """
-    global _samplehold_state
-
     hold_min = max(1, min(60, int(hold_min)))
     hold_max = max(hold_min, min(60, int(hold_max)))
 
     # Reset at frame 0
-    if frame_index == 0:
-        _samplehold_state = {"held_frame": None, "hold_until": -1}
+    state = _frame_state(state, _samplehold_state, frame_index, held_frame=None, hold_until=-1)
 
     # If we're in a hold period, return the held frame
-    if frame_index <= _samplehold_state["hold_until"] and _samplehold_state["held_frame"] is not None:
-        held = _samplehold_state["held_frame"]
+    if frame_index <= state["hold_until"] and state["held_frame"] is not None:
+        held = state["held_frame"]
         if held.shape != frame.shape:
-            _samplehold_state["held_frame"] = None
-            return frame.copy()
-        return held.copy()
+            state["held_frame"] = None
+            return read_only(frame)
+        return held
 
     # Hold expired or first frame — capture new sample
     rng = np.random.RandomState(seed + frame_index)
     hold_duration = rng.randint(hold_min, hold_max + 1)
-    _samplehold_state["held_frame"] = frame.copy()
-    _samplehold_state["hold_until"] = frame_index + hold_duration - 1
+    state["held_frame"] = read_only(frame)
+    state["hold_until"] = frame_index + hold_duration - 1
 
-    return frame.copy()
+    return read_only(frame)
 
 
 def granulator(
@@ -425,6 +439,7 @@ def granulator(
     frame_index: int = 0,
     total_frames: int = 1,
     seed: int = 42,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Video granulator — rearrange video slices like Ableton's Granulator II.
 
@@ -447,12 +462,11 @@ def granulator(
         frame_index: Current frame number (injected by render loop).
         total_frames: Total frame count.
         seed: Random seed for reproducible spray/selection.
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
         Frame (H, W, 3) uint8 — a grain selected from the buffer.
     """
-    global _granulator_state
-
     grain_size = max(1, min(60, int(grain_size)))
     spray = max(0.0, min(1.0, float(spray)))
     density = max(1, min(4, int(density)))
@@ -461,13 +475,12 @@ def granulator(
     reverse_prob = max(0.0, min(1.0, float(reverse_prob)))
 
     # Reset at frame 0
-    if frame_index == 0:
-        _granulator_state = {"buffer": [], "grain_pos": position}
+    state = _frame_state(state, _granulator_state, frame_index, buffer=[], grain_pos=position)
 
-    buf = _granulator_state["buffer"]
+    buf = state["buffer"]
 
     # Always buffer the incoming frame
-    buf.append(frame.copy())
+    buf.append(read_only(frame))
 
     # Limit buffer to avoid memory issues (keep last 300 frames = ~10s at 30fps)
     max_buf = 300
@@ -476,16 +489,16 @@ def granulator(
 
     # Need at least a few frames before granulating
     if len(buf) < grain_size + 1:
-        return frame.copy()
+        return read_only(frame)
 
     rng = np.random.RandomState(seed + frame_index)
 
     # Advance grain position based on scan speed
-    _granulator_state["grain_pos"] += scan_speed / max(1, total_frames)
-    if _granulator_state["grain_pos"] > 1.0:
-        _granulator_state["grain_pos"] -= 1.0
+    state["grain_pos"] += scan_speed / max(1, total_frames)
+    if state["grain_pos"] > 1.0:
+        state["grain_pos"] -= 1.0
 
-    current_pos = _granulator_state["grain_pos"]
+    current_pos = state["grain_pos"]
 
     # Select grain(s)
     result = np.zeros(frame.shape, dtype=np.float32)
@@ -531,6 +544,7 @@ def beat_repeat(
     frame_index: int = 0,
     total_frames: int = 1,
     seed: int = 42,
+    state: dict | None = None,
 ) -> np.ndarray:
     """Beat Repeat — triggered frame repetition inspired by Ableton's Beat Repeat.
 
@@ -552,12 +566,11 @@ def beat_repeat(
         frame_index: Current frame number (injected by render loop).
         total_frames: Total frame count.
         seed: Random seed for chance/variation.
+        state: Per-render state from the chain (None = module-level state).
 
     Returns:
         Frame (H, W, 3) uint8 — original or repeated from buffer.
     """
-    global _beatrepeat_state
-
     interval = max(1, min(120, int(interval)))
     offset = max(0, min(60, int(offset)))
     gate = max(0, min(120, int(gate)))
@@ -568,19 +581,13 @@ def beat_repeat(
     pitch_decay = max(0.0, min(1.0, float(pitch_decay)))
 
     # Reset at frame 0
-    if frame_index == 0:
-        _beatrepeat_state = {
-            "buffer": [],
-            "repeating": False,
-            "repeat_until": -1,
-            "repeat_start": -1,
-            "grid_frames": grid,
-        }
-
-    state = _beatrepeat_state
+    state = _frame_state(
+        state, _beatrepeat_state, frame_index,
+        buffer=[], repeating=False, repeat_until=-1, repeat_start=-1, grid_frames=grid,
+    )
 
     # Always buffer recent frames (keep enough for the grid)
-    state["buffer"].append(frame.copy())
+    state["buffer"].append(read_only(frame))
     max_buf = max(grid * 2, 60)
     if len(state["buffer"]) > max_buf:
         state["buffer"][:] = state["buffer"][-max_buf:]
@@ -623,7 +630,7 @@ def beat_repeat(
 
         if repeated.shape == frame.shape:
             return repeated
-        return frame.copy()
+        return read_only(frame)
     else:
         state["repeating"] = False
 
@@ -646,9 +653,9 @@ def beat_repeat(
             state["grid_frames"] = effective_grid
 
             # Return current frame (first frame of the repeat)
-            return frame.copy()
+            return read_only(frame)
 
-    return frame.copy()
+    return read_only(frame)
 
 
 def strobe(
@@ -697,7 +704,7 @@ def strobe(
     is_on = cycle_pos < duty
 
     if not is_on:
-        return frame.copy()
+        return read_only(frame)
 
     h, w = frame.shape[:2]
 
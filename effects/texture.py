@@ -5,6 +5,8 @@ VHS, noise, posterize, edge detection, blur.
 
 import numpy as np
 
+from effects import filters
+
 
 def vhs(frame: np.ndarray, tracking: float = 0.5, noise_amount: float = 0.2,
         color_bleed: int = 3, seed: int = 42) -> np.ndarray:
@@ -22,7 +24,7 @@ def vhs(frame: np.ndarray, tracking: float = 0.5, noise_amount: float = 0.2,
     """
     h, w, c = frame.shape
     rng = np.random.RandomState(seed)
-    result = frame.astype(np.float32)
+    result = frame.copy()
     tracking = max(0.0, min(1.0, tracking))
     noise_amount = max(0.0, min(1.0, noise_amount))
     color_bleed = max(0, min(color_bleed, w // 4))
@@ -39,17 +41,17 @@ def vhs(frame: np.ndarray, tracking: float = 0.5, noise_amount: float = 0.2,
 
     # 2. Color bleed — blur chroma horizontally
     if color_bleed > 0:
-        kernel = np.ones(color_bleed * 2 + 1) / (color_bleed * 2 + 1)
-        for ch in [0, 2]:  # Bleed R and B, leave G sharp
-            for y in range(h):
-                result[y, :, ch] = np.convolve(result[y, :, ch], kernel, mode='same')
+        # Bleed R and B, leave G sharp
+        bled = filters.box(result, color_bleed, axis=1)
+        result[:, :, 0] = bled[:, :, 0]
+        result[:, :, 2] = bled[:, :, 2]
 
     # 3. Noise overlay
     if noise_amount > 0:
         noise = rng.normal(0, 25 * noise_amount, (h, w, c)).astype(np.float32)
-        result = result + noise
+        result = np.clip(result + noise, 0, 255).astype(np.uint8)
 
-    return np.clip(result, 0, 255).astype(np.uint8)
+    return result
 
 
 def noise(frame: np.ndarray, amount: float = 0.3,
@@ -119,10 +121,8 @@ def edge_detect(frame: np.ndarray, threshold: float = 0.3,
     threshold = max(0.01, min(1.0, threshold))
 
     # Simple Sobel approximation
-    gx = np.zeros_like(gray)
-    gy = np.zeros_like(gray)
-    gx[:, 1:-1] = gray[:, 2:] - gray[:, :-2]
-    gy[1:-1, :] = gray[2:, :] - gray[:-2, :]
+    gx = filters.derivative(gray, axis=1)
+    gy = filters.derivative(gray, axis=0)
     magnitude = np.sqrt(gx**2 + gy**2)
 
     # Normalize and threshold
@@ -152,42 +152,18 @@ def blur(frame: np.ndarray, radius: int = 3, blur_type: str = "box") -> np.ndarr
     Args:
         frame: (H, W, 3) uint8 RGB array.
         radius: Blur radius in pixels (1-20).
-        blur_type: 'box' or 'motion'.
+        blur_type: 'box', 'motion' (horizontal streak) or 'gaussian'
+                   (sigma = radius / 2).
 
     Returns:
         Blurred frame.
     """
-    from PIL import Image, ImageFilter
-
     radius = max(1, min(20, int(radius)))
-    img = Image.fromarray(frame)
-
     if blur_type == "motion":
-        # Horizontal motion blur using a 1D kernel
-        # Pillow Kernel supports max 5x5, so use numpy for larger radii
-        kernel_size = radius * 2 + 1
-        if kernel_size > 5:
-            kernel = np.zeros((kernel_size, kernel_size), dtype=np.float32)
-            kernel[kernel_size // 2, :] = 1.0 / kernel_size
-            from scipy.ndimage import convolve
-            result = np.stack([
-                convolve(frame[:, :, c].astype(np.float32), kernel)
-                for c in range(3)
-            ], axis=-1)
-            return np.clip(result, 0, 255).astype(np.uint8)
-        kernel = [1.0 / kernel_size] * kernel_size
-        # Pad to square kernel
-        full_kernel = [0.0] * (kernel_size * kernel_size)
-        mid = kernel_size // 2
-        for i in range(kernel_size):
-            full_kernel[mid * kernel_size + i] = kernel[i]
-        img = img.filter(ImageFilter.Kernel(
-            (kernel_size, kernel_size), full_kernel, scale=1, offset=0
-        ))
-    else:
-        img = img.filter(ImageFilter.BoxBlur(radius))
-
-    return np.array(img)
+        return filters.box(frame, radius, axis=1)
+    if blur_type == "gaussian":
+        return filters.gaussian(frame, radius / 2)
+    return filters.box(frame, radius)
 
 
 def sharpen(frame: np.ndarray, amount: float = 1.0) -> np.ndarray:
@@ -200,17 +176,21 @@ def sharpen(frame: np.ndarray, amount: float = 1.0) -> np.ndarray:
     Returns:
         Sharpened frame.
     """
-    from PIL import Image, ImageFilter
+    import cv2
 
     amount = max(0.0, min(3.0, float(amount)))
-    img = Image.fromarray(frame)
 
-    # Apply multiple sharpen passes based on amount
+    # Apply multiple sharpen passes based on amount. Each pass is PIL's
+    # SHARPEN kernel (32 at the centre, -2 around it, /16), which works out
+    # to frame + 9/8 * (frame - 3x3 box mean)
     passes = max(1, int(amount))
+    result = frame
     for _ in range(passes):
-        img = img.filter(ImageFilter.SHARPEN)
+        f = result.astype(np.float32)
+        result = cv2.addWeighted(f, 2.125, filters.box(f, 1), -1.125, 0.5)
+        result = np.clip(result, 0, 255).astype(np.uint8)
 
-    return np.array(img)
+    return result
 
 
 def tv_static(frame: np.ndarray, intensity: float = 0.8,
@@ -0,0 +1,197 @@
+"""
+Entropic — Warp Maps
+Geometric effects as source-coordinate maps, composed and resampled once.
+
+A warp effect (wave, mirror, channel shifts, block displacement) moves
+pixels without changing them: output pixel (x, y) of channel c is input
+pixel map[c, y, x]. Each such effect can build its map once per (frame
+shape, params) and apply it with a single cv2.remap. Consecutive warps in a chain
+compose into one map (WarpStep), so the frame is resampled once instead of
+once per effect. Maps hold integer coordinates, so composing them is exact.
+
+Map layout: int16 array (C, H, W, 2) of (x, y) source coordinates, with
+C = 1 (same map for every channel) or 3 (per-channel maps). A float32 map
+holds sub-pixel coordinates: it is sampled bilinearly, wrapping around the
+frame edges like np.roll, and applied on its own rather than fused.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+import cv2
+
+MAP_CACHE_SIZE = 16  # Maps kept per builder (~8MB per 1080p channel map)
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def cached_map(builder):
+    """Cache a map builder's results by (h, w, params).
+
+    JSON params arrive as lists, so list values are keyed as tuples.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    @wraps(builder)
+    def cached(h: int, w: int, **params):
+        key = (h, w, tuple(sorted((k, _hashable(v)) for k, v in params.items())))
+        with lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        warp = builder(h, w, **params)
+        if warp is not None:
+            warp.setflags(write=False)
+        with lock:
+            cache[key] = warp
+            if len(cache) > MAP_CACHE_SIZE:
+                cache.popitem(last=False)
+        return warp
+
+    cached.cache_clear = cache.clear
+    return cached
+
+
+def grid(h: int, w: int) -> tuple[np.ndarray, np.ndarray]:
+    """Identity source coordinates: (ys, xs) int32 arrays of shape (H, W)."""
+    ys, xs = np.indices((h, w), dtype=np.int32)
+    return ys, xs
+
+
+def pack(ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+    """Pack source coordinates into a map (float32 if either is fractional).
+
+    Args:
+        ys, xs: (H, W) arrays for one shared map, or (3, H, W) per channel.
+    """
+    subpixel = np.issubdtype(np.result_type(ys, xs), np.floating)
+    ys, xs = np.broadcast_arrays(ys, xs)
+    if ys.ndim == 2:
+        ys, xs = ys[None], xs[None]
+    return np.stack([xs, ys], axis=-1).astype(np.float32 if subpixel else np.int16)
+
+
+def compose(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Map equivalent to warping with `first`, then with `second`."""
+    channels = max(len(first), len(second))
+    out = np.empty((channels,) + second.shape[1:], dtype=np.int16)
+    for c in range(channels):
+        a = first[c % len(first)]
+        b = second[c % len(second)]
+        out[c] = a[b[..., 1], b[..., 0]]
+    if channels == 3 and (out[0] == out[1]).all() and (out[1] == out[2]).all():
+        out = out[:1]
+    return out
+
+
+def apply_warp(frame: np.ndarray, warp: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Resample frame through a map (nearest neighbour and exact for
+    integer maps, bilinear for float32 maps).
+
+    Args:
+        frame: Input frame.
+        warp: Map from pack()/compose().
+        out: Optional output array shaped like frame (see effects.buffers).
+    """
+    if warp.dtype == np.float32:
+        sample = dict(interpolation=cv2.INTER_LINEAR, borderMode=cv2.BORDER_WRAP)
+    else:
+        sample = dict(interpolation=cv2.INTER_NEAREST)
+    if len(warp) == 1:
+        return cv2.remap(np.ascontiguousarray(frame), warp[0], None, dst=out, **sample)
+    channels = cv2.split(np.ascontiguousarray(frame))
+    return cv2.merge([cv2.remap(channels[c], warp[c], None, **sample) for c in range(3)], dst=out)
+
+
+class WarpStep:
+    """Consecutive warp steps applied as one composed map.
+
+    Args:
+        steps: EffectSteps whose effects declare a "warp" map builder.
+    """
+
+    def __init__(self, steps: list):
+        self.steps = steps
+        self.name = "+".join(step.name for step in steps)
+        self.wants_state = False
+        self.slot = None
+        self.stateful = False
+        self.float32 = all(step.float32 for step in steps)
+        self.wants_out = True
+        self._maps = {}  # (h, w) -> composed map
+
+    def _map(self, h: int, w: int) -> np.ndarray | None:
+        from effects import EFFECTS
+        warp = None
+        for step in self.steps:
+            step_map = EFFECTS[step.name]["warp"](h, w, **step.params)
+            if step_map is None:
+                return None
+            warp = step_map if warp is None else compose(warp, step_map)
+        return warp
+
+    def __call__(
+        self,
+        frame: np.ndarray,
+        frame_index: int = 0,
+        total_frames: int = 1,
+        state: dict | None = None,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        if frame.ndim != 3 or frame.shape[2] != 3:
+            warp = None
+        else:
+            size = frame.shape[:2]
+            if size not in self._maps:
+                self._maps[size] = self._map(*size)
+            warp = self._maps[size]
+        if warp is None:
+            for step in self.steps:
+                frame = step(frame)
+            return frame
+        return apply_warp(frame, warp, out=out)
+
+
+def is_warp(step) -> bool:
+    """True if a compiled step is a plain warp (no region, mix or envelope)."""
+    from effects import EFFECTS
+    if getattr(step, "envelope", None) is not None or not hasattr(step, "fn"):
+        return False
+    if step.region is not None or step.mix < 1.0:
+        return False
+    builder = EFFECTS.get(step.name, {}).get("warp")
+    if builder is None:
+        return False
+    # Some modes (e.g. radial chromatic aberration) have no map, and
+    # sub-pixel maps don't compose exactly; ask the uncached builder so the
+    # probe doesn't evict real maps
+    probe = builder.__wrapped__(1, 1, **step.params)
+    return probe is not None and probe.dtype == np.int16
+
+
+def fuse_warps(steps: list) -> list:
+    """Replace runs of two or more warp steps with WarpSteps."""
+    fused, run = [], []
+
+    def flush():
+        if len(run) >= 2:
+            fused.append(WarpStep(list(run)))
+        else:
+            fused.extend(run)
+        run.clear()
+
+    for step in steps:
+        if is_warp(step):
+            run.append(step)
+        else:
+            flush()
+            fused.append(step)
+    flush()
+    return fused
@@ -205,8 +205,9 @@ def cmd_strategic(args):
 
 def _apply_post_effects(video_path, args):
     """Apply Entropic effects chain to datamoshed output."""
-    from core.video_io import extract_frames, load_frame, save_frame, reassemble_video, probe_video
+    from core.video_io import iter_frames, FrameWriter, probe_video
     from effects import apply_effect
+    import shutil
     import tempfile
 
     effect_name = args.then
@@ -224,26 +225,22 @@ def _apply_post_effects(video_path, args):
     info = probe_video(str(video_path))
 
     with tempfile.TemporaryDirectory(prefix="entropic_post_") as tmpdir:
-        tmpdir = Path(tmpdir)
-        frames_dir = tmpdir / "frames"
-        out_dir = tmpdir / "processed"
-        out_dir.mkdir()
-
-        frames = extract_frames(str(video_path), str(frames_dir))
-        total = len(frames)
-
-        for i, frame_path in enumerate(frames):
-            frame = load_frame(str(frame_path))
-            processed = apply_effect(frame, effect_name, frame_index=i, total_frames=total, **params)
-            save_frame(processed, str(out_dir / frame_path.name))
-            if (i + 1) % 30 == 0:
-                print(f"  Processed {i + 1}/{total} frames")
-
-        final = reassemble_video(
-            str(out_dir), str(video_path),
+        total = max(1, info["total_frames"])
+
+        # Can't encode over the file being decoded: write to tmpdir, then replace
+        writer = FrameWriter(
+            Path(tmpdir) / Path(video_path).name,
             fps=info["fps"],
             audio_source=str(video_path) if info["has_audio"] else None,
         )
+        with writer:
+            for i, frame in enumerate(iter_frames(str(video_path))):
+                processed = apply_effect(frame, effect_name, frame_index=i, total_frames=total, **params)
+                writer.write(processed)
+                if (i + 1) % 30 == 0:
+                    print(f"  Processed {i + 1}/{total} frames")
+
+        final = Path(shutil.move(str(writer.output_path), str(video_path)))
         print(f"Post-processed: {final}")
 
 
@@ -16,8 +16,9 @@ import gradio as gr
 import numpy as np
 from PIL import Image
 
-from effects import EFFECTS, apply_effect, apply_chain
-from core.video_io import probe_video, extract_single_frame, extract_frames, load_frame, save_frame, reassemble_video
+from effects import EFFECTS, apply_effect
+from core.video_io import probe_video, extract_single_frame, iter_frames, FrameWriter
+from core.render import render_chain
 
 
 def get_effect_names():
@@ -109,30 +110,24 @@ def process_full_video(video_file, effect_name, param1_val, param2_val, param3_v
         scale_map = {"lo": 0.5, "mid": 0.75, "hi": 1.0}
         scale = scale_map.get(quality, 0.5)
 
-        with tempfile.TemporaryDirectory() as tmp_extract, \
-             tempfile.TemporaryDirectory() as tmp_processed:
+        progress(0, desc="Processing frames...")
+        estimated = max(1, info["total_frames"])
 
-            progress(0, desc="Extracting frames...")
-            frames = extract_frames(video_file, tmp_extract, scale=scale)
-            total = len(frames)
-
-            for i, frame_path in enumerate(frames):
-                frame = load_frame(str(frame_path))
-                processed = apply_chain(frame, effects)
-                save_frame(processed, str(Path(tmp_processed) / frame_path.name))
-                progress((i + 1) / total, desc=f"Processing frame {i + 1}/{total}")
-
-            progress(0.95, desc="Assembling video...")
+        writer = FrameWriter(
+            tempfile.mktemp(suffix=".mp4"),
+            fps=info["fps"],
+            audio_source=video_file if info["has_audio"] else None,
+            quality=quality,
+        )
+        def report(done):
+            progress(min(1.0, done / estimated), desc=f"Processing frame {done}/{estimated}")
 
-            # Output to temp file
-            output_path = tempfile.mktemp(suffix=".mp4")
-            reassemble_video(
-                tmp_processed, output_path,
-                fps=info["fps"],
-                audio_source=video_file if info["has_audio"] else None,
-                quality=quality,
-            )
+        with writer:
+            render_chain(iter_frames(video_file, scale=scale), effects, estimated, writer, progress=report)
+            progress(0.95, desc="Finishing encode...")
 
+        output_path = str(writer.output_path)
+        total = writer.frame_count
         size_mb = Path(output_path).stat().st_size / (1024 * 1024)
         result_info = f"Done! {total} frames | {size_mb:.1f}MB | {quality} quality"
         return output_path, result_info
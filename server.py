@@ -22,10 +22,13 @@ from pydantic import BaseModel
 import numpy as np
 from PIL import Image
 
-from effects import EFFECTS, CATEGORIES, apply_chain
+from effects import EFFECTS, CATEGORIES
 from packages import PACKAGES
-from core.video_io import probe_video, extract_single_frame
+from core.video_io import (
+    probe_video, extract_single_frame, extract_frame_batch, sample_frame_numbers, load_frame_index,
+)
 from core.export_models import ExportSettings
+from core.preview_cache import PreviewCache
 
 # Preset system
 PRESETS_DIR = Path(__file__).parent / "user_presets"
@@ -42,9 +45,26 @@ _state = {
     "video_path": None,
     "video_info": None,
     "current_frame": None,
+    "decoder": None,  # DecoderSession for video_path (scrubbing/previews)
 }
 
 
+# Intermediate preview frames, keyed by source, frame, scale and chain prefix
+_preview_cache = PreviewCache()
+
+
+def _get_decoder():
+    """Decoder session for the loaded video, started on first use."""
+    from core.video_io import DecoderSession
+    session = _state.get("decoder")
+    if session is None or session.video_path != _state["video_path"]:
+        if session is not None:
+            session.close()
+        session = DecoderSession(_state["video_path"])
+        _state["decoder"] = session
+    return session
+
+
 class EffectChain(BaseModel):
     effects: list[dict]  # [{"name": "pixelsort", "params": {"threshold": 0.5}}, ...]
     frame_number: int = 0
@@ -309,10 +329,19 @@ async def upload_video(file: UploadFile = File(...)):
             os.unlink(tmp.name)
             raise HTTPException(status_code=400, detail="Could not process file")
 
-        # Clean up previous temp file
+        # Stop the previous decoder session and clean up its temp file
+        if _state.get("decoder") is not None:
+            _state["decoder"].close()
+            _state["decoder"] = None
         old_path = _state.get("video_path")
         if old_path and os.path.exists(old_path):
             os.unlink(old_path)
+        _preview_cache.clear()
+
+        # Exact frame count from the packet index (probe only estimates it)
+        index = load_frame_index(video_path)
+        if index["pts"]:
+            info["total_frames"] = len(index["pts"])
 
         _state["video_path"] = video_path
         _state["video_info"] = info
@@ -346,19 +375,28 @@ async def preview_effect(chain: EffectChain):
         raise HTTPException(status_code=400, detail=f"Too many effects (max {MAX_CHAIN_LENGTH})")
 
     try:
-        frame = extract_single_frame(_state["video_path"], chain.frame_number)
-
         # Cap resolution before applying effects to prevent CPU spikes
         MAX_PREVIEW_PIXELS = 1920 * 1080
-        h, w = frame.shape[:2]
-        if h * w > MAX_PREVIEW_PIXELS:
-            scale = (MAX_PREVIEW_PIXELS / (h * w)) ** 0.5
-            new_h, new_w = int(h * scale), int(w * scale)
-            frame = np.array(Image.fromarray(frame).resize((new_w, new_h)))
+        info = _state["video_info"] or {}
+        pixels = info.get("width", 0) * info.get("height", 0)
+        scale = min(1.0, (MAX_PREVIEW_PIXELS / pixels) ** 0.5) if pixels else 1.0
+
+        def load_frame():
+            frame = _get_decoder().read(chain.frame_number)
+            if scale < 1.0:
+                h, w = frame.shape[:2]
+                frame = np.array(Image.fromarray(frame).resize((int(w * scale), int(h * scale))))
+            return frame
+
+        # Restarts from the longest chain prefix already computed for this
+        # frame; each preview gets fresh frame state, apart from any render
+        video_path = _state["video_path"]
+        frame = _preview_cache.render(video_path, chain.frame_number, scale, chain.effects, load_frame)
 
         if chain.effects:
-            original = frame.copy() if chain.mix < 1.0 else None
-            frame = apply_chain(frame, chain.effects)
+            original = None
+            if chain.mix < 1.0:
+                original = _preview_cache.render(video_path, chain.frame_number, scale, [], load_frame)
             # Wet/dry mix
             if original is not None:
                 mix = max(0.0, min(1.0, chain.mix))
@@ -376,7 +414,7 @@ async def get_frame(frame_number: int):
     """Get a raw frame without effects."""
     if _state["video_path"] is None:
         raise HTTPException(status_code=400, detail="No video loaded")
-    frame = extract_single_frame(_state["video_path"], frame_number)
+    frame = _get_decoder().read(frame_number)
     return {"preview": _frame_to_data_url(frame)}
 
 
@@ -475,21 +513,23 @@ async def delete_preset(preset_id: str):
 
 
 @app.get("/api/sample-frames")
-async def sample_frames(count: int = 5):
-    """Get evenly-spaced frames from the loaded video for overview."""
+async def sample_frames(count: int = 5, scale: float = 1.0):
+    """Get evenly-spaced frames from the loaded video for overview.
+
+    scale < 1 returns thumbnail-size frames (filmstrips).
+    """
     if _state["video_path"] is None:
         raise HTTPException(status_code=400, detail="No video loaded")
     info = _state["video_info"]
     total = max(1, info.get("total_frames", 1))
     count = max(1, min(count, 10))  # Cap at 10 to prevent memory issues
-    indices = [int(i * total / count) for i in range(count)]
-    previews = []
-    for idx in indices:
-        frame = extract_single_frame(_state["video_path"], idx)
-        previews.append({
-            "frame": idx,
-            "preview": _frame_to_data_url(frame),
-        })
+    scale = max(0.05, min(scale, 1.0))
+    indices = sample_frame_numbers(total, count)
+    frames = extract_frame_batch(_state["video_path"], indices, scale=scale)
+    previews = [
+        {"frame": idx, "preview": _frame_to_data_url(frame)}
+        for idx, frame in zip(indices, frames)
+    ]
     return {"frames": previews}
 
 
@@ -499,8 +539,9 @@ async def render_video(req: RenderRequest):
     if _state["video_path"] is None:
         raise HTTPException(status_code=400, detail="No video loaded")
 
-    from core.video_io import extract_frames, reassemble_video, load_frame, save_frame
+    from core.video_io import iter_frames, FrameWriter
     from core.automation import AutomationSession
+    from core.render import render_chain
     import tempfile as tf
 
     info = _state["video_info"]
@@ -512,46 +553,26 @@ async def render_video(req: RenderRequest):
         auto_session = AutomationSession.from_dict(req.automation)
 
     with tf.TemporaryDirectory() as tmpdir:
-        frames_dir = Path(tmpdir) / "frames"
-        processed_dir = Path(tmpdir) / "processed"
-        frames_dir.mkdir()
-        processed_dir.mkdir()
-
-        # Extract frames
+        # Decode at the quality tier's scale and encode window by window
         scale = {"lo": 0.5, "mid": 0.75, "hi": 1.0}[quality]
-        frame_files = extract_frames(_state["video_path"], str(frames_dir), scale=scale)
-
-        # Process each frame
-        for i, fp in enumerate(frame_files):
-            frame = load_frame(fp)
-            if req.effects:
-                # Apply automation overrides
-                effects = auto_session.apply_to_chain(req.effects, i) if auto_session else req.effects
-                original = frame.copy() if req.mix < 1.0 else None
-                frame = apply_chain(frame, effects)
-                if original is not None:
-                    mix = max(0.0, min(1.0, req.mix))
-                    frame = np.clip(
-                        original.astype(float) * (1 - mix) + frame.astype(float) * mix,
-                        0, 255
-                    ).astype(np.uint8)
-            save_frame(frame, str(processed_dir / f"frame_{i+1:06d}.png"))
-
-        # Reassemble
         output_name = f"entropic_render_{quality}.mp4"
-        output_path = Path(tmpdir) / output_name
         audio_src = _state["video_path"] if info.get("has_audio") else None
-        final = reassemble_video(
-            str(processed_dir), str(output_path), info["fps"],
-            audio_source=audio_src, quality=quality
-        )
 
-        # Copy to persistent location
+        with FrameWriter(
+            Path(tmpdir) / output_name, info["fps"],
+            audio_source=audio_src, quality=quality,
+        ) as writer:
+            render_chain(
+                iter_frames(_state["video_path"], scale=scale),
+                req.effects, max(1, info.get("total_frames", 1)), writer,
+                mix=req.mix, automation=auto_session,
+            )
+
+        # Move to persistent location
         renders_dir = Path(__file__).parent / "renders"
         renders_dir.mkdir(exist_ok=True)
-        import shutil
-        dest = renders_dir / final.name
-        shutil.copy2(str(final), str(dest))
+        dest = renders_dir / writer.output_path.name
+        shutil.move(str(writer.output_path), str(dest))
 
     size_mb = dest.stat().st_size / (1024 * 1024)
     return {
@@ -592,176 +613,211 @@ async def get_export_options():
     }
 
 
+def _export_writer(export: ExportSettings, output_path: Path, info: dict,
+                   frame_size: tuple[int, int], target_size: tuple[int, int],
+                   audio_offset: float = 0.0, palette: Path | None = None):
+    """Build the FrameWriter for an export: codec, scaling, fps and audio flags.
+
+    GIF exports also need the palette image produced by _gif_palette().
+    """
+    from core.export_models import ExportFormat, AudioMode, GifDither
+    from core.video_io import FrameWriter
+
+    target_w, target_h = target_size
+    algo = export.resolution.get_scale_algorithm(info["width"], info["height"]).value
+    filters = []
+    if frame_size != target_size:
+        filters.append(f"scale={target_w}:{target_h}:flags={algo}")
+
+    output_args = []
+    fps_flag = export.frame_rate.resolve_ffmpeg_value(info["fps"])
+    if fps_flag and export.format != ExportFormat.GIF:
+        output_args += ["-r", fps_flag]
+
+    audio_source = None
+    if export.audio.mode != AudioMode.STRIP and info.get("has_audio"):
+        audio_source = _state["video_path"]
+    if export.audio.mode == AudioMode.COPY:
+        audio_args = ["-c:a", "copy"]
+    elif export.format == ExportFormat.WEBM:
+        audio_args = ["-c:a", "libopus", "-b:a", export.audio.bitrate]
+    else:
+        audio_args = ["-c:a", "aac", "-b:a", export.audio.bitrate]
+
+    if export.format == ExportFormat.PNG_SEQ:
+        png = export.png_seq
+        video_args = [
+            "-c:v", "png",
+            "-pix_fmt", png.pixel_format.value,
+            "-compression_level", str(png.compression_level),
+        ]
+        output_args += ["-start_number", str(png.start_number)]
+
+    elif export.format == ExportFormat.GIF:
+        # Pass 2 of the GIF pipeline: frames + palette image -> paletteuse
+        gif = export.gif
+        dither = f"dither={gif.dither.value}"
+        if gif.dither == GifDither.BAYER:
+            dither += f":bayer_scale={gif.bayer_scale}"
+        filters = [f"[0:v]{_gif_prefilter(export, info, frame_size, target_size)}[x];"
+                   f"[x][1:v]paletteuse={dither}"]
+        video_args = []
+        output_args += ["-loop", str(gif.loop_count)]
+
+    elif export.format == ExportFormat.WEBM:
+        webm = export.webm
+        video_args = [
+            "-c:v", "libvpx-vp9",
+            "-crf", str(webm.crf),
+            "-b:v", webm.bitrate,
+            "-speed", str(webm.speed),
+            "-row-mt", "1" if webm.row_mt else "0",
+            "-pix_fmt", webm.pixel_format,
+        ]
+
+    elif export.format == ExportFormat.MOV:
+        video_args = [
+            "-c:v", "prores_ks",
+            "-profile:v", str(export.prores.profile.value),
+            "-pix_fmt", export.prores.pixel_format,
+        ]
+
+    else:  # MP4 (H.264)
+        video_args = [
+            "-c:v", "libx264",
+            "-crf", str(export.h264.crf),
+            "-preset", export.h264.preset.value,
+            "-pix_fmt", export.h264.pixel_format,
+        ]
+
+    return FrameWriter(
+        output_path,
+        info["fps"],
+        audio_source=audio_source,
+        video_args=video_args,
+        audio_args=audio_args,
+        vf=",".join(filters) or None,
+        extra_inputs=[palette] if palette else None,
+        output_args=output_args,
+        audio_offset=audio_offset,
+    )
+
+
+def _gif_prefilter(export: ExportSettings, info: dict,
+                   frame_size: tuple[int, int], target_size: tuple[int, int]) -> str:
+    """fps/scale filters shared by both GIF passes."""
+    gif = export.gif
+    algo = export.resolution.get_scale_algorithm(info["width"], info["height"]).value
+    target_w, target_h = target_size
+    filters = [f"fps={gif.fps}"]
+    if target_w > gif.max_width:
+        filters.append(f"scale={gif.max_width}:-1:flags={algo}")
+    elif frame_size != target_size:
+        filters.append(f"scale={target_w}:{target_h}:flags={algo}")
+    return ",".join(filters)
+
+
+def _gif_palette(export: ExportSettings, store, palette_path: Path, info: dict,
+                 frame_size: tuple[int, int], target_size: tuple[int, int]) -> Path:
+    """Pass 1 of the GIF pipeline: stored frames -> palettegen -> palette PNG."""
+    from core.video_io import FrameWriter
+
+    gif = export.gif
+    vf = (f"{_gif_prefilter(export, info, frame_size, target_size)},"
+          f"palettegen=max_colors={gif.max_colors}:stats_mode={gif.stats_mode.value}")
+    with FrameWriter(palette_path, info["fps"], video_args=[], vf=vf,
+                     output_args=["-frames:v", "1", "-update", "1"]) as writer:
+        for frame in store:
+            writer.write(frame)
+    return palette_path
+
+
 @app.post("/api/export")
 async def export_video(export: ExportSettings):
     """Advanced export with full settings."""
     from core.export_models import ExportFormat
-    from core.video_io import extract_frames, load_frame, save_frame
+    from core.video_io import iter_frames, scaled_size
+    from core.render import render_chain
 
     if _state["video_path"] is None:
         raise HTTPException(status_code=400, detail="No video loaded")
 
     info = _state["video_info"]
     source_w, source_h = info["width"], info["height"]
-    target_w, target_h = export.get_target_dimensions(source_w, source_h)
-    output_fps = export.get_output_fps(info["fps"])
+    target_w, target_h = export.resolution.resolve_dimensions(source_w, source_h)
+    output_fps = export.frame_rate.resolve_numeric(info["fps"])
 
     renders_dir = Path(__file__).parent / "renders"
     renders_dir.mkdir(exist_ok=True)
 
-    import tempfile as tf
+    # Decode at target res when downscaling; FFmpeg scales the rest on encode
+    extract_scale = min(1.0, target_w / source_w)
+    frame_size = scaled_size(info, extract_scale)
+
+    # Trim is resolved against the frame index and pushed into the decoder
+    # as seek + frame count, so only the selected range is ever decoded
+    pts = load_frame_index(_state["video_path"])["pts"]
+    total_frames = len(pts) or max(1, info.get("total_frames", 1))
+    start_idx, end_idx = export.trim.resolve_frame_range(total_frames, info["fps"], pts)
+    audio_offset = pts[start_idx] if start_idx < len(pts) else start_idx / info["fps"]
+
+    # Build output filename
+    ext = export.get_output_extension()
+    import time
+    timestamp = int(time.time())
+    output_name = f"entropic_{timestamp}{ext}"
+
+    if export.format == ExportFormat.PNG_SEQ:
+        seq_dir = renders_dir / f"entropic_{timestamp}_seq"
+        seq_dir.mkdir()
+        output_path = seq_dir / "frame_%06d.png"
+    else:
+        output_path = renders_dir / output_name
+
+    total = end_idx - start_idx
+    frames = iter_frames(_state["video_path"], scale=extract_scale, start=start_idx, end=end_idx)
+
+    if export.format == ExportFormat.GIF:
+        # Two-pass GIF: processed frames are staged once in a memory-mapped
+        # store, read by palettegen (pass 1) and again by paletteuse (pass 2)
+        from core.frame_store import FrameStore
+        import tempfile as tf
+
+        with FrameStore.create(total, frame_size[1], frame_size[0]) as store, \
+                tf.TemporaryDirectory() as tmpdir:
+            render_chain(frames, export.effects, total, store, mix=export.mix)
+            palette = _gif_palette(export, store, Path(tmpdir) / "palette.png",
+                                   info, frame_size, (target_w, target_h))
+            with _export_writer(export, output_path, info, frame_size,
+                                (target_w, target_h), palette=palette) as writer:
+                for frame in store:
+                    writer.write(frame)
+    else:
+        with _export_writer(
+            export, output_path, info, frame_size, (target_w, target_h),
+            audio_offset=audio_offset,
+        ) as writer:
+            render_chain(frames, export.effects, total, writer, mix=export.mix)
 
-    with tf.TemporaryDirectory() as tmpdir:
-        frames_dir = Path(tmpdir) / "frames"
-        processed_dir = Path(tmpdir) / "processed"
-        frames_dir.mkdir()
-        processed_dir.mkdir()
-
-        # Calculate extraction scale (extract at target res when downscaling)
-        extract_scale = min(1.0, target_w / source_w)
-        frame_files = extract_frames(_state["video_path"], str(frames_dir), scale=extract_scale)
-
-        # Apply trim if specified
-        start_idx = 0
-        end_idx = len(frame_files)
-        if export.frame_start is not None:
-            start_idx = max(0, min(export.frame_start, len(frame_files) - 1))
-        if export.frame_end is not None:
-            end_idx = max(start_idx + 1, min(export.frame_end + 1, len(frame_files)))
-        frame_files = frame_files[start_idx:end_idx]
-
-        # Process each frame
-        for i, fp in enumerate(frame_files):
-            frame = load_frame(fp)
-
-            # Apply effects with mix
-            if export.effects:
-                original = frame.copy() if export.mix < 1.0 else None
-                frame = apply_chain(frame, export.effects)
-                if original is not None:
-                    mix = max(0.0, min(1.0, export.mix))
-                    frame = np.clip(
-                        original.astype(float) * (1 - mix) + frame.astype(float) * mix,
-                        0, 255
-                    ).astype(np.uint8)
-
-            # Resize to target dimensions if different from extracted
-            h_now, w_now = frame.shape[:2]
-            if (w_now, h_now) != (target_w, target_h):
-                img = Image.fromarray(frame)
-                algo_map = {
-                    "lanczos": Image.LANCZOS,
-                    "bilinear": Image.BILINEAR,
-                    "bicubic": Image.BICUBIC,
-                    "nearest": Image.NEAREST,
-                }
-                algo = algo_map.get(export.scale_algorithm.value, Image.LANCZOS)
-                img = img.resize((target_w, target_h), algo)
-                frame = np.array(img)
-
-            save_frame(frame, str(processed_dir / f"frame_{i+1:06d}.png"))
-
-        # Build output filename
-        ext = export.get_output_extension()
-        import time
-        timestamp = int(time.time())
-        output_name = f"entropic_{timestamp}{ext}"
-
-        if export.format == ExportFormat.PNG_SEQ:
-            # Copy PNGs to renders dir
-            seq_dir = renders_dir / f"entropic_{timestamp}_seq"
-            seq_dir.mkdir()
-            for f in sorted(processed_dir.glob("*.png")):
-                shutil.copy2(str(f), str(seq_dir / f.name))
-            return {
-                "status": "ok",
-                "path": str(seq_dir),
-                "frames": len(list(seq_dir.glob("*.png"))),
-                "format": "png_seq",
-                "dimensions": f"{target_w}x{target_h}",
-            }
-
-        elif export.format == ExportFormat.GIF:
-            output_path = renders_dir / output_name
-            gif_fps = export.gif_fps or min(output_fps, 15)
-            cmd = [
-                shutil.which("ffmpeg") or "ffmpeg", "-y",
-                "-framerate", str(output_fps),
-                "-i", str(processed_dir / "frame_%06d.png"),
-                "-vf", f"fps={gif_fps},split[s0][s1];[s0]palettegen=max_colors={export.gif_colors}[p];[s1][p]paletteuse" +
-                       (":dither=floyd_steinberg" if export.gif_dithering else ":dither=none"),
-                "-loop", str(export.gif_loop),
-                str(output_path),
-            ]
-            subprocess.run(cmd, capture_output=True, check=True, timeout=300)
-
-        elif export.format == ExportFormat.WEBM:
-            output_path = renders_dir / output_name
-            cmd = [
-                shutil.which("ffmpeg") or "ffmpeg", "-y",
-                "-framerate", str(output_fps),
-                "-i", str(processed_dir / "frame_%06d.png"),
-                "-c:v", "libvpx-vp9", "-crf", str(export.webm_crf),
-                "-b:v", "0", "-pix_fmt", "yuv420p",
-                str(output_path),
-            ]
-            if export.audio_mode != "strip" and info.get("has_audio"):
-                cmd = cmd[:-1] + [
-                    "-i", _state["video_path"], "-map", "0:v", "-map", "1:a?",
-                    "-c:a", "libopus", "-shortest", str(output_path)
-                ]
-            subprocess.run(cmd, capture_output=True, check=True, timeout=600)
-
-        elif export.format == ExportFormat.MOV:
-            output_path = renders_dir / output_name
-            profile_map = {
-                "proxy": "0", "lt": "1", "422": "2", "422hq": "3", "4444": "4",
-            }
-            profile_num = profile_map.get(export.prores_profile.value, "2")
-            cmd = [
-                shutil.which("ffmpeg") or "ffmpeg", "-y",
-                "-framerate", str(output_fps),
-                "-i", str(processed_dir / "frame_%06d.png"),
-                "-c:v", "prores_ks", "-profile:v", profile_num,
-                "-pix_fmt", "yuv422p10le" if profile_num != "4" else "yuva444p10le",
-            ]
-            if export.audio_mode != "strip" and info.get("has_audio"):
-                cmd += ["-i", _state["video_path"], "-map", "0:v", "-map", "1:a?",
-                        "-c:a", "aac", "-b:a", export.audio_bitrate, "-shortest"]
-            cmd.append(str(output_path))
-            subprocess.run(cmd, capture_output=True, check=True, timeout=600)
-
-        else:  # MP4 (H.264)
-            output_path = renders_dir / output_name
-            cmd = [
-                shutil.which("ffmpeg") or "ffmpeg", "-y",
-                "-framerate", str(output_fps),
-                "-i", str(processed_dir / "frame_%06d.png"),
-                "-c:v", "libx264",
-                "-crf", str(export.h264_crf),
-                "-preset", export.h264_preset.value,
-                "-pix_fmt", "yuv420p",
-            ]
-            if export.audio_mode != "strip" and info.get("has_audio"):
-                if export.audio_mode == "copy":
-                    cmd += ["-i", _state["video_path"], "-map", "0:v", "-map", "1:a?",
-                            "-c:a", "copy", "-shortest"]
-                else:
-                    cmd += ["-i", _state["video_path"], "-map", "0:v", "-map", "1:a?",
-                            "-c:a", "aac", "-b:a", export.audio_bitrate, "-shortest"]
-            cmd.append(str(output_path))
-            subprocess.run(cmd, capture_output=True, check=True, timeout=600)
-
-        size_mb = output_path.stat().st_size / (1024 * 1024)
+    if export.format == ExportFormat.PNG_SEQ:
         return {
             "status": "ok",
-            "path": str(output_path),
-            "size_mb": round(size_mb, 1),
-            "format": export.format.value,
+            "path": str(seq_dir),
+            "frames": writer.frame_count,
+            "format": "png_seq",
             "dimensions": f"{target_w}x{target_h}",
-            "fps": output_fps,
         }
 
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    return {
+        "status": "ok",
+        "path": str(output_path),
+        "size_mb": round(size_mb, 1),
+        "format": export.format.value,
+        "dimensions": f"{target_w}x{target_h}",
+        "fps": output_fps,
+    }
+
 
 MAX_PREVIEW_DIMENSION = 1280  # Cap preview size to limit data URL bloat
 
@@ -787,7 +843,9 @@ import atexit
 
 
 def _cleanup_on_shutdown():
-    """Remove temp video file on exit."""
+    """Stop the decoder session and remove temp video file on exit."""
+    if _state.get("decoder") is not None:
+        _state["decoder"].close()
     path = _state.get("video_path")
     if path and os.path.exists(path):
         os.unlink(path)
@@ -0,0 +1,99 @@
+"""
+Entropic -- ASCII / Braille Art Tests
+Glyph-atlas rendering must pick the same glyphs as the per-character rules.
+
+Run with: pytest tests/test_ascii.py -v
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects.ascii import (
+    ascii_art, braille_art, CHARSETS, BRAILLE_DOTS,
+    _glyph_atlas, _braille_atlas, _braille_bits,
+)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.RandomState(22)
+    return rng.randint(0, 256, (120, 160, 3), dtype=np.uint8)
+
+
+class TestGlyphAtlas:
+
+    @pytest.mark.parametrize("charset", sorted(CHARSETS))
+    def test_glyphs_are_drawn(self, charset):
+        chars = CHARSETS[charset]
+        atlas = _glyph_atlas(chars, 12, 20)
+        assert atlas.shape == (len(chars), 20, 12)
+        # Only the space is blank; the block shades fill more as they darken
+        assert atlas[0].max() == 0
+        assert (atlas[1:].reshape(len(chars) - 1, -1).max(axis=1) > 0).all()
+        if charset == "block":
+            coverage = atlas.reshape(len(chars), -1).mean(axis=1)
+            assert (np.diff(coverage) > 0).all()
+
+    def test_atlases_are_cached_and_read_only(self):
+        atlas = _glyph_atlas(CHARSETS["basic"], 8, 14)
+        assert _glyph_atlas(CHARSETS["basic"], 8, 14) is atlas
+        assert not atlas.flags.writeable
+        braille = _braille_atlas(8, 16)
+        assert _braille_atlas(8, 16) is braille
+        assert braille.shape == (256, 16, 8) and not braille.flags.writeable
+
+    def test_braille_bits_match_dot_table(self):
+        on = np.random.RandomState(1).rand(12, 10) > 0.5
+        bits = _braille_bits(on)
+        for r in range(3):
+            for c in range(5):
+                want = 0
+                for dy in range(4):
+                    for dx in range(2):
+                        if on[r * 4 + dy, c * 2 + dx]:
+                            want |= BRAILLE_DOTS[dy][dx]
+                assert bits[r, c] == want
+
+
+class TestAsciiArt:
+
+    @pytest.mark.parametrize("shape", [(64, 64, 3), (10, 300, 3), (300, 10, 3), (1, 1, 3)])
+    def test_output_shape(self, shape):
+        frame = np.full(shape, 128, dtype=np.uint8)
+        assert ascii_art(frame).shape == shape
+        assert braille_art(frame).shape == shape
+
+    def test_dark_frame_renders_black(self):
+        black = np.zeros((60, 80, 3), dtype=np.uint8)
+        assert ascii_art(black).max() == 0
+        assert braille_art(black, dither=False).max() == 0
+
+    def test_mono_uses_only_text_color(self, frame):
+        out = ascii_art(frame, color_mode="green")
+        assert out[..., 0].max() == 0 and out[..., 2].max() == 0 and out[..., 1].max() > 0
+
+    def test_original_colors_per_cell(self):
+        frame = np.zeros((80, 160, 3), dtype=np.uint8)
+        frame[:, :80] = (255, 255, 255)
+        frame[:, 80:] = (40, 40, 255)  # Bright enough to draw glyphs
+        out = ascii_art(frame, charset="block", width=10, color_mode="original")
+        left, right = out[:, :70].reshape(-1, 3), out[:, 90:].reshape(-1, 3)
+        assert left.max() == 255 and (left[:, 0] == left[:, 2]).all()
+        lit = right[right.max(axis=1) > 0]
+        assert len(lit) and (lit[:, 2] >= lit[:, 0]).all()
+
+    @pytest.mark.parametrize("dither", [True, "ordered", "floyd", False])
+    def test_braille_dither_modes(self, frame, dither):
+        out = braille_art(frame, width=30, dither=dither)
+        assert out.shape == frame.shape and out.dtype == np.uint8
+
+    def test_ordered_dither_tracks_brightness(self):
+        def lit(level):
+            flat = np.full((120, 160, 3), level, dtype=np.uint8)
+            return (braille_art(flat, width=40, dither="ordered") > 0).mean()
+        assert lit(40) < lit(128) < lit(220)
@@ -0,0 +1,155 @@
+"""
+Entropic -- Buffer Pool Tests
+Intermediate frames reused across frames without corrupting outputs.
+
+Run with: pytest tests/test_buffers.py -v
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects import EFFECTS, _caps, apply_effect, compile_chain, ChainPlan
+from effects.buffers import BufferPool
+from core.render import render_chain
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.RandomState(4)
+    return [rng.randint(0, 256, (36, 48, 3), dtype=np.uint8) for _ in range(6)]
+
+
+WARP_CHAIN = [
+    {"name": "wave", "params": {"amplitude": 5}},
+    {"name": "chromatic", "params": {"offset": 3}},
+    {"name": "channelshift", "params": {}},
+    {"name": "mirror", "params": {}},
+]
+
+
+class ListWriter:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+
+class TestBufferPool:
+
+    def test_reuses_returned_buffers(self):
+        pool = BufferPool()
+        a = pool.take((4, 4, 3))
+        pool.give(a)
+        assert pool.take((4, 4, 3)) is a
+        assert pool.take((4, 4, 3), np.float32) is not a
+
+    def test_high_water_mark(self):
+        pool = BufferPool()
+        a, b = pool.take((10, 10, 3)), pool.take((10, 10, 3))
+        pool.give(a)
+        pool.give(b)
+        pool.take((10, 10, 3))
+        assert pool.high_water_bytes == 600
+        assert pool.in_use_bytes == 300
+        assert pool.allocated_bytes == 600
+
+    def test_discard_forgets_buffer(self):
+        pool = BufferPool()
+        a = pool.take((8, 8, 3))
+        pool.discard(a)
+        assert pool.in_use_bytes == 0 and pool.allocated_bytes == 0
+        assert pool.take((8, 8, 3)) is not a
+
+
+class TestPlanBuffers:
+
+    def test_matches_effects_without_out(self, frames):
+        plan = compile_chain(WARP_CHAIN, fuse=False)
+        for frame in frames:
+            want = frame
+            for effect in WARP_CHAIN:
+                want = apply_effect(want, effect["name"], **effect["params"])
+            np.testing.assert_array_equal(plan(frame.copy()), want)
+
+    def test_allocations_settle_after_first_frame(self, frames):
+        plan = compile_chain(WARP_CHAIN, fuse=False)
+        plan(frames[0].copy())
+        allocated = plan.context.pool.allocated_bytes
+        assert allocated > 0
+        for frame in frames[1:]:
+            plan(frame.copy())
+        assert plan.context.pool.allocated_bytes == allocated
+        assert plan.context.pool.in_use_bytes == 0
+
+    def test_outputs_not_recycled(self, frames):
+        plan = compile_chain(WARP_CHAIN, fuse=False)
+        first = plan(frames[0].copy())
+        kept = first.copy()
+        for frame in frames[1:]:
+            plan(frame.copy())
+        np.testing.assert_array_equal(first, kept)
+
+    def test_views_of_pooled_buffers_not_recycled(self, frames):
+        class Fill:
+            name, wants_out, slot = "fill", True, None
+
+            def __call__(self, frame, frame_index=0, total_frames=1, state=None, out=None):
+                out[:] = frame
+                return out
+
+        class Crop:
+            name, wants_out, slot = "crop", False, None
+
+            def __call__(self, frame, frame_index=0, total_frames=1, state=None):
+                return frame[1:-1]
+
+        plan = ChainPlan([Fill(), Crop()])
+        first = plan(frames[0].copy())
+        plan(frames[1].copy())
+        np.testing.assert_array_equal(first, frames[0][1:-1])
+
+    def test_stateful_step_without_state_param_keeps_its_frames(self, frames, monkeypatch):
+        held = {}
+
+        def hold_previous(frame):
+            # Keeps the last input by reference, without a state param
+            previous = held.get("frame", frame)
+            held["frame"] = frame
+            return previous.copy()
+
+        monkeypatch.setitem(EFFECTS, "holdprevious", {
+            "fn": hold_previous,
+            "category": "temporal",
+            "params": {},
+            "description": "Output the previous frame",
+            "caps": _caps(stateful=True, pointwise=False, radius=0),
+        })
+        chain = [{"name": "wave", "params": {"amplitude": 5}}, {"name": "holdprevious", "params": {}}]
+        plan = compile_chain(chain, fuse=False)
+        assert plan.steps[0].wants_out
+        plan(frames[0].copy())
+        out = plan(frames[1].copy())
+        np.testing.assert_array_equal(out, apply_effect(frames[0], "wave", amplitude=5))
+
+    def test_region_and_mix_steps_get_no_buffer(self):
+        plan = compile_chain([{"name": "wave", "params": {"mix": 0.5}},
+                              {"name": "mirror", "params": {"region": "center"}}], fuse=False)
+        assert [step.wants_out for step in plan.steps] == [False, False]
+
+
+class TestRenderStats:
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_reports_high_water(self, frames, workers):
+        stats = {}
+        writer = ListWriter()
+        render_chain(iter(frames), WARP_CHAIN + [{"name": "invert", "params": {}}],
+                     len(frames), writer, workers=workers, stats=stats)
+        assert len(writer.frames) == len(frames)
+        assert stats["buffer_high_water_bytes"] >= frames[0].nbytes
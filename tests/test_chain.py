@@ -0,0 +1,199 @@
+"""
+Entropic -- Compiled Chain Tests
+compile_chain() plans against apply_chain(), and per-frame overhead.
+
+Run with: pytest tests/test_chain.py -v
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects import apply_chain, compile_chain, ChainPlan, RenderContext
+from effects.temporal import feedback
+from core.safety import SafetyError, MAX_CHAIN_DEPTH
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.RandomState(11)
+    return [rng.randint(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(12)]
+
+
+CHAINS = {
+    "pointwise": [
+        {"name": "invert", "params": {}},
+        {"name": "contrast", "params": {"amount": 40}},
+        {"name": "posterize", "params": {"levels": 4}},
+    ],
+    "seeded": [
+        {"name": "filmgrain", "params": {"seed": 9}},
+        {"name": "rowshift", "params": {"seed": 2}},
+    ],
+    "region_mix": [
+        {"name": "invert", "params": {"region": "center", "feather": 5, "mix": 0.6}},
+        {"name": "pixelsort", "params": {"region": "top-half"}},
+    ],
+    "temporal": [
+        {"name": "stutter", "params": {"repeat": 2, "interval": 4}},
+        {"name": "feedback", "params": {"decay": 0.4}},
+    ],
+}
+
+
+class TestCompileChain:
+
+    @pytest.mark.parametrize("chain_name", sorted(CHAINS))
+    def test_matches_apply_chain(self, frames, chain_name):
+        chain = CHAINS[chain_name]
+        expected = [apply_chain(f.copy(), chain, frame_index=i, total_frames=len(frames))
+                    for i, f in enumerate(frames)]
+        plan = compile_chain(chain)
+        for i, f in enumerate(frames):
+            np.testing.assert_array_equal(plan(f.copy(), i, len(frames)), expected[i])
+
+    def test_plan_is_reusable(self, frames):
+        plan = compile_chain(CHAINS["seeded"])
+        assert isinstance(plan, ChainPlan)
+        assert len(plan) == 2
+        assert plan.names == ["filmgrain", "rowshift"]
+        np.testing.assert_array_equal(plan(frames[0].copy(), 3), plan(frames[0].copy(), 3))
+
+    def test_no_reflection_per_frame(self, frames):
+        plan = compile_chain(CHAINS["region_mix"] + CHAINS["seeded"])
+        plan(frames[0], 0, len(frames))  # Region geometry resolves per frame size
+        with patch("effects.chain.inspect.signature") as sig, \
+                patch("effects.chain.get_effect") as lookup, \
+                patch("core.region.parse_region") as parse:
+            for i, f in enumerate(frames):
+                plan(f, i, len(frames))
+        sig.assert_not_called()
+        lookup.assert_not_called()
+        parse.assert_not_called()
+
+    def test_does_not_mutate_chain(self):
+        chain = [{"name": "invert", "params": {"mix": 0.5, "region": "center"}}]
+        compile_chain(chain)
+        assert chain[0]["params"] == {"mix": 0.5, "region": "center"}
+
+    def test_validates_once_at_compile(self):
+        with pytest.raises(SafetyError):
+            compile_chain([{"name": "invert", "params": {}}] * (MAX_CHAIN_DEPTH + 1))
+
+    def test_unknown_effect_fails_at_compile(self):
+        with pytest.raises(ValueError):
+            compile_chain([{"name": "no_such_effect", "params": {}}])
+
+    def test_empty_chain_passthrough(self, frames):
+        assert compile_chain([])(frames[0]) is frames[0]
+
+
+STATEFUL = [
+    {"name": "stutter", "params": {"repeat": 2, "interval": 3}},
+    {"name": "delay", "params": {"delay_frames": 2, "decay": 0.5}},
+    {"name": "datamosh", "params": {"intensity": 3.0}},
+]
+
+
+class TestRenderContext:
+
+    def _render(self, plan, frames):
+        return [plan(f.copy(), i, len(frames)) for i, f in enumerate(frames)]
+
+    def test_interleaved_renders_are_independent(self, frames):
+        expected = self._render(compile_chain(STATEFUL), frames)
+        other = frames[::-1]
+        expected_other = self._render(compile_chain(STATEFUL), other)
+
+        a, b = compile_chain(STATEFUL), compile_chain(STATEFUL)
+        for i in range(len(frames)):
+            np.testing.assert_array_equal(a(frames[i].copy(), i, len(frames)), expected[i])
+            np.testing.assert_array_equal(b(other[i].copy(), i, len(other)), expected_other[i])
+
+    def test_preview_does_not_disturb_render(self, frames):
+        expected = self._render(compile_chain(STATEFUL), frames)
+        plan = compile_chain(STATEFUL)
+        for i, f in enumerate(frames):
+            apply_chain(frames[0].copy(), STATEFUL, frame_index=5, total_frames=len(frames),
+                        context=RenderContext())
+            np.testing.assert_array_equal(plan(f.copy(), i, len(frames)), expected[i])
+
+    def test_same_effect_twice_keeps_separate_state(self, frames):
+        chain = [
+            {"name": "feedback", "params": {"decay": 0.6}},
+            {"name": "invert", "params": {}},
+            {"name": "feedback", "params": {"decay": 0.3}},
+        ]
+        plan = compile_chain(chain)
+        first, second = {}, {}
+        for i, f in enumerate(frames):
+            want = feedback(f.copy(), decay=0.6, frame_index=i, state=first)
+            want = feedback(255 - want, decay=0.3, frame_index=i, state=second)
+            np.testing.assert_array_equal(plan(f.copy(), i, len(frames)), want)
+        assert len(plan.context.slots) == 2
+
+    def test_shared_context_for_plan_variants(self, frames):
+        context = RenderContext()
+        slow = compile_chain([{"name": "feedback", "params": {"decay": 0.5}}], context=context)
+        fast = compile_chain([{"name": "feedback", "params": {"decay": 0.2}}], context=context)
+        slow(frames[0], 0)
+        # The variant picks up the history left by the first plan
+        assert not np.array_equal(fast(frames[1], 1), frames[1])
+
+    def test_reset(self, frames):
+        plan = compile_chain(STATEFUL)
+        self._render(plan, frames[:3])
+        plan.context.reset()
+        assert plan.context.slots == {}
+
+
+class TestWorkingFormat:
+
+    def test_returns_uint8(self, frames):
+        plan = compile_chain(CHAINS["region_mix"], working_format="float32")
+        out = plan(frames[0].copy())
+        assert out.dtype == np.uint8 and out.shape == frames[0].shape
+
+    def test_single_effect_matches_uint8(self, frames):
+        chain = [{"name": "contrast", "params": {"amount": 30, "curve": "s_curve"}}]
+        got = compile_chain(chain, working_format="float32")(frames[0].copy())
+        np.testing.assert_array_equal(got, compile_chain(chain)(frames[0].copy()))
+
+    def test_no_requantization_between_effects(self, frames):
+        """Darkening then brightening loses the low bits only when rounded in between."""
+        chain = [{"name": "exposure", "params": {"stops": -3}},
+                 {"name": "exposure", "params": {"stops": 3}}]
+        as_uint8 = compile_chain(chain)(frames[0].copy())
+        as_float = compile_chain(chain, working_format="float32")(frames[0].copy())
+        assert len(np.unique(as_uint8)) <= 32
+        assert np.abs(as_float.astype(int) - frames[0]).max() <= 1
+
+    def test_uint8_effects_get_uint8(self, frames):
+        chain = [{"name": "invert", "params": {"mix": 0.5}},
+                 {"name": "hueshift", "params": {}},
+                 {"name": "wave", "params": {}},
+                 {"name": "mirror", "params": {}}]
+        plan = compile_chain(chain, working_format="float32")
+        assert plan.names == ["invert", "hueshift", "wave+mirror"]
+        dtypes = [stage.dtype for stage in plan.stages(frames[0].copy())]
+        assert dtypes == [np.float32, np.uint8, np.float32]
+
+    def test_skips_lookup_tables(self):
+        plan = compile_chain(CHAINS["pointwise"], working_format="float32")
+        assert plan.names == ["invert", "contrast", "posterize"]
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError):
+            compile_chain(CHAINS["pointwise"], working_format="int16")
+
+    def test_default_from_environment(self, monkeypatch):
+        from effects.formats import default_working_format
+        monkeypatch.setenv("ENTROPIC_WORKING_FORMAT", "float32")
+        assert default_working_format() == "float32"
+        monkeypatch.setenv("ENTROPIC_WORKING_FORMAT", "bogus")
+        assert default_working_format() == "uint8"
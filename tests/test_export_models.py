@@ -0,0 +1,45 @@
+"""
+Entropic -- Export Settings Tests
+Trim resolution into the decoder's [start, end) frame range.
+
+Run with: pytest tests/test_export_models.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.export_models import TrimSettings, TrimMode
+
+
+class TestTrimFrameRange:
+
+    def test_full(self):
+        assert TrimSettings().resolve_frame_range(90, 30.0) == (0, 90)
+
+    def test_frames_end_inclusive(self):
+        trim = TrimSettings(mode=TrimMode.FRAMES, start_frame=10, end_frame=19)
+        assert trim.resolve_frame_range(90, 30.0) == (10, 20)
+
+    def test_frames_open_end(self):
+        trim = TrimSettings(mode=TrimMode.FRAMES, start_frame=80)
+        assert trim.resolve_frame_range(90, 30.0) == (80, 90)
+
+    def test_time_uses_fps(self):
+        trim = TrimSettings(mode=TrimMode.TIME, start_time=1.0, end_time=2.0)
+        assert trim.resolve_frame_range(90, 30.0) == (30, 60)
+
+    def test_time_uses_pts_when_given(self):
+        # Variable frame rate: frames at 0, 0.5, 0.6, 1.5, 2.0 s
+        pts = [0.0, 0.5, 0.6, 1.5, 2.0]
+        trim = TrimSettings(mode=TrimMode.TIME, start_time=0.55, end_time=1.5)
+        assert trim.resolve_frame_range(len(pts), 30.0, pts) == (2, 3)
+
+    @pytest.mark.parametrize("start,end", [(200, 300), (89, None)])
+    def test_clamped_and_never_empty(self, start, end):
+        trim = TrimSettings(mode=TrimMode.FRAMES, start_frame=start, end_frame=end)
+        lo, hi = trim.resolve_frame_range(90, 30.0)
+        assert 0 <= lo < hi <= 90
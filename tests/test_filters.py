@@ -0,0 +1,121 @@
+"""
+Entropic -- Separable Filter Tests
+Shared 1D filters must match their direct 2D definitions.
+
+Run with: pytest tests/test_filters.py -v
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects import filters, get_caps
+from effects.texture import blur, sharpen, vhs, edge_detect
+from effects.destruction import film_grain
+
+
+@pytest.fixture
+def frame():
+    return np.random.RandomState(23).randint(0, 256, (48, 64, 3), dtype=np.uint8)
+
+
+def reference_box(img, radius, axis):
+    """Window mean with replicated edges, one shifted copy per offset."""
+    ry = radius if axis in (None, 0) else 0
+    rx = radius if axis in (None, 1) else 0
+    pad = np.pad(img.astype(np.float64), ((ry, ry), (rx, rx), (0, 0)), mode="edge")
+    h, w = img.shape[:2]
+    total = sum(pad[dy:dy + h, dx:dx + w] for dy in range(2 * ry + 1) for dx in range(2 * rx + 1))
+    return total / ((2 * ry + 1) * (2 * rx + 1))
+
+
+class TestFilters:
+
+    @pytest.mark.parametrize("axis", [None, 0, 1])
+    @pytest.mark.parametrize("radius", [1, 4, 30])
+    def test_box_matches_window_mean(self, frame, radius, axis):
+        got = filters.box(frame.astype(np.float32), radius, axis)
+        np.testing.assert_allclose(got, reference_box(frame, radius, axis), atol=1e-3)
+        assert filters.box(frame, radius, axis).dtype == np.uint8
+
+    def test_zero_radius_is_identity(self, frame):
+        assert filters.box(frame, 0) is frame
+        assert filters.gaussian(frame, 0) is frame
+
+    def test_small_gaussian_is_exact_kernel(self, frame):
+        img = frame.astype(np.float32)
+        kernel = filters.gaussian_kernel(1.5)
+        r = len(kernel) // 2
+        pad = np.pad(img, ((0, 0), (r, r), (0, 0)), mode="edge")
+        want = sum(kernel[i] * pad[:, i:i + img.shape[1]] for i in range(len(kernel)))
+        np.testing.assert_allclose(filters.gaussian(img, 1.5, axis=1), want, atol=1e-3)
+
+    @pytest.mark.parametrize("sigma", [9.0, 15.0, 40.0])
+    def test_box_passes_match_gaussian_variance(self, sigma):
+        radii = filters.box_radii(sigma)
+        variance = sum(((2 * r + 1) ** 2 - 1) / 12 for r in radii)
+        assert abs(np.sqrt(variance) - sigma) < 0.5
+
+    def test_large_gaussian_close_to_exact(self):
+        impulse = np.zeros((1, 201), dtype=np.float32)
+        impulse[0, 100] = 1000
+        got = filters.gaussian(impulse, 12.0, axis=1)[0]
+        want = 1000 * filters.gaussian_kernel(12.0, radius=100)
+        assert abs(got.sum() - 1000) < 1e-2
+        assert np.abs(got - want).max() < 0.1 * want.max()
+
+    def test_derivative_is_central_difference(self, frame):
+        gray = frame[:, :, 0].astype(np.float32)
+        gx = filters.derivative(gray, axis=1)
+        gy = filters.derivative(gray, axis=0)
+        np.testing.assert_array_equal(gx[:, 1:-1], gray[:, 2:] - gray[:, :-2])
+        np.testing.assert_array_equal(gy[1:-1], gray[2:] - gray[:-2])
+        assert not gx[:, [0, -1]].any() and not gy[[0, -1]].any()
+
+
+class TestFilterEffects:
+
+    @pytest.mark.parametrize("blur_type", ["box", "motion", "gaussian"])
+    @pytest.mark.parametrize("radius", [1, 3, 20])
+    def test_blur_types(self, frame, blur_type, radius):
+        out = blur(frame, radius=radius, blur_type=blur_type)
+        assert out.shape == frame.shape and out.dtype == np.uint8
+
+    @pytest.mark.parametrize("blur_type", ["box", "motion", "gaussian"])
+    def test_blur_within_declared_radius(self, blur_type):
+        impulse = np.zeros((101, 101, 3), dtype=np.float32)
+        impulse[50, 50] = 255.0
+        out = blur(impulse, radius=100, blur_type=blur_type)
+        ys, xs = np.nonzero(out[..., 0])
+        reach = max(np.abs(ys - 50).max(), np.abs(xs - 50).max())
+        assert reach <= get_caps("blur")["radius"]
+
+    def test_motion_blur_is_horizontal_box(self, frame):
+        out = blur(frame, radius=5, blur_type="motion").astype(np.float64)
+        assert np.abs(out - reference_box(frame, 5, axis=1)).max() <= 0.5 + 1e-6
+
+    def test_sharpen_matches_pil_kernel(self, frame):
+        from PIL import Image, ImageFilter
+        want = np.array(Image.fromarray(frame).filter(ImageFilter.SHARPEN))
+        got = sharpen(frame, amount=1.0)
+        # PIL leaves the border pixels unfiltered
+        np.testing.assert_array_equal(got[1:-1, 1:-1], want[1:-1, 1:-1])
+
+    def test_vhs_bleeds_red_and_blue_only(self, frame):
+        out = vhs(frame, tracking=0.0, noise_amount=0.0, color_bleed=3)
+        np.testing.assert_array_equal(out[:, :, 1], frame[:, :, 1])
+        want = reference_box(frame, 3, axis=1)
+        assert np.abs(out[:, :, ::2] - want[:, :, ::2]).max() <= 0.5 + 1e-6
+
+    def test_edge_detect_read_only_input(self, frame):
+        frame.setflags(write=False)
+        assert edge_detect(frame, mode="neon").shape == frame.shape
+
+    @pytest.mark.parametrize("grain_size", [1, 3, 7])
+    def test_film_grain_any_frame_size(self, grain_size):
+        odd = np.full((37, 53, 3), 128, dtype=np.uint8)
+        assert film_grain(odd, grain_size=grain_size).shape == odd.shape
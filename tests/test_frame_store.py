@@ -0,0 +1,89 @@
+"""
+Entropic -- Frame Store Tests
+Memory-mapped intermediate frame storage.
+
+Run with: pytest tests/test_frame_store.py -v
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.frame_store import FrameStore
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.RandomState(3)
+    return [rng.randint(0, 256, (12, 16, 3), dtype=np.uint8) for _ in range(10)]
+
+
+class TestFrameStore:
+
+    def test_roundtrip(self, frames):
+        with FrameStore.create(len(frames), 12, 16) as store:
+            for f in frames:
+                store.append(f)
+            assert len(store) == len(frames)
+            for k, f in enumerate(frames):
+                np.testing.assert_array_equal(store[k], f)
+
+    def test_getitem_is_zero_copy_view(self, frames):
+        with FrameStore.create(2, 12, 16) as store:
+            store.append(frames[0])
+            view = store[0]
+            assert isinstance(view, np.memmap) or view.base is not None
+            assert not view.flags.owndata
+
+    def test_grows_past_capacity(self, frames):
+        with FrameStore.create(2, 12, 16) as store:
+            for f in frames:
+                store.write(f)
+            assert store.capacity >= len(frames)
+            np.testing.assert_array_equal(store[9], frames[9])
+
+    def test_iterates_in_frame_order(self, frames):
+        with FrameStore.create(4, 12, 16) as store:
+            for k in (3, 0, 2, 1):
+                store.put(k, frames[k])
+            for got, want in zip(store, frames[:4]):
+                np.testing.assert_array_equal(got, want)
+
+    def test_slots_address_the_mapped_file(self, frames):
+        with FrameStore.create(4, 12, 16) as store:
+            for slot in (2, 0):
+                store.write_slot(slot, frames[slot])
+            assert len(store) == 0
+            raw = np.memmap(store.path, dtype=np.uint8, mode="r", shape=(4, 12, 16, 3))
+            np.testing.assert_array_equal(raw[2], frames[2])
+            np.testing.assert_array_equal(store.slot_view(0), frames[0])
+            with pytest.raises(IndexError):
+                store.slot_view(4)
+
+    def test_shape_mismatch_rejected(self):
+        with FrameStore.create(1, 12, 16) as store:
+            with pytest.raises(ValueError):
+                store.append(np.zeros((8, 8, 3), dtype=np.uint8))
+
+    def test_temporary_store_removed_on_close(self, frames):
+        store = FrameStore.create(1, 12, 16)
+        store.append(frames[0])
+        path = store.path
+        assert path.exists()
+        store.close()
+        assert not path.exists()
+
+    def test_persistent_store_reopens_read_only(self, frames, tmp_path):
+        path = tmp_path / "frames.u8"
+        with FrameStore.create(4, 12, 16, path=str(path), temporary=False) as store:
+            for f in frames[:3]:
+                store.append(f)
+        with FrameStore(str(path)) as store:
+            assert len(store) == 3
+            np.testing.assert_array_equal(store[2], frames[2])
+            with pytest.raises(ValueError):
+                store.append(frames[3])
@@ -0,0 +1,80 @@
+"""
+Entropic -- LUT Fusion Tests
+Runs of pointwise effects baked into lookup tables must match the effects.
+
+Run with: pytest tests/test_lut.py -v
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects import compile_chain
+from effects.lut import LutStep
+
+
+@pytest.fixture
+def frame():
+    return np.random.RandomState(8).randint(0, 256, (60, 80, 3), dtype=np.uint8)
+
+
+CHANNELWISE = [
+    {"name": "contrast", "params": {"amount": 35, "curve": "s_curve"}},
+    {"name": "exposure", "params": {"stops": 0.7, "clip_mode": "mirror"}},
+    {"name": "temperature", "params": {"temp": -40}},
+    {"name": "invert", "params": {"channel": "g", "amount": 0.6, "mix": 0.7}},
+    {"name": "posterize", "params": {"levels": 6}},
+]
+
+
+class TestLutFusion:
+
+    def test_channelwise_run_is_exact(self, frame):
+        fused = compile_chain(CHANNELWISE)
+        assert len(fused) == 1 and isinstance(fused.steps[0], LutStep)
+        unfused = compile_chain(CHANNELWISE, fuse=False)
+        np.testing.assert_array_equal(fused(frame.copy()), unfused(frame.copy()))
+
+    def test_mixed_run_fuses_channelwise_stretches(self, frame):
+        chain = [{"name": "hueshift", "params": {"degrees": 90}}] + CHANNELWISE[:2] + \
+                [{"name": "saturation", "params": {"amount": 2.0}}] + CHANNELWISE[2:]
+        plan = compile_chain(chain)
+        assert plan.names == ["hueshift", "contrast+exposure", "saturation",
+                              "temperature+invert+posterize"]
+        np.testing.assert_array_equal(plan(frame.copy()), compile_chain(chain, fuse=False)(frame.copy()))
+
+    def test_cube_matches_effects(self, frame):
+        chain = [{"name": "hueshift", "params": {"degrees": 45}},
+                 {"name": "invert", "params": {}}]
+        plan = compile_chain(chain, cube=True)
+        assert len(plan) == 1 and plan.steps[0].cube
+        # OpenCV's HSV conversion itself rounds +-1 depending on pixel layout
+        got = plan(frame.copy()).astype(int)
+        want = compile_chain(chain, fuse=False)(frame.copy()).astype(int)
+        assert np.abs(got - want).max() <= 1
+
+    @pytest.mark.parametrize("breaker", [
+        {"name": "invert", "params": {"region": "center"}},
+        {"name": "tremolo", "params": {}},
+        {"name": "blur", "params": {}},
+    ])
+    def test_position_and_time_dependent_steps_break_runs(self, breaker):
+        plan = compile_chain(CHANNELWISE[:2] + [breaker] + CHANNELWISE[2:4])
+        assert plan.names == ["contrast+exposure", breaker["name"], "temperature+invert"]
+
+    def test_single_effect_left_alone(self):
+        assert not isinstance(compile_chain(CHANNELWISE[:1]).steps[0], LutStep)
+
+    def test_state_slots_keep_chain_positions(self, frame):
+        plan = compile_chain(CHANNELWISE[:2] + [{"name": "feedback", "params": {}}])
+        plan(frame, 0)
+        assert list(plan.context.slots) == [(2, "feedback")]
+
+    def test_non_uint8_falls_back_to_effects(self, frame):
+        as_float = frame.astype(np.float32)
+        fused = compile_chain(CHANNELWISE[:2])
+        np.testing.assert_array_equal(fused(as_float), compile_chain(CHANNELWISE[:2], fuse=False)(as_float))
@@ -0,0 +1,76 @@
+"""
+Entropic -- Pixel Sort Tests
+The whole-frame sort must match sorting each interval on its own.
+
+Run with: pytest tests/test_pixelsort.py -v
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects.pixelsort import pixelsort, SORT_KEYS, _brightness
+
+
+def reference(frame, threshold, sort_by, direction):
+    """Row-by-row, interval-by-interval sort (stable)."""
+    sort_fn = SORT_KEYS.get(sort_by, _brightness)
+    result = frame.copy()
+    if direction == "vertical":
+        result = result.transpose(1, 0, 2)
+    for row in result:
+        keys = sort_fn(row)
+        if sort_by == "brightness":
+            mask = keys > threshold * 255
+        else:
+            mask = (keys - keys.min()) / (keys.max() - keys.min() + 1e-8) * 255 > threshold * 255
+        edges = np.diff(np.concatenate([[0], mask.astype(int), [0]]))
+        for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+            segment = row[start:end].copy()
+            row[start:end] = segment[np.argsort(sort_fn(segment), kind="stable")]
+    if direction == "vertical":
+        result = result.transpose(1, 0, 2)
+    return result
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.RandomState(21)
+    frame = rng.randint(0, 256, (40, 56, 3), dtype=np.uint8)
+    # Grey pixels tie on hue and saturation
+    frame[::3, ::2] = rng.randint(0, 256, (14, 28, 1))
+    return frame
+
+
+class TestPixelsort:
+
+    @pytest.mark.parametrize("sort_by", ["brightness", "hue", "saturation", "unknown"])
+    @pytest.mark.parametrize("direction", ["horizontal", "vertical"])
+    @pytest.mark.parametrize("threshold", [0.0, 0.3, 0.5, 1.0])
+    def test_matches_per_interval_sort(self, frame, sort_by, direction, threshold):
+        got = pixelsort(frame, threshold=threshold, sort_by=sort_by, direction=direction)
+        np.testing.assert_array_equal(got, reference(frame, threshold, sort_by, direction))
+
+    def test_threshold_one_leaves_frame(self, frame):
+        np.testing.assert_array_equal(pixelsort(frame, threshold=1.0), frame)
+
+    def test_threshold_zero_sorts_whole_rows(self, frame):
+        frame = np.maximum(frame, 1)  # Pure black is never above the threshold
+        keys = _brightness(pixelsort(frame, threshold=0.0).reshape(-1, 3)).reshape(frame.shape[:2])
+        assert (np.diff(keys, axis=1) >= 0).all()
+
+    def test_rows_keep_their_pixels(self, frame):
+        out = pixelsort(frame, threshold=0.2, direction="vertical")
+        for x in range(frame.shape[1]):
+            assert sorted(map(tuple, out[:, x])) == sorted(map(tuple, frame[:, x]))
+
+    @pytest.mark.parametrize("shape", [(1, 9, 3), (9, 1, 3)])
+    def test_thin_frames(self, shape):
+        frame = np.random.RandomState(3).randint(0, 256, shape, dtype=np.uint8)
+        for direction in ["horizontal", "vertical"]:
+            np.testing.assert_array_equal(pixelsort(frame, 0.2, direction=direction),
+                                          reference(frame, 0.2, "brightness", direction))
@@ -0,0 +1,159 @@
+"""
+Entropic -- Preview Cache Tests
+Chain-prefix reuse, LRU byte budget and source invalidation.
+
+Run with: pytest tests/test_preview_cache.py -v
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.preview_cache import PreviewCache, prefix_hashes
+from effects import EFFECTS, _caps, apply_chain, RenderContext
+from effects.chain import EffectStep
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"not decoded in these tests")
+    return str(path)
+
+
+@pytest.fixture
+def frame():
+    return np.random.RandomState(5).randint(0, 256, (48, 64, 3), dtype=np.uint8)
+
+
+def chain(amount=20):
+    return [
+        {"name": "pixelsort", "params": {"threshold": 0.4}},
+        {"name": "blur", "params": {"radius": 3}},
+        {"name": "contrast", "params": {"amount": amount}},
+    ]
+
+
+class TestPreviewCache:
+
+    def test_matches_apply_chain(self, source, frame):
+        cache = PreviewCache(budget_bytes=1 << 24)
+        got = cache.render(source, 0, 1.0, chain(), lambda: frame.copy())
+        want = apply_chain(frame.copy(), chain(), context=RenderContext())
+        np.testing.assert_array_equal(got, want)
+
+    def test_tail_change_reuses_prefix(self, source, frame):
+        cache = PreviewCache(budget_bytes=1 << 24)
+        loads = []
+
+        def load():
+            loads.append(1)
+            return frame.copy()
+
+        cache.render(source, 0, 1.0, chain(20), load)
+        call = EffectStep.__call__
+        with patch.object(EffectStep, "__call__", autospec=True, side_effect=call) as step:
+            got = cache.render(source, 0, 1.0, chain(60), load)
+        assert len(loads) == 1
+        assert [c.args[0].name for c in step.call_args_list] == ["contrast"]
+        np.testing.assert_array_equal(got, apply_chain(frame.copy(), chain(60), context=RenderContext()))
+
+    def test_key_includes_frame_and_scale(self, source, frame):
+        cache = PreviewCache(budget_bytes=1 << 24)
+        loads = []
+        for frame_number, scale in [(0, 1.0), (1, 1.0), (0, 0.5), (0, 1.0)]:
+            cache.render(source, frame_number, scale, [], lambda: loads.append(1) or frame)
+        assert len(loads) == 3
+
+    def test_source_change_invalidates(self, source, frame):
+        cache = PreviewCache(budget_bytes=1 << 24)
+        loads = []
+        cache.render(source, 0, 1.0, [], lambda: loads.append(1) or frame)
+        with open(source, "ab") as f:
+            f.write(b"re-encoded")
+        cache.render(source, 0, 1.0, [], lambda: loads.append(1) or frame)
+        assert len(loads) == 2
+
+    def test_byte_budget_evicts_lru(self, frame):
+        cache = PreviewCache(budget_bytes=frame.nbytes * 2)
+        cache.put("a", frame)
+        cache.put("b", frame)
+        cache.get("a")
+        cache.put("c", frame)
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.nbytes == frame.nbytes * 2
+
+    def test_oversized_frame_not_stored(self, frame):
+        cache = PreviewCache(budget_bytes=frame.nbytes - 1)
+        cache.put("a", frame)
+        assert len(cache) == 0 and cache.nbytes == 0
+
+    def test_entries_are_read_only_copies(self, frame):
+        cache = PreviewCache(budget_bytes=1 << 24)
+        cache.put("a", frame)
+        frame[:] = 0
+        stored = cache.get("a")
+        assert stored.any()
+        with pytest.raises(ValueError):
+            stored[0, 0, 0] = 1
+
+    def test_stops_caching_at_nondeterministic_effect(self, source, frame):
+        cache = PreviewCache(budget_bytes=1 << 24)
+        effects = [{"name": "invert", "params": {}}, {"name": "scanlines", "params": {}},
+                   {"name": "contrast", "params": {}}]
+        cache.render(source, 0, 1.0, effects, lambda: frame)
+        # Source frame and the invert prefix only
+        assert len(cache) == 2
+
+    def test_result_writeable_on_every_path(self, source, frame):
+        cache = PreviewCache(budget_bytes=1 << 24)
+        # Ends in a pass-through step, which returns its read-only input
+        effects = [{"name": "invert", "params": {}}, {"name": "contrast", "params": {"mix": 0.0}}]
+        computed = cache.render(source, 0, 1.0, effects, lambda: frame)
+        cached = cache.render(source, 0, 1.0, effects, lambda: frame)
+        assert cache.hits == 1
+        for got in (computed, cached):
+            assert got.flags.writeable
+            np.testing.assert_array_equal(got, 255 - frame)
+
+    def test_stateful_prefix_matches_fresh_context(self, source, frame):
+        cache = PreviewCache(budget_bytes=1 << 24)
+        effects = [{"name": "feedback", "params": {"decay": 0.5}}, {"name": "contrast", "params": {"amount": 20}}]
+        cache.render(source, 0, 1.0, effects, lambda: frame)
+        effects[1]["params"]["amount"] = 60
+        got = cache.render(source, 0, 1.0, effects, lambda: frame)
+        assert cache.hits == 1
+        np.testing.assert_array_equal(got, apply_chain(frame.copy(), effects, context=RenderContext()))
+
+    def test_stops_caching_at_state_outside_context(self, source, frame, monkeypatch):
+        held = {}
+
+        def hold_previous(frame):
+            previous = held.get("frame", frame)
+            held["frame"] = frame
+            return previous.copy()
+
+        monkeypatch.setitem(EFFECTS, "holdprevious", {
+            "fn": hold_previous,
+            "category": "temporal",
+            "params": {},
+            "description": "Output the previous frame",
+            "caps": _caps(stateful=True, pointwise=False, radius=0),
+        })
+        cache = PreviewCache(budget_bytes=1 << 24)
+        effects = [{"name": "invert", "params": {}}, {"name": "holdprevious", "params": {}},
+                   {"name": "contrast", "params": {}}]
+        cache.render(source, 0, 1.0, effects, lambda: frame)
+        # Source frame and the invert prefix only
+        assert len(cache) == 2
+
+    def test_prefix_hashes(self):
+        a, b = prefix_hashes(chain(20)), prefix_hashes(chain(60))
+        assert len(a) == 4
+        assert a[:3] == b[:3] and a[3] != b[3]
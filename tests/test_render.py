@@ -0,0 +1,251 @@
+"""
+Entropic -- Render Engine Tests
+Windowed decode -> effects -> encode loop.
+
+Run with: pytest tests/test_render.py -v
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects import apply_chain, compile_chain, is_stateless_chain
+from core.render import (
+    iter_windows, chain_processor, render_frames, render_chain, render_workers, RenderCancelled,
+    PARALLEL_MIN_FRAMES, MAX_AUTO_WORKERS,
+)
+
+
+class ListWriter:
+    """Collects written frames in memory (stands in for FrameWriter)."""
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+
+@pytest.fixture
+def clip_frames():
+    """40 visually distinct frames."""
+    rng = np.random.RandomState(7)
+    return [rng.randint(0, 256, (24, 32, 3), dtype=np.uint8) for _ in range(40)]
+
+
+TEMPORAL_CHAIN = [
+    {"name": "stutter", "params": {"repeat": 3, "interval": 5}},
+    {"name": "feedback", "params": {"decay": 0.5}},
+    {"name": "delay", "params": {"delay_frames": 4, "decay": 0.5}},
+]
+
+
+def _reference(frames, chain):
+    """Plain frame-by-frame loop over the whole clip."""
+    total = len(frames)
+    return [apply_chain(f.copy(), chain, frame_index=i, total_frames=total) for i, f in enumerate(frames)]
+
+
+class TestIterWindows:
+
+    def test_sizes(self):
+        windows = list(iter_windows(range(10), 4))
+        assert [len(w) for w in windows] == [4, 4, 2]
+
+    def test_empty(self):
+        assert list(iter_windows([], 4)) == []
+
+
+class TestRenderFrames:
+
+    def test_frame_indices_continuous_across_windows(self, clip_frames):
+        seen = []
+        writer = ListWriter()
+        render_frames(iter(clip_frames), lambda f, i: seen.append(i) or f, writer, window=7)
+        assert seen == list(range(len(clip_frames)))
+        assert len(writer.frames) == len(clip_frames)
+
+    @pytest.mark.parametrize("window", [1, 7, 64])
+    def test_temporal_state_carries_across_windows(self, clip_frames, window):
+        expected = _reference(clip_frames, TEMPORAL_CHAIN)
+        writer = ListWriter()
+        process = chain_processor(TEMPORAL_CHAIN, len(clip_frames))
+        render_frames((f.copy() for f in clip_frames), process, writer, window=window)
+        for got, want in zip(writer.frames, expected):
+            np.testing.assert_array_equal(got, want)
+
+    def test_progress_per_window(self, clip_frames):
+        calls = []
+        render_frames(iter(clip_frames), lambda f, i: f, ListWriter(), window=16, progress=calls.append)
+        assert calls == [16, 32, 40]
+
+    def test_decoder_closed_on_error(self, clip_frames):
+        closed = []
+
+        def frames():
+            try:
+                yield from clip_frames
+            finally:
+                closed.append(True)
+
+        def boom(frame, i):
+            if i == 3:
+                raise RuntimeError("effect failed")
+            return frame
+
+        with pytest.raises(RuntimeError):
+            render_frames(frames(), boom, ListWriter(), window=2)
+        assert closed
+
+
+class TestChainProcessor:
+
+    def test_no_effects_passthrough(self, clip_frames):
+        process = chain_processor([], 40)
+        assert process(clip_frames[0], 0) is clip_frames[0]
+
+    def test_mix_zero_returns_original(self, clip_frames):
+        process = chain_processor([{"name": "invert", "params": {}}], 40, mix=0.0)
+        np.testing.assert_array_equal(process(clip_frames[0].copy(), 0), clip_frames[0])
+
+    def test_variant_chain_skips_cube(self, clip_frames):
+        chain = [{"name": "invert", "params": {}}]
+        variant = [{"name": "invert", "params": {"mix": 0.5}}]
+        process = chain_processor(chain, 1000)
+        with patch("core.render.compile_chain", wraps=compile_chain) as compiled:
+            got = process(clip_frames[0].copy(), 0, variant)
+        assert not compiled.call_args.kwargs.get("cube", False)
+        np.testing.assert_array_equal(got, apply_chain(clip_frames[0].copy(), variant))
+
+
+SEEDED_CHAIN = [
+    {"name": "filmgrain", "params": {"intensity": 0.4, "seed": 3}},
+    {"name": "rowshift", "params": {"seed": 5}},
+    {"name": "pixelsort", "params": {"threshold": 0.4}},
+]
+
+
+class TestRenderChain:
+
+    def test_stateless_detection(self):
+        assert is_stateless_chain(SEEDED_CHAIN)
+        assert not is_stateless_chain(TEMPORAL_CHAIN)
+        assert not is_stateless_chain([{"name": "invert", "params": {}, "envelope": {"attack": 2}}])
+
+    def test_workers_by_render_length(self, monkeypatch):
+        monkeypatch.delenv("ENTROPIC_RENDER_WORKERS", raising=False)
+        monkeypatch.setattr("core.render.os.cpu_count", lambda: 64)
+        assert render_workers(PARALLEL_MIN_FRAMES - 1) == 1
+        assert render_workers() == 1
+        assert render_workers(PARALLEL_MIN_FRAMES) == MAX_AUTO_WORKERS
+        monkeypatch.setattr("core.render.os.cpu_count", lambda: 2)
+        assert render_workers(PARALLEL_MIN_FRAMES) == 2
+
+    def test_workers_env_override(self, monkeypatch):
+        monkeypatch.setenv("ENTROPIC_RENDER_WORKERS", "1")
+        assert render_workers(10 * PARALLEL_MIN_FRAMES) == 1
+        monkeypatch.setenv("ENTROPIC_RENDER_WORKERS", "4")
+        assert render_workers(1) == 4
+        monkeypatch.setenv("ENTROPIC_RENDER_WORKERS", "many")
+        assert render_workers(1) == 1
+
+    @pytest.mark.parametrize("total, parallel", [(PARALLEL_MIN_FRAMES - 1, False), (PARALLEL_MIN_FRAMES, True)])
+    def test_default_pool_threshold(self, clip_frames, monkeypatch, total, parallel):
+        monkeypatch.delenv("ENTROPIC_RENDER_WORKERS", raising=False)
+        monkeypatch.setattr("core.render.os.cpu_count", lambda: 2)
+        writer = ListWriter()
+        with patch("core.render.ProcessPoolExecutor", wraps=ProcessPoolExecutor) as pool:
+            render_chain(iter(clip_frames), SEEDED_CHAIN, total, writer)
+        assert pool.called == parallel
+        assert len(writer.frames) == len(clip_frames)
+
+    def test_parallel_matches_serial(self, clip_frames):
+        expected = _reference(clip_frames, SEEDED_CHAIN)
+        writer = ListWriter()
+        done = render_chain((f.copy() for f in clip_frames), SEEDED_CHAIN, len(clip_frames), writer, workers=2)
+        assert done == len(clip_frames)
+        for got, want in zip(writer.frames, expected):
+            np.testing.assert_array_equal(got, want)
+
+    def test_parallel_progress(self, clip_frames):
+        calls = []
+        render_chain(iter(clip_frames), SEEDED_CHAIN, 40, ListWriter(), workers=2, window=16, progress=calls.append)
+        assert calls == [16, 32, 40]
+
+    def test_stateful_chain_renders_serially(self, clip_frames):
+        expected = _reference(clip_frames, TEMPORAL_CHAIN)
+        writer = ListWriter()
+        with patch("core.render.ProcessPoolExecutor") as pool:
+            render_chain((f.copy() for f in clip_frames), TEMPORAL_CHAIN, len(clip_frames), writer, workers=4)
+        pool.assert_not_called()
+        for got, want in zip(writer.frames, expected):
+            np.testing.assert_array_equal(got, want)
+
+    def test_worker_error_propagates(self, clip_frames):
+        bad = [{"name": "no_such_effect", "params": {}}]
+        with pytest.raises(Exception):
+            render_chain(iter(clip_frames), bad, 40, ListWriter(), workers=2)
+
+
+class TestPipeline:
+
+    def test_backpressure_bounds_decode_ahead(self, clip_frames):
+        pulled = []
+        ahead = []
+
+        def frames():
+            for f in clip_frames:
+                pulled.append(1)
+                yield f
+
+        class SlowWriter(ListWriter):
+            def write(self, frame):
+                ahead.append(len(pulled) - len(self.frames))
+                super().write(frame)
+
+        render_frames(frames(), lambda f, i: f, SlowWriter(), window=8)
+        # Two queues of window // 2 plus one frame held by each stage
+        assert max(ahead) <= 8 + 3
+
+    def test_encoder_error_stops_decoder(self, clip_frames):
+        closed = []
+
+        def frames():
+            try:
+                yield from clip_frames
+            finally:
+                closed.append(True)
+
+        class FailingWriter:
+            def write(self, frame):
+                raise OSError("disk full")
+
+        with pytest.raises(OSError):
+            render_frames(frames(), lambda f, i: f, FailingWriter(), window=4)
+        assert closed
+
+    def test_cancel(self, clip_frames):
+        cancel = threading.Event()
+        writer = ListWriter()
+
+        def process(frame, i):
+            if i == 5:
+                cancel.set()
+            return frame
+
+        with pytest.raises(RenderCancelled):
+            render_frames(iter(clip_frames), process, writer, window=4, cancel=cancel)
+        assert len(writer.frames) < len(clip_frames)
+
+    def test_cancel_parallel(self, clip_frames):
+        cancel = threading.Event()
+        cancel.set()
+        with pytest.raises(RenderCancelled):
+            render_chain(iter(clip_frames), SEEDED_CHAIN, 40, ListWriter(), workers=2, cancel=cancel)
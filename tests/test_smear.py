@@ -0,0 +1,60 @@
+"""
+Entropic -- Cumulative Smear Tests
+The in-place smear must match the decayed-max recurrence.
+
+Run with: pytest tests/test_smear.py -v
+"""
+
+import os
+import sys
+
+import pytest
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from effects.distortion import cumulative_smear
+
+
+@pytest.fixture
+def frame():
+    return np.random.RandomState(25).randint(0, 256, (30, 40, 3), dtype=np.uint8)
+
+
+def reference_smear(frame, direction, decay):
+    """The original recurrence: one line at a time on a 0-1 float copy."""
+    f = frame.astype(np.float32) / 255.0
+    if direction == "vertical":
+        for y in range(1, f.shape[0]):
+            f[y] = np.maximum(f[y], f[y - 1] * decay)
+    else:
+        for x in range(1, f.shape[1]):
+            f[:, x] = np.maximum(f[:, x], f[:, x - 1] * decay)
+    return np.clip(f * 255, 0, 255).astype(np.uint8)
+
+
+class TestCumulativeSmear:
+
+    @pytest.mark.parametrize("direction", ["horizontal", "vertical"])
+    @pytest.mark.parametrize("decay", [0.5, 0.95, 0.999])
+    def test_matches_recurrence(self, frame, direction, decay):
+        got = cumulative_smear(frame, direction=direction, decay=decay)
+        want = reference_smear(frame, direction, decay)
+        assert np.abs(got.astype(int) - want).max() <= 1
+
+    def test_trails_follow_direction(self):
+        dot = np.zeros((9, 9, 3), dtype=np.uint8)
+        dot[4, 4] = 200
+        across = cumulative_smear(dot, direction="horizontal", decay=0.9)
+        down = cumulative_smear(dot, direction="vertical", decay=0.9)
+        assert across[4, 5:].min() > 0 and not across[5:].any() and not across[4, :4].any()
+        assert down[5:, 4].min() > 0 and not down[:, 5:].any() and not down[:4].any()
+
+    def test_float32_stays_float32(self, frame):
+        got = cumulative_smear(frame.astype(np.float32), decay=0.9)
+        assert got.dtype == np.float32
+        assert np.abs(got - cumulative_smear(frame, decay=0.9)).max() < 1
+
+    def test_read_only_input(self, frame):
+        frame.setflags(write=False)
+        assert cumulative_smear(frame).shape == frame.shape
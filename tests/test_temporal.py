@@ -480,3 +480,45 @@ class TestSampleAndHold:
                                          frame_index=i, total_frames=20, seed=99))
         for i in range(10):
             np.testing.assert_array_equal(run1[i], run2[i])
+
+
+# ---------------------------------------------------------------------------
+# READ-ONLY FRAME CONTRACT
+# ---------------------------------------------------------------------------
+
+class TestZeroCopy:
+
+    @pytest.mark.parametrize("fn, params", [
+        (stutter, {"interval": 5}),
+        (frame_drop, {"drop_rate": 0.0}),
+        (time_stretch, {"speed": 1.0}),
+        (tape_stop, {"trigger": 1.0}),
+        (delay, {"delay_frames": 5}),
+        (decimator, {"factor": 2}),
+        (sample_and_hold, {}),
+    ])
+    def test_pass_through_shares_input(self, fn, params, small_frame):
+        result = fn(small_frame, frame_index=0, total_frames=10, **params)
+        assert np.shares_memory(result, small_frame)
+        assert not result.flags.writeable
+
+    def test_held_frames_kept_by_reference(self, unique_frames):
+        held = stutter(unique_frames[0], repeat=3, interval=5, frame_index=0, total_frames=20)
+        again = stutter(unique_frames[1], repeat=3, interval=5, frame_index=1, total_frames=20)
+        assert np.shares_memory(again, unique_frames[0])
+        np.testing.assert_array_equal(again, held)
+
+    def test_buffered_frames_not_copied(self, unique_frames):
+        state = {}
+        for i in range(3):
+            delay(unique_frames[i], delay_frames=5, frame_index=i, total_frames=20, state=state)
+        assert all(np.shares_memory(a, b) for a, b in zip(state["buffer"], unique_frames))
+
+    def test_chain_passes_read_only_frames(self, unique_frames):
+        from effects import compile_chain
+        plan = compile_chain([{"name": "stutter", "params": {"repeat": 2, "interval": 4}},
+                              {"name": "decimator", "params": {"factor": 2}}])
+        out = plan(unique_frames[0], 0, 20)
+        assert np.shares_memory(out, unique_frames[0])
+        with pytest.raises(ValueError):
+            out[0, 0, 0] = 1
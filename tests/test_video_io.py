@@ -0,0 +1,288 @@
+"""
+Entropic -- Video I/O Tests
+Streaming decode, seeking and encode paths against a small synthetic clip.
+
+Run with: pytest tests/test_video_io.py -v
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.video_io import (
+    probe_video, clear_probe_cache, load_frame_index, extract_single_frame,
+    extract_frame_batch, sample_frame_numbers, iter_frames, DecoderSession, FrameWriter,
+)
+
+needs_ffmpeg = pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")),
+    reason="FFmpeg/FFprobe not installed",
+)
+
+FRAMES = 30
+
+
+@pytest.fixture(scope="module")
+def clip():
+    """1 second 64x48 @ 30fps test pattern with a keyframe every 10 frames."""
+    d = tempfile.mkdtemp(prefix="entropic_vio_")
+    path = Path(d) / "clip.mp4"
+    subprocess.run(
+        [
+            shutil.which("ffmpeg"), "-y", "-v", "error",
+            "-f", "lavfi", "-i", f"testsrc=size=64x48:rate=30:duration={FRAMES / 30}",
+            "-c:v", "libx264", "-g", "10", "-pix_fmt", "yuv420p",
+            str(path),
+        ],
+        check=True, timeout=60,
+    )
+    yield str(path)
+    shutil.rmtree(d, ignore_errors=True)
+
+
+MKV_FRAMES = 600
+
+
+@pytest.fixture(scope="module")
+def mkv_clip():
+    """20 second MKV @ 30fps, keyframe every 30 frames: spans several cue
+    points, so seeks can land on an earlier cue than the target keyframe."""
+    d = tempfile.mkdtemp(prefix="entropic_vio_")
+    path = Path(d) / "clip.mkv"
+    subprocess.run(
+        [
+            shutil.which("ffmpeg"), "-y", "-v", "error",
+            "-f", "lavfi", "-i", f"testsrc=size=32x24:rate=30:duration={MKV_FRAMES / 30}",
+            "-c:v", "libx264", "-g", "30", "-pix_fmt", "yuv420p",
+            str(path),
+        ],
+        check=True, timeout=60,
+    )
+    yield str(path)
+    shutil.rmtree(d, ignore_errors=True)
+
+
+@needs_ffmpeg
+class TestIterFrames:
+
+    def test_yields_every_frame(self, clip):
+        frames = list(iter_frames(clip))
+        assert len(frames) == FRAMES
+        assert frames[0].shape == (48, 64, 3)
+        assert frames[0].dtype == np.uint8
+
+    def test_frames_are_writable(self, clip):
+        frame = next(iter_frames(clip))
+        frame[0, 0] = 0  # effects may modify in place
+
+    def test_scale(self, clip):
+        frame = next(iter_frames(clip, scale=0.5))
+        assert frame.shape == (24, 32, 3)
+
+    def test_start_end_matches_full_decode(self, clip):
+        full = list(iter_frames(clip))
+        part = list(iter_frames(clip, start=12, end=17))
+        assert len(part) == 5
+        for a, b in zip(part, full[12:17]):
+            assert np.array_equal(a, b)
+
+    def test_early_close_stops_decoder(self, clip):
+        gen = iter_frames(clip)
+        next(gen)
+        gen.close()  # must not hang or leak the FFmpeg process
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(Exception):
+            list(iter_frames(str(tmp_path / "nope.mp4")))
+
+
+@needs_ffmpeg
+class TestProbeCache:
+
+    def test_second_probe_skips_ffprobe(self, clip):
+        clear_probe_cache()
+        first = probe_video(clip)
+        with patch("core.video_io.subprocess.run") as run:
+            assert probe_video(clip) == first
+        run.assert_not_called()
+
+    def test_returns_copies(self, clip):
+        info = probe_video(clip)
+        info["fps"] = -1
+        assert probe_video(clip)["fps"] > 0
+
+    def test_modified_file_reprobed(self, clip, tmp_path):
+        copy = tmp_path / "copy.mp4"
+        shutil.copy(clip, copy)
+        probe_video(str(copy))
+        os.utime(copy, ns=(0, 0))
+        with patch("core.video_io.subprocess.run", wraps=subprocess.run) as run:
+            probe_video(str(copy))
+        run.assert_called_once()
+
+    def test_persistent_store(self, clip, tmp_path):
+        clear_probe_cache()
+        first = probe_video(clip, cache_dir=str(tmp_path))
+        assert (tmp_path / "probe_cache.json").exists()
+        clear_probe_cache()
+        with patch("core.video_io.subprocess.run") as run:
+            assert probe_video(clip, cache_dir=str(tmp_path)) == first
+        run.assert_not_called()
+
+
+@needs_ffmpeg
+class TestFrameIndex:
+
+    def test_exact_frame_count(self, clip):
+        index = load_frame_index(clip)
+        assert len(index["pts"]) == FRAMES
+        assert index["pts"] == sorted(index["pts"])
+
+    def test_keyframes(self, clip):
+        assert load_frame_index(clip)["keyframes"] == [0, 10, 20]
+
+    def test_sidecar(self, clip, tmp_path):
+        clear_probe_cache()
+        index = load_frame_index(clip, cache_dir=str(tmp_path))
+        assert list(tmp_path.glob("*.frameindex.json"))
+        clear_probe_cache()
+        with patch("core.video_io.subprocess.run") as run:
+            assert load_frame_index(clip, cache_dir=str(tmp_path)) == index
+        run.assert_not_called()
+
+    def test_single_frame_matches_full_decode(self, clip):
+        full = list(iter_frames(clip))
+        for n in (0, 1, 9, 10, 11, 19, 25, FRAMES - 1):
+            assert np.array_equal(extract_single_frame(clip, n), full[n]), n
+
+    def test_single_frame_clamped(self, clip):
+        full = list(iter_frames(clip))
+        assert np.array_equal(extract_single_frame(clip, 10_000), full[-1])
+
+
+@needs_ffmpeg
+class TestDecoderSession:
+
+    def test_random_access_matches_full_decode(self, clip):
+        full = list(iter_frames(clip))
+        with DecoderSession(clip) as session:
+            for n in (0, 1, 2, 2, 5, 11, 12, 25, 3, FRAMES - 1, 0):
+                assert np.array_equal(session.read(n), full[n]), n
+
+    def test_forward_steps_reuse_process(self, clip):
+        with DecoderSession(clip) as session:
+            session.read(3)
+            with patch("core.video_io.subprocess.Popen") as popen:
+                for n in range(4, 10):
+                    session.read(n)
+            popen.assert_not_called()
+
+    def test_returns_independent_copies(self, clip):
+        with DecoderSession(clip) as session:
+            a = session.read(4)
+            a[:] = 0
+            assert session.read(4).any()
+
+    def test_scale(self, clip):
+        with DecoderSession(clip, scale=0.5) as session:
+            assert session.read(7).shape == (24, 32, 3)
+
+
+@needs_ffmpeg
+class TestFrameWriter:
+
+    def test_roundtrip(self, clip, tmp_path):
+        out = tmp_path / "out.mp4"
+        with FrameWriter(out, fps=30) as writer:
+            for frame in iter_frames(clip):
+                writer.write(frame)
+        assert writer.frame_count == FRAMES
+        info = probe_video(str(out))
+        assert (info["width"], info["height"]) == (64, 48)
+        assert len(list(iter_frames(str(out)))) == FRAMES
+
+    def test_hi_quality_writes_mov(self, clip, tmp_path):
+        with FrameWriter(tmp_path / "out.mp4", fps=30, quality="hi") as writer:
+            writer.write(next(iter_frames(clip)))
+        assert writer.output_path.suffix == ".mov"
+        assert probe_video(str(writer.output_path))["codec"] == "prores"
+
+    def test_shape_change_rejected(self, tmp_path):
+        writer = FrameWriter(tmp_path / "out.mp4", fps=30)
+        with pytest.raises(ValueError):
+            with writer:
+                writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+                writer.write(np.zeros((24, 32, 3), dtype=np.uint8))
+        assert not (tmp_path / "out.mp4").exists()
+
+    def test_no_frames_raises(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            with FrameWriter(tmp_path / "out.mp4", fps=30):
+                pass
+
+
+@needs_ffmpeg
+class TestFrameBatch:
+
+    def test_matches_full_decode(self, clip):
+        full = list(iter_frames(clip))
+        wanted = [25, 0, 9, 10, 11, 11, FRAMES - 1]
+        got = extract_frame_batch(clip, wanted)
+        assert len(got) == len(wanted)
+        for frame, n in zip(got, wanted):
+            assert np.array_equal(frame, full[n]), n
+
+    def test_single_ffmpeg_run(self, clip):
+        with patch("core.video_io.subprocess.run", wraps=subprocess.run) as run:
+            probe_video(clip)
+            load_frame_index(clip)
+            run.reset_mock()
+            extract_frame_batch(clip, count=10)
+        run.assert_called_once()
+
+    def test_count_and_scale(self, clip):
+        frames = extract_frame_batch(clip, count=4, scale=0.5)
+        assert len(frames) == 4
+        assert frames[0].shape == (24, 32, 3)
+
+    @pytest.mark.parametrize("wanted", [
+        sample_frame_numbers(MKV_FRAMES, 10), [130], [400], [MKV_FRAMES - 1], [29, 30, 31, 300],
+    ])
+    def test_multi_gop_mkv(self, mkv_clip, wanted):
+        full = list(iter_frames(mkv_clip))
+        with patch("core.video_io.extract_single_frame") as single:
+            got = extract_frame_batch(mkv_clip, wanted)
+        single.assert_not_called()
+        for frame, n in zip(got, wanted):
+            assert np.array_equal(frame, full[n]), n
+
+    def test_short_output_falls_back_per_frame(self, clip):
+        full = list(iter_frames(clip))
+        run = subprocess.run
+        calls = []
+
+        def truncated(cmd, **kwargs):
+            result = run(cmd, **kwargs)
+            if not calls:
+                calls.append(cmd)
+                result.stdout = result.stdout[:len(result.stdout) // 2]
+            return result
+
+        with patch("core.video_io.subprocess.run", side_effect=truncated):
+            got = extract_frame_batch(clip, [3, 14, 27], scale=1.0)
+        for frame, n in zip(got, [3, 14, 27]):
+            assert np.array_equal(frame, full[n]), n
+
+    def test_sample_frame_numbers(self):
+        assert sample_frame_numbers(30, 4) == [0, 10, 19, 29]
+        assert sample_frame_numbers(3, 10) == [0, 1, 2]